@@ -0,0 +1,87 @@
+"""
+Component construction benchmarks.
+
+    cd deployment/src
+    python -m benchmarks              # compare against benchmarks/baseline.json
+    python -m benchmarks --update     # record a new baseline
+    python -m benchmarks --only rails # run scenarios whose name starts with "rails"
+
+Resource, Output, apply and invoke counts must match the baseline exactly.
+Wall time (fastest of --repeat runs) and peak memory fail when they exceed the baseline by more than --tolerance (a ratio).
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.harness import measure
+from benchmarks.scenarios import SCENARIOS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+EXACT_METRICS = ("resources", "outputs", "applies", "invokes")
+RELATIVE_METRICS = ("wall_time", "peak_memory")
+
+
+def run(only=None, repeat=3):
+    results = {}
+    for scenario, (build, sizes) in SCENARIOS.items():
+        if only and not scenario.startswith(only):
+            continue
+        results[scenario] = {}
+        for size in sizes:
+            measurement = measure(scenario, size, lambda: build(size), repeat=repeat)
+            results[scenario][str(size)] = measurement.as_dict()
+            print(f"{scenario}[{size}]: {json.dumps(measurement.as_dict())}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    failures = []
+    for scenario, sizes in results.items():
+        for size, metrics in sizes.items():
+            expected = baseline.get(scenario, {}).get(size)
+            if expected is None:
+                failures.append(f"{scenario}[{size}]: no baseline, run with --update")
+                continue
+            for metric in EXACT_METRICS:
+                if metrics[metric] != expected[metric]:
+                    failures.append(f"{scenario}[{size}]: {metric} {expected[metric]} -> {metrics[metric]}")
+            for metric in RELATIVE_METRICS:
+                if metrics[metric] > expected[metric] * tolerance:
+                    failures.append(f"{scenario}[{size}]: {metric} {expected[metric]} -> {metrics[metric]} "
+                                    f"(more than {tolerance}x)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark strongmind_deployment component construction.")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--only", help="only run scenarios whose name starts with this prefix")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per configuration, the fastest is kept")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="allowed wall time and peak memory ratio against the baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.repeat)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+
+    if args.update:
+        baseline.update(results)
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pulumi
+from faker import Faker
+
+from strongmind_deployment import invoke_cache, secrets
+from tests.mocks import get_pulumi_mocks, ImmediateExecutor
+
+
+class Measurement:
+    """
+    The cost of constructing one component configuration under the Pulumi mocks.
+    """
+    def __init__(self, scenario, size, wall_time, resources, outputs, applies, invokes, peak_memory):
+        self.scenario = scenario
+        self.size = size
+        self.wall_time = wall_time
+        self.resources = resources
+        self.outputs = outputs
+        self.applies = applies
+        self.invokes = invokes
+        self.peak_memory = peak_memory
+
+    def as_dict(self):
+        return {
+            "wall_time": round(self.wall_time, 4),
+            "resources": self.resources,
+            "outputs": self.outputs,
+            "applies": self.applies,
+            "invokes": self.invokes,
+            "peak_memory": self.peak_memory,
+        }
+
+
+class _Counters:
+    def __init__(self):
+        self.resources = 0
+        self.outputs = 0
+        self.applies = 0
+        self.invokes = 0
+
+
+def _counting_mocks(counters, fake_password):
+    mocks = get_pulumi_mocks(Faker(), fake_password)
+    new_resource = mocks.new_resource
+    call = mocks.call
+
+    def counting_new_resource(args):
+        counters.resources += 1
+        return new_resource(args)
+
+    def counting_call(args):
+        counters.invokes += 1
+        return call(args)
+
+    mocks.new_resource = counting_new_resource
+    mocks.call = counting_call
+    return mocks
+
+
+def _run(build, counters, project, stack):
+    loop = asyncio.get_event_loop()
+    loop.set_default_executor(ImmediateExecutor())
+    old_settings = pulumi.runtime.settings.SETTINGS
+    output_init = pulumi.Output.__init__
+    output_apply = pulumi.Output.apply
+    environ = dict(os.environ)
+
+    def counting_init(self, *args, **kwargs):
+        counters.outputs += 1
+        output_init(self, *args, **kwargs)
+
+    def counting_apply(self, *args, **kwargs):
+        counters.applies += 1
+        return output_apply(self, *args, **kwargs)
+
+    try:
+        pulumi.runtime.mocks.set_mocks(_counting_mocks(counters, "benchmark-password"),
+                                       project=project, stack=stack, preview=False)
+        invoke_cache.clear_cache()
+        secrets.clear_cache()
+        pulumi.Output.__init__ = counting_init
+        pulumi.Output.apply = counting_apply
+        pulumi.runtime.test(build)()
+    finally:
+        pulumi.Output.__init__ = output_init
+        pulumi.Output.apply = output_apply
+        pulumi.runtime.settings.configure(old_settings)
+        os.environ.clear()
+        os.environ.update(environ)
+        loop.set_default_executor(ThreadPoolExecutor())
+
+
+def measure(scenario, size, build, repeat=3, project="benchmark", stack="stage"):
+    """
+    Constructs `build()` under the Pulumi mocks `repeat` times for wall time (the fastest run is kept), then once
+    more under tracemalloc for peak memory and counts. The counted run always follows at least one warm run, so the
+    counts do not depend on `repeat`.
+    `build` must create its resources synchronously; every Output is awaited before the clock stops.
+    Environment variables set by `build` are restored after each run.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    wall_time = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(build, _Counters(), project, stack)
+        elapsed = time.perf_counter() - start
+        wall_time = elapsed if wall_time is None else min(wall_time, elapsed)
+
+    counters = _Counters()
+    tracemalloc.start()
+    try:
+        _run(build, counters, project, stack)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(scenario, size, wall_time, counters.resources, counters.outputs, counters.applies,
+                       counters.invokes, peak_memory)
@@ -0,0 +1,112 @@
+import os
+
+import pulumi
+import pulumi_aws as aws
+import pulumi_awsx as awsx
+
+
+class _NoServicesEcsClient:
+    """Stands in for boto3 so RailsComponent's describe_services probe finds no existing service."""
+    def describe_services(self, **kwargs):
+        return {"services": []}
+
+
+def _container_kwargs():
+    return {
+        "container_image": "123456789012.dkr.ecr.us-west-2.amazonaws.com/benchmark:latest",
+        "container_port": 3000,
+        "env_vars": {"ENVIRONMENT_NAME": "stage"},
+        "secrets": [],
+        "zone_id": "benchmark-zone",
+    }
+
+
+def _sidecar(index):
+    return awsx.ecs.TaskDefinitionContainerDefinitionArgs(
+        name=f"sidecar-{index}",
+        image="gcr.io/datadoghq/agent:7",
+        cpu=64,
+        memory=128,
+        essential=False,
+        log_configuration=awsx.ecs.TaskDefinitionLogConfigurationArgs(
+            log_driver="awslogs",
+            options={
+                "awslogs-group": "/ecs/placeholder",
+                "awslogs-region": "us-west-2",
+                "awslogs-stream-prefix": f"sidecar-{index}",
+            },
+        ),
+    )
+
+
+def _log_metric_filter(index):
+    return {
+        "pattern": f"ERROR-{index}",
+        "metric_transformation": {
+            "name": f"errors-{index}",
+            "namespace": "Benchmark",
+            "value": "1",
+        },
+    }
+
+
+def rails(reader_instance_count):
+    from strongmind_deployment.rails import RailsComponent
+    os.environ["CONTAINER_IMAGE"] = "123456789012.dkr.ecr.us-west-2.amazonaws.com/benchmark:latest"
+    os.environ["RAILS_MASTER_KEY"] = "benchmark-master-key"
+    RailsComponent("rails",
+                   reader_instance_count=reader_instance_count,
+                   need_worker=True,
+                   queue_redis=True,
+                   cache_redis=True,
+                   container_subnets=["subnet-12345"],
+                   container_security_groups=["sg-12345"],
+                   ecs_client=_NoServicesEcsClient())
+
+
+def container(sidecar_count):
+    from strongmind_deployment.container import ContainerComponent
+    ContainerComponent("container",
+                       sidecar_containers=[_sidecar(i) for i in range(sidecar_count)],
+                       **_container_kwargs())
+
+
+def dashboard(log_metric_filter_count):
+    from strongmind_deployment.container import ContainerComponent
+    from strongmind_deployment.dashboard import DashboardComponent
+    web_container = ContainerComponent("container", **_container_kwargs())
+    ecs_cluster = aws.ecs.Cluster("cluster")
+    rds_instance = aws.rds.ClusterInstance("rds-cluster-instance",
+                                           cluster_identifier="rds-cluster",
+                                           instance_class="db.serverless",
+                                           engine="aurora-postgresql")
+    DashboardComponent("dashboard",
+                       web_container=web_container,
+                       ecs_cluster=ecs_cluster,
+                       rds_serverless_cluster_instance=rds_instance,
+                       autoscale=True,
+                       log_metric_filters=[_log_metric_filter(i) for i in range(log_metric_filter_count)])
+
+
+def vpc(subnets_per_tier):
+    from strongmind_deployment.sm_vpc import VpcComponent
+    VpcComponent("benchmark",
+                 cidr="10.0.0.0/16",
+                 public_subnets_number=subnets_per_tier,
+                 private_subnets_number=subnets_per_tier)
+
+
+def batch(_size):
+    from strongmind_deployment.batch import BatchComponent
+    os.environ["CONTAINER_IMAGE"] = "123456789012.dkr.ecr.us-west-2.amazonaws.com/benchmark:latest"
+    BatchComponent("batch")
+
+
+# scenario name -> (component builder taking a size, configuration sizes to measure)
+SCENARIOS = {
+    "rails.reader_instances": (rails, [0, 2, 5, 10]),
+    "container.sidecars": (container, [0, 5, 10, 20]),
+    "dashboard.log_metric_filters": (dashboard, [0, 10, 25, 50]),
+    "sm_vpc.subnets_per_tier": (vpc, [1, 2]),
+    "batch.default": (batch, [1]),
+}
@@ -4,10 +4,18 @@ import pulumi
 import pulumi_aws as aws
 import pulumi_aws.ec2 as ec2
 import pulumi_aws.lb as lb
+from strongmind_deployment import invoke_cache
 from strongmind_deployment import vpc
 from strongmind_deployment.util import qualify_component_name
 
 
+LOAD_BALANCING_ALGORITHMS = ("round_robin", "least_outstanding_requests")
+DEFAULT_IDLE_TIMEOUT = 60
+DEFAULT_DEREGISTRATION_DELAY = 300
+# Slow start is either off (0) or ramps up over 30 to 900 seconds
+SLOW_START_RANGE = (30, 900)
+
+
 class AlbPlacement(str, Enum):
     INTERNAL = "internal"
     EXTERNAL = "external"
@@ -26,6 +34,13 @@ class AlbArgs:
     ingress_sg: ec2.SecurityGroup - a security group that is allowed to access the ALB.
     should_protect: bool - whether or not to enable deletion protection on the ALB.  Defaults to False.  You should set this for production stacks.
     namespace: str - a custom namespace for the ALB.  Defaults to the project stack name.
+    idle_timeout: int - seconds a connection may sit idle before the ALB closes it.  Defaults to 60.
+    load_balancing_algorithm: str - how target groups created through Alb.target_group_settings pick a target,
+        "round_robin" or "least_outstanding_requests", which sends each request to the target with the fewest
+        in flight so slow requests don't pile up on one task.  Defaults to "round_robin".
+    slow_start: int - seconds over which a new target's share of traffic ramps up, 30 to 900, or 0 for none.
+        AWS does not support slow start with least_outstanding_requests.  Defaults to 0.
+    deregistration_delay: int - seconds a draining target keeps serving in-flight requests.  Defaults to 300.
     """
     def __init__(
         self,
@@ -38,7 +53,19 @@ class AlbArgs:
         should_protect: bool = False,
         tags: dict = None,
         namespace: str = None,
+        idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+        load_balancing_algorithm: str = "round_robin",
+        slow_start: int = 0,
+        deregistration_delay: int = DEFAULT_DEREGISTRATION_DELAY,
     ):
+        if load_balancing_algorithm not in LOAD_BALANCING_ALGORITHMS:
+            raise ValueError(f"Unsupported load_balancing_algorithm: {load_balancing_algorithm}. "
+                             f"Expected one of {', '.join(LOAD_BALANCING_ALGORITHMS)}")
+        if slow_start and not SLOW_START_RANGE[0] <= slow_start <= SLOW_START_RANGE[1]:
+            raise ValueError(f"slow_start must be 0 or between {SLOW_START_RANGE[0]} and {SLOW_START_RANGE[1]} "
+                             f"seconds, got {slow_start}")
+        if slow_start and load_balancing_algorithm == "least_outstanding_requests":
+            raise ValueError("slow_start cannot be used with the least_outstanding_requests load_balancing_algorithm")
         self.vpc_id = vpc_id
         self.subnets = subnets
         self.certificate_arn = certificate_arn
@@ -48,6 +75,10 @@ class AlbArgs:
         self.should_protect = should_protect
         self.tags = tags
         self.namespace = namespace
+        self.idle_timeout = idle_timeout
+        self.load_balancing_algorithm = load_balancing_algorithm
+        self.slow_start = slow_start
+        self.deregistration_delay = deregistration_delay
 
 
 class Alb(pulumi.ComponentResource):
@@ -64,6 +95,8 @@ class Alb(pulumi.ComponentResource):
 
         self.http_ingress = None
         self.tls_ingress = None
+        self.test_ingress = None
+        self.test_listener = None
         self.args = args
         self.is_internal = args.placement == AlbPlacement.INTERNAL
         self.subnet_placement: vpc.SubnetType = vpc.SubnetType.PRIVATE if self.is_internal else vpc.SubnetType.PUBLIC
@@ -85,6 +118,17 @@ class Alb(pulumi.ComponentResource):
         self.https_listener = self.create_https_listener()
         self.redirect_listener = self.create_port_80_redirect_listener()
 
+    def target_group_settings(self) -> dict:
+        """
+        The load balancing algorithm, slow start and deregistration delay from the AlbArgs, as lb.TargetGroup
+        arguments, so every target group behind a shared ALB is tuned the same way.
+        """
+        return dict(
+            load_balancing_algorithm_type=self.args.load_balancing_algorithm,
+            slow_start=self.args.slow_start,
+            deregistration_delay=self.args.deregistration_delay,
+        )
+
     def create_loadbalancer(self)-> lb.LoadBalancer:
 
         alb_security_group = ec2.SecurityGroup(
@@ -112,7 +156,7 @@ class Alb(pulumi.ComponentResource):
 
         self.add_ingress_rules_to_security_group(security_group=alb_security_group)
 
-        current = aws.get_caller_identity()
+        current = invoke_cache.invoke(aws.get_caller_identity)
 
         alb = lb.LoadBalancer(
             self.namespace,
@@ -121,6 +165,7 @@ class Alb(pulumi.ComponentResource):
             security_groups=[alb_security_group.id],
             subnets=self.subnet_ids,
             enable_deletion_protection=self.args.should_protect,
+            idle_timeout=self.args.idle_timeout,
             access_logs=lb.LoadBalancerAccessLogsArgs(
                 bucket=f"loadbalancer-logs-{current.account_id}",
                 prefix=self.namespace,
@@ -157,6 +202,36 @@ class Alb(pulumi.ComponentResource):
         )
         return https_listener
 
+    def create_test_listener(self, port: int, target_group: lb.TargetGroup, ingress_cidrs: Sequence[str]):
+        """
+        Create an HTTPS listener on `port` that forwards to `target_group`, for blue/green deployments to send
+        test traffic to replacement tasks before they receive production traffic. Only `ingress_cidrs` can reach it.
+        The deployment controller swaps its target group, so changes to its default action are ignored.
+        """
+        self.test_ingress = ec2.SecurityGroupRule(
+            qualify_component_name("test_listener_ingress", self.kwargs),
+            description="Blue/green test traffic",
+            type="ingress",
+            from_port=port,
+            to_port=port,
+            protocol="tcp",
+            cidr_blocks=list(ingress_cidrs),
+            security_group_id=self.security_group.id,
+        )
+        self.test_listener = lb.Listener(
+            f"{self.namespace}-test-listener",
+            load_balancer_arn=self.alb.arn,
+            port=port,
+            certificate_arn=self.args.certificate_arn,
+            protocol="HTTPS",
+            ssl_policy="ELBSecurityPolicy-TLS13-1-2-Res-PQ-2025-09",
+            default_actions=[
+                lb.ListenerDefaultActionArgs(type="forward", target_group_arn=target_group.arn)
+            ],
+            opts=pulumi.ResourceOptions(parent=self, ignore_changes=["defaultActions"]),
+        )
+        return self.test_listener
+
     def create_port_80_redirect_listener(self):
         """
         Create a listener that redirects all requests on port 80 to the HTTPS listener.
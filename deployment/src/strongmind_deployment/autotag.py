@@ -3,9 +3,9 @@
 import os
 from strongmind_deployment.taggable import is_taggable
 import pulumi
-import subprocess
 
 from strongmind_deployment.operations import get_code_owner_team_name
+from strongmind_deployment.repository import get_repository_name
 
 
 ########################
@@ -93,19 +93,7 @@ def get_repo_name():
     """
     Get the repository name from the current git repository.
     """
-    try:
-        result = subprocess.run(
-            ["basename $(git rev-parse --show-toplevel)"],
-            capture_output=True,
-            text=True,
-            shell=True,
-        )
-        return f"{result.stdout.strip()}"
-    except Exception as e:
-        print(
-            f"ERROR fetching git repository. Please set this in 'add_standard_billing_tags': {e}"
-        )
-        return "notset"
+    return get_repository_name()
 
 
 # registerAutoTags registers a global stack transformation that merges a set
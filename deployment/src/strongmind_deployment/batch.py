@@ -2,10 +2,12 @@ import pulumi
 import pulumi_aws as aws
 import json
 import os
-import subprocess
 from pulumi_aws import cloudwatch
 import sys
+from strongmind_deployment import invoke_cache
+from strongmind_deployment.repository import get_owning_team
 from strongmind_deployment.secrets import SecretsComponent
+from strongmind_deployment.util import validate_cpu_architecture, validate_fargate_spot_architecture
 
 class BatchComponent(pulumi.ComponentResource):
     def __init__(self, name, **kwargs):
@@ -19,6 +21,13 @@ class BatchComponent(pulumi.ComponentResource):
         self.command = self.kwargs.get('command', ["echo", "hello world"])
         self.cron = self.kwargs.get('cron', 'cron(0 0 * * ? *)')
         self.secrets = self.kwargs.get('secrets', [])
+        self.use_fargate_spot = self.kwargs.get('use_fargate_spot', False)
+        self.spot_env = None
+        self.cpu_architecture = self.kwargs.get('cpu_architecture')
+        if self.cpu_architecture:
+            self.cpu_architecture = validate_cpu_architecture(self.cpu_architecture)
+        if self.use_fargate_spot:
+            validate_fargate_spot_architecture(self.cpu_architecture, "use_fargate_spot")
 
 
         stack = pulumi.get_stack()
@@ -27,9 +36,7 @@ class BatchComponent(pulumi.ComponentResource):
         project = pulumi.get_project()
         self.project_stack = f"{project}-{stack}"
 
-        git_root = subprocess.check_output(['git', 'rev-parse', '--show-toplevel'], cwd=".").decode('utf-8').strip()
-        with open(f'{git_root}/CODEOWNERS', 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         tags = {
             "product": project,
@@ -39,13 +46,11 @@ class BatchComponent(pulumi.ComponentResource):
             "owner": owning_team,
         }
 
-        default_vpc = aws.ec2.get_vpc(default="true")
-
-        default_vpc = aws.ec2.get_vpc(default=True)
-        security_group  = aws.ec2.get_security_group(name="default", vpc_id=default_vpc.id)
+        default_vpc = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+        security_group = invoke_cache.invoke(aws.ec2.get_security_group, name="default", vpc_id=default_vpc.id)
         default_sec_group = []
         default_sec_group.append(security_group.id) 
-        default_subnets = aws.ec2.get_subnets(filters=[aws.ec2.GetSubnetsFilterArgs(
+        default_subnets = invoke_cache.invoke(aws.ec2.get_subnets, filters=[aws.ec2.GetSubnetsFilterArgs(
             name="vpc-id",
             values=[default_vpc.id]
         )])
@@ -129,10 +134,27 @@ class BatchComponent(pulumi.ComponentResource):
             service_role=self.execution_role.arn,
             )
 
+        compute_environments = [self.create_env]
+        if self.use_fargate_spot:
+            # Jobs are placed on Spot capacity first and fall back to on-demand Fargate when there is none.
+            self.spot_env = aws.batch.ComputeEnvironment(f"{self.project_stack}-batch-spot",
+                compute_environment_name=f"{self.project_stack}-batch-spot",
+                compute_resources=aws.batch.ComputeEnvironmentComputeResourcesArgs(
+                    max_vcpus=self.max_vcpus,
+                    security_group_ids=default_sec_group,
+                    subnets=default_subnets.ids,
+                    type="FARGATE_SPOT",
+                    ),
+                type="MANAGED",
+                tags=tags,
+                service_role=self.execution_role.arn,
+                )
+            compute_environments.insert(0, self.spot_env)
+
         self.queue = aws.batch.JobQueue(f"{self.project_stack}-queue",
             name=f"{self.project_stack}-queue",
-            opts=pulumi.ResourceOptions(parent=self, depends_on=[self.create_env]),
-            compute_environments=[self.create_env.arn],
+            opts=pulumi.ResourceOptions(parent=self, depends_on=compute_environments),
+            compute_environments=[compute_environment.arn for compute_environment in compute_environments],
             priority=1,
             state="ENABLED",
             tags=tags,
@@ -178,7 +200,8 @@ class BatchComponent(pulumi.ComponentResource):
                     "awslogs-stream-prefix": "batch"
                 }
             },
-            "secrets": args["secretsList"]
+            "secrets": args["secretsList"],
+            **self.runtime_platform()
         }))
 
         self.definition = aws.batch.JobDefinition(
@@ -208,4 +231,9 @@ class BatchComponent(pulumi.ComponentResource):
                 job_name=self.definition.name,
                 job_attempts=1
                 ),
-        )
\ No newline at end of file
+        )
+
+    def runtime_platform(self):
+        if not self.cpu_architecture:
+            return {}
+        return {"runtimePlatform": {"cpuArchitecture": self.cpu_architecture, "operatingSystemFamily": "LINUX"}}
@@ -0,0 +1,184 @@
+import json
+import ssl
+import time
+import urllib.error
+import urllib.request
+from typing import Optional
+
+import boto3
+import pulumi
+from pulumi import ResourceOptions
+
+DEFAULT_TIMEOUT = 3600
+DEFAULT_POLL_INTERVAL = 15
+WARMUP_REQUEST_TIMEOUT = 30
+# CodeDeploy holds a deployment in Ready while it waits for continue_deployment
+READY_STATUS = "Ready"
+SUCCEEDED_STATUS = "Succeeded"
+FAILED_STATUSES = ("Failed", "Stopped")
+
+
+def appspec(task_definition_arn, container_name, container_port):
+    """
+    The AppSpec content of an ECS blue/green deployment of `task_definition_arn`, receiving load balancer
+    traffic on `container_name`:`container_port`.
+    """
+    return json.dumps({
+        "version": 0.0,
+        "Resources": [{
+            "TargetService": {
+                "Type": "AWS::ECS::Service",
+                "Properties": {
+                    "TaskDefinition": task_definition_arn,
+                    "LoadBalancerInfo": {
+                        "ContainerName": container_name,
+                        "ContainerPort": int(container_port),
+                    },
+                },
+            },
+        }],
+    })
+
+
+def http_get(url):
+    """
+    Requests `url` through the test listener and returns the status code. The test listener serves the
+    application's certificate on the load balancer's own DNS name, so the host name is not checked.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    try:
+        with urllib.request.urlopen(url, timeout=WARMUP_REQUEST_TIMEOUT, context=context) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+class BlueGreenDeploymentInputs:
+    application_name: pulumi.Input[str]
+    deployment_group_name: pulumi.Input[str]
+    task_definition_arn: pulumi.Input[str]
+    container_name: pulumi.Input[str]
+    container_port: pulumi.Input[int]
+    test_url: pulumi.Input[str]
+    warmup_paths: pulumi.Input[list]
+    warmup_seconds: pulumi.Input[int]
+    timeout: pulumi.Input[int]
+    poll_interval: pulumi.Input[float]
+    region: pulumi.Input[str]
+    profile: pulumi.Input[str]
+    codedeploy_client: pulumi.Input[boto3.client]
+    http_get: pulumi.Input[object]
+
+    def __init__(self, application_name, deployment_group_name, task_definition_arn, container_name, container_port,
+                 test_url=None, warmup_paths=None, warmup_seconds=0, timeout=DEFAULT_TIMEOUT,
+                 poll_interval=DEFAULT_POLL_INTERVAL, region=None, profile=None, codedeploy_client=None,
+                 http_get=None):
+        self.application_name = application_name
+        self.deployment_group_name = deployment_group_name
+        self.task_definition_arn = task_definition_arn
+        self.container_name = container_name
+        self.container_port = container_port
+        self.test_url = test_url
+        self.warmup_paths = warmup_paths
+        self.warmup_seconds = warmup_seconds
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.region = region
+        self.profile = profile
+        self.codedeploy_client = codedeploy_client
+        self.http_get = http_get
+
+
+class BlueGreenDeploymentProvider(pulumi.dynamic.ResourceProvider):
+    def create(self, props):
+        # A new service already runs the task definition it was created with.
+        return pulumi.dynamic.CreateResult(id_="0", outs={**props, "deployment_id": None, "status": None})
+
+    def update(self, id, _olds, props):
+        return pulumi.dynamic.UpdateResult(outs={**props, **self.deploy(props)})
+
+    def diff(self, _id: str, olds, news):
+        return pulumi.dynamic.DiffResult(changes=news.get('task_definition_arn') != olds.get('task_definition_arn'))
+
+    def deploy(self, inputs, sleep=time.sleep, clock=time.monotonic):
+        """
+        Starts a CodeDeploy deployment of the new task definition and waits for it to finish.
+        While the deployment is Ready, with the replacement tasks behind the test listener only, the warm-up
+        paths are requested for warmup_seconds and the deployment is then continued to production traffic.
+        Raises if the deployment fails, is rolled back or does not finish within timeout seconds.
+        CodeDeploy is called with the region and profile of the stack's aws provider, passed in as inputs.
+        """
+        client = inputs.get('codedeploy_client') or boto3.Session(profile_name=inputs.get('profile')).client(
+            'codedeploy', region_name=inputs.get('region'))
+        deployment_id = client.create_deployment(
+            applicationName=inputs['application_name'],
+            deploymentGroupName=inputs['deployment_group_name'],
+            revision={
+                "revisionType": "AppSpecContent",
+                "appSpecContent": {"content": appspec(inputs['task_definition_arn'], inputs['container_name'],
+                                                      inputs['container_port'])},
+            },
+            description=f"Deploy {inputs['task_definition_arn']}",
+        )['deploymentId']
+        print(f"Started blue/green deployment {deployment_id}")
+
+        timeout = inputs.get('timeout') or DEFAULT_TIMEOUT
+        deadline = clock() + timeout
+        warmed_up = False
+        while True:
+            deployment = client.get_deployment(deploymentId=deployment_id)['deploymentInfo']
+            status = deployment['status']
+            if status == SUCCEEDED_STATUS:
+                return {"deployment_id": deployment_id, "status": status}
+            if status in FAILED_STATUSES:
+                message = deployment.get('errorInformation', {}).get('message', '')
+                raise Exception(f"Blue/green deployment {deployment_id} {status.lower()}: {message}")
+            if status == READY_STATUS and not warmed_up:
+                self.warm_up(inputs, sleep=sleep, clock=clock)
+                client.continue_deployment(deploymentId=deployment_id, deploymentWaitType="READY_WAIT")
+                warmed_up = True
+            if clock() >= deadline:
+                client.stop_deployment(deploymentId=deployment_id, autoRollbackEnabled=True)
+                raise Exception(f"Blue/green deployment {deployment_id} did not finish within {timeout} seconds")
+            sleep(inputs.get('poll_interval') or DEFAULT_POLL_INTERVAL)
+
+    def warm_up(self, inputs, sleep=time.sleep, clock=time.monotonic):
+        """
+        Requests every warm-up path through the test listener, round after round, for warmup_seconds.
+        Returns the number of responses by status code.
+        """
+        get = inputs.get('http_get') or http_get
+        paths = inputs.get('warmup_paths') or []
+        seconds = inputs.get('warmup_seconds') or 0
+        responses = {}
+        if not paths or not inputs.get('test_url'):
+            return responses
+        deadline = clock() + seconds
+        while True:
+            for path in paths:
+                status = get(f"{inputs['test_url']}{path}")
+                responses[status] = responses.get(status, 0) + 1
+            if clock() >= deadline:
+                break
+            sleep(1)
+        print(f"Warmed up the replacement tasks with {sum(responses.values())} requests: {responses}")
+        return responses
+
+
+class BlueGreenDeployment(pulumi.dynamic.Resource):
+    deployment_id: pulumi.Output[str]
+    status: pulumi.Output[str]
+
+    def __init__(self, name: str, props: BlueGreenDeploymentInputs, opts: Optional[ResourceOptions] = None):
+        """
+        Deploys each new revision of a task definition to an ECS service on the CODE_DEPLOY deployment
+        controller, through a CodeDeploy blue/green deployment.
+
+        Exposes the `deployment_id` and final `status` of the last deployment.
+        """
+        super().__init__(BlueGreenDeploymentProvider(), name,
+                         {**vars(props), "deployment_id": None, "status": None},
+                         opts)
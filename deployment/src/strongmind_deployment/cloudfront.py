@@ -1,7 +1,12 @@
+import json
+import time
+
+import boto3
 import pulumi
 import pulumi_aws as aws
 from pulumi_cloudflare import get_zone, Record
 from pulumi import Output
+from strongmind_deployment.repository import get_owning_team
 from strongmind_deployment.storage import StorageComponent
 import re
 import os
@@ -13,8 +18,87 @@ The required parameters for the project name and fqdn. DistributionComponent(nam
 
 """
 
+# min_ttl, default_ttl and max_ttl of each caching profile
+CACHE_PROFILES = {
+    # Content-hashed bundles never change under the same name
+    "immutable": (31536000, 31536000, 31536000),
+    # Entry points such as index.html, which name the current bundles
+    "short": (0, 60, 300),
+    # Whatever Cache-Control the objects were uploaded with, a day without one
+    "origin": (0, 86400, 31536000),
+    "none": (0, 0, 0),
+}
+DEFAULT_CACHE_PROFILE = "short"
+DEFAULT_ROOT_OBJECT = "index.html"
+# CloudFront allows 15 wildcard invalidation paths in progress at a time
+MAX_INVALIDATION_PATHS = 15
+
+
+def _parent(path):
+    """
+    The directory a path is widened to: "/a/b.js" -> "/a/", "/a/*" -> "/".
+    """
+    return path.rstrip("*").rstrip("/").rsplit("/", 1)[0] + "/"
+
+
+def invalidation_paths(changed_paths, max_paths=MAX_INVALIDATION_PATHS):
+    """
+    Groups changed object keys into at most `max_paths` invalidation paths. The deepest directory with the most
+    changes is replaced by a wildcard first, so a deploy that rewrites a whole bundle directory costs one path.
+    """
+    paths = {"/" + path.lstrip("/") for path in changed_paths}
+    while len(paths) > max_paths:
+        depth = max(_parent(path).count("/") for path in paths)
+        parents = [_parent(path) for path in paths if _parent(path).count("/") == depth]
+        widest = max(sorted(set(parents)), key=parents.count)
+        paths = {f"{widest}*" if _parent(path) == widest else path for path in paths}
+    wildcards = [path[:-1] for path in paths if path.endswith("/*")]
+    return sorted(path for path in paths
+                  if not any(path != f"{prefix}*" and path.startswith(prefix) for prefix in wildcards))
+
+
+def create_invalidation(distribution_id, changed_paths, max_paths=MAX_INVALIDATION_PATHS, cloudfront_client=None):
+    """
+    Invalidates `changed_paths`, grouped by invalidation_paths, as a single invalidation batch.
+    Meant for deploy scripts to call after uploading new content. Returns the invalidation id, or None when
+    nothing changed.
+    """
+    paths = invalidation_paths(changed_paths, max_paths)
+    if not paths:
+        return None
+    client = cloudfront_client or boto3.client('cloudfront')
+    response = client.create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": paths},
+            "CallerReference": f"{distribution_id}-{time.time_ns()}",
+        },
+    )
+    return response["Invalidation"]["Id"]
+
+
 class DistributionComponent(pulumi.ComponentResource):
     def __init__(self,name, **kwargs):
+        """
+        Resource that produces an S3 bucket served through a CloudFront distribution at `fqdn`.
+
+        :key fqdn: The domain name of the distribution. Required.
+        :key zone_id: The Cloudflare zone of fqdn.
+        :key cache_behaviors: A dictionary of path pattern to caching profile, either a name from CACHE_PROFILES or a
+                              (min_ttl, default_ttl, max_ttl) tuple,
+                              e.g. `{"/static/*": "immutable", "/index.html": "short"}`. Defaults to `{}`.
+        :key default_cache_profile: The caching profile of every other path, including the site root `/`, which
+                                    CloudFront matches before substituting index.html. Defaults to "short", so a
+                                    deploy is visible within five minutes; opt long-lived paths into "immutable" or
+                                    "origin" through cache_behaviors.
+        :key root_object_cache_profile: The caching profile of the default root object, index.html, which names the
+                                        current bundles. Defaults to "short"; a cache_behaviors entry for
+                                        "/index.html" takes precedence.
+        :key public_bucket: Whether the bucket stays publicly readable instead of using origin access control.
+                            Defaults to False: the bucket is private and only the distribution can read it. This
+                            changes existing distributions, whose buckets used to be public: pass True to keep
+                            serving objects straight from S3.
+        """
 
         super().__init__("custom:module:DistributionComponent", name, {})
         self.kwargs = kwargs
@@ -24,26 +108,10 @@ class DistributionComponent(pulumi.ComponentResource):
         fqdn_prefix = self.fqdn.split('.')[:2]
         fqdn_prefix = '.'.join(fqdn_prefix)
         fqdn_prefix = fqdn_prefix.replace('.', '-')
-        bucket = StorageComponent(fqdn_prefix, storage_private=False)
-        public_bucket_policy_document = aws.iam.get_policy_document_output(statements=[
-          aws.iam.GetPolicyDocumentStatementArgs(
-            principals=[aws.iam.GetPolicyDocumentStatementPrincipalArgs(
-              type="AWS",
-              identifiers=["*"],
-            )],
-          actions=[
-            "s3:GetObject",
-            "s3:ListBucket",
-          ],
-          resources=[
-            bucket.bucket.arn,
-            bucket.bucket.arn.apply(lambda arn: f"{arn}/*"),
-          ],
-         ),
-        ])
-        public_bucket_policy = aws.s3.BucketPolicy("public_bucket_policy",
-        bucket=bucket.bucket.id,
-        policy=public_bucket_policy_document.json)        
+        self.public_bucket = kwargs.get('public_bucket', False)
+        self.cache_policies = {}
+        self.origin_access_control = None
+        bucket = StorageComponent(fqdn_prefix, storage_private=not self.public_bucket)
 
         bucket_cors_configuration_v2 = aws.s3.BucketCorsConfigurationV2("s3_cors",
           bucket=bucket.bucket.id,
@@ -68,8 +136,7 @@ class DistributionComponent(pulumi.ComponentResource):
         self.env_name = os.environ.get('ENVIRONMENT_NAME', 'stage')
         project = pulumi.get_project()
         stack = pulumi.get_stack()
-        with open('../CODEOWNERS', 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         self.tags = {
             "product": project,
@@ -80,15 +147,40 @@ class DistributionComponent(pulumi.ComponentResource):
         }
 
         self.dns()
-        cache_policy = aws.cloudfront.get_cache_policy(name="Managed-CachingOptimized")
+        if not self.public_bucket:
+            self.origin_access_control = aws.cloudfront.OriginAccessControl(f"{fqdn_prefix}-oac",
+              name=f"{fqdn_prefix}-oac",
+              origin_access_control_origin_type="s3",
+              signing_behavior="always",
+              signing_protocol="sigv4",
+              opts=pulumi.ResourceOptions(parent=self),
+            )
+        cache_behaviors = {f"/{DEFAULT_ROOT_OBJECT}": kwargs.get('root_object_cache_profile', "short"),
+                           **kwargs.get('cache_behaviors', {})}
+        ordered_cache_behaviors = [
+          aws.cloudfront.DistributionOrderedCacheBehaviorArgs(
+            path_pattern=path_pattern,
+            cache_policy_id=self.cache_policy(fqdn_prefix, profile).id,
+            allowed_methods=["GET", "HEAD", "OPTIONS"],
+            cached_methods=["GET", "HEAD"],
+            target_origin_id=origin_id,
+            viewer_protocol_policy="redirect-to-https",
+            compress=True,
+            response_headers_policy_id=cors_with_preflight_policy_id,
+          )
+          for path_pattern, profile in cache_behaviors.items()
+        ]
+        default_cache_policy = self.cache_policy(fqdn_prefix, kwargs.get('default_cache_profile', DEFAULT_CACHE_PROFILE))
         self.distribution = aws.cloudfront.Distribution(f"{fqdn_prefix}-distribution",
           opts=pulumi.ResourceOptions(parent=self),
           enabled=True,
+          http_version="http2and3",
           origins=[aws.cloudfront.DistributionOriginArgs(
             domain_name=origin_domain,
             origin_id=origin_id,
+            origin_access_control_id=self.origin_access_control.id if self.origin_access_control else None,
           )],
-          default_root_object="index.html",
+          default_root_object=DEFAULT_ROOT_OBJECT,
           aliases=[kwargs.get('fqdn', None)],
           viewer_certificate=aws.cloudfront.DistributionViewerCertificateArgs(
             acm_certificate_arn=self.cert_validation_cert.certificate_arn,
@@ -97,16 +189,14 @@ class DistributionComponent(pulumi.ComponentResource):
             cloudfront_default_certificate=True),
           comment="",
           price_class="PriceClass_All",
+          ordered_cache_behaviors=ordered_cache_behaviors,
           default_cache_behavior=aws.cloudfront.DistributionDefaultCacheBehaviorArgs(
-            cache_policy_id=cache_policy.id,
-            allowed_methods=["GET", "HEAD", "OPTIONS", "PUT", "PATCH", "POST", "DELETE"],
+            cache_policy_id=default_cache_policy.id,
+            allowed_methods=["GET", "HEAD", "OPTIONS"],
             cached_methods=["GET", "HEAD"],
             target_origin_id=origin_id,
             viewer_protocol_policy="redirect-to-https",
             compress=True,
-            default_ttl=0,
-            max_ttl=0,
-            min_ttl=0,
             response_headers_policy_id=cors_with_preflight_policy_id,
           ),
           restrictions=aws.cloudfront.DistributionRestrictionsArgs(
@@ -116,8 +206,79 @@ class DistributionComponent(pulumi.ComponentResource):
           ),
           tags=self.tags,
 )
+        # One logical policy for both modes: S3 keeps a single policy per bucket, so switching an existing stack
+        # between a public bucket and origin access control must update it in place, not replace it under a new name
+        self.bucket_policy = aws.s3.BucketPolicy("bucket_policy",
+          bucket=bucket.bucket.id,
+          policy=self.public_bucket_policy(bucket) if self.public_bucket else self.distribution_bucket_policy(bucket),
+          opts=pulumi.ResourceOptions(aliases=[pulumi.Alias(name="public_bucket_policy")]),
+        )
         self.cname(distribution_domain_name=self.distribution.domain_name)
 
+    def cache_policy(self, fqdn_prefix, profile):
+        """
+        The cache policy of a caching profile, created once per distinct set of TTLs. Query strings, headers and
+        cookies are left out of the cache key; Brotli and gzip are included so compressed objects are cached,
+        except when nothing is cached at all, which CloudFront only accepts without them.
+        """
+        min_ttl, default_ttl, max_ttl = CACHE_PROFILES[profile] if isinstance(profile, str) else profile
+        cached = max_ttl > 0
+        key = f"{min_ttl}-{default_ttl}-{max_ttl}"
+        if key not in self.cache_policies:
+            policy_name = f"{fqdn_prefix}-{profile if isinstance(profile, str) else key}"
+            self.cache_policies[key] = aws.cloudfront.CachePolicy(policy_name,
+              name=policy_name,
+              min_ttl=min_ttl,
+              default_ttl=default_ttl,
+              max_ttl=max_ttl,
+              parameters_in_cache_key_and_forwarded_to_origin=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginArgs(
+                cookies_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginCookiesConfigArgs(
+                  cookie_behavior="none",
+                ),
+                headers_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginHeadersConfigArgs(
+                  header_behavior="none",
+                ),
+                query_strings_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginQueryStringsConfigArgs(
+                  query_string_behavior="none",
+                ),
+                enable_accept_encoding_brotli=cached,
+                enable_accept_encoding_gzip=cached,
+              ),
+              opts=pulumi.ResourceOptions(parent=self),
+            )
+        return self.cache_policies[key]
+
+    def public_bucket_policy(self, bucket):
+        return aws.iam.get_policy_document_output(statements=[
+          aws.iam.GetPolicyDocumentStatementArgs(
+            principals=[aws.iam.GetPolicyDocumentStatementPrincipalArgs(
+              type="AWS",
+              identifiers=["*"],
+            )],
+          actions=[
+            "s3:GetObject",
+            "s3:ListBucket",
+          ],
+          resources=[
+            bucket.bucket.arn,
+            bucket.bucket.arn.apply(lambda arn: f"{arn}/*"),
+          ],
+         ),
+        ]).json
+
+    def distribution_bucket_policy(self, bucket):
+        return Output.all(bucket.bucket.arn, self.distribution.arn).apply(lambda args: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+              "Sid": "AllowCloudFrontRead",
+              "Effect": "Allow",
+              "Principal": {"Service": "cloudfront.amazonaws.com"},
+              "Action": "s3:GetObject",
+              "Resource": f"{args[0]}/*",
+              "Condition": {"StringEquals": {"AWS:SourceArn": args[1]}},
+            }],
+          }))
+
     def dns(self):
      
         aws_east_1 = aws.Provider("aws-east-1", region="us-east-1")
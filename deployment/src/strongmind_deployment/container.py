@@ -1,7 +1,6 @@
 import json
 import os
 import re
-import subprocess
 from datetime import datetime, timezone, timedelta
 
 import pulumi
@@ -12,9 +11,25 @@ from pulumi_awsx.awsx import DefaultRoleWithPolicyArgs
 from pulumi_cloudflare import Record
 
 from strongmind_deployment import alb
+from strongmind_deployment import blue_green
+from strongmind_deployment import invoke_cache
 from strongmind_deployment import operations
-from strongmind_deployment.util import create_ecs_cluster, qualify_component_name
-from strongmind_deployment.worker_autoscale import WorkerAutoscaleComponent
+from strongmind_deployment.repository import get_owning_team
+from strongmind_deployment.util import create_ecs_cluster, fargate_capacity_provider_strategies, \
+    qualify_component_name, use_capacity_provider_strategies, use_code_deploy_controller, validate_cpu_architecture, \
+    validate_fargate_spot_architecture
+from strongmind_deployment.worker_autoscale import WorkerAutoscaleComponent, STEP_SCALING, TARGET_TRACKING_SCALING
+
+DEFAULT_MAX_CAPACITY = 100
+DEFAULT_CPU_UTILIZATION_TARGET = 60
+DEFAULT_STATIC_ASSET_PATHS = ["/assets/*", "/packs/*"]
+IMMUTABLE_ASSET_TTL = 31536000
+DEFAULT_HEALTH_CHECK_GRACE_PERIOD = 600
+DEFAULT_CONTAINER_HEALTH_CHECK = {"interval": 10, "timeout": 5, "retries": 3, "start_period": 30}
+CONTAINER_DEPENDENCY_CONDITIONS = ("START", "COMPLETE", "SUCCESS", "HEALTHY")
+ROLLING_DEPLOYMENT = "rolling"
+BLUE_GREEN_DEPLOYMENT = "blue_green"
+DEFAULT_TEST_LISTENER_PORT = 8443
 
 
 class ContainerComponent(pulumi.ComponentResource):
@@ -37,6 +52,25 @@ class ContainerComponent(pulumi.ComponentResource):
         - name: The name of the secret.
         - value_from: The ARN of the secret.
         :key custom_health_check_path: The path to use for the health check. Defaults to `/up`.
+        :key health_check_interval: Seconds between load balancer health checks. Defaults to 30.
+        :key health_check_timeout: Seconds a load balancer health check waits for a response, less than
+                                   health_check_interval. Defaults to 5, or health_check_interval - 1 when the
+                                   interval is 5 seconds.
+        :key healthy_threshold: Consecutive passing health checks before a task receives traffic. Defaults to 2, so a
+                                ready task gets traffic within 2 * health_check_interval seconds.
+        :key unhealthy_threshold: Consecutive failing health checks before a task is taken out of service. Defaults to 2.
+        :key container_health_check: A health check ECS runs inside the main container, so ECS replaces a task that
+                                     never becomes ready instead of waiting out the grace period. Either True to curl
+                                     the health check path on container_port (the image must include curl) or a
+                                     dictionary of `command`, `interval`, `timeout`, `retries` and `start_period`.
+                                     Defaults to None.
+        :key health_check_grace_period: Seconds ECS ignores load balancer health checks after a task starts.
+                                        Defaults to the worst case of container_health_check
+                                        (start_period + interval * retries) when set, or 600 otherwise.
+        :key container_depends_on: A dictionary of sidecar container name to the condition the main container waits
+                                   for before starting, "START", "COMPLETE", "SUCCESS" or "HEALTHY",
+                                   e.g. `{"datadog-agent": "HEALTHY"}`. HEALTHY requires the sidecar to have a
+                                   health_check. Defaults to {}.
         :key autoscale_threshold The amount of allowable TargetResponseTime before we scale.
         :key use_cloudfront: Whether to create a CloudFront distribution in front of the ALB. Defaults to False.
         :key scheduled_scaling: Whether to enable time-based scaling. Defaults to False.
@@ -44,6 +78,16 @@ class ContainerComponent(pulumi.ComponentResource):
         :key post_scale_time: MST time to end peak hours (format: "HH:MM"). Required if scheduled_scaling is True.
         :key peak_min_capacity: Minimum capacity during peak hours. Required if scheduled_scaling is True.
         :key desired_web_count: Minimum capacity during off-peak hours. Defaults to 1.
+        :key max_number_of_instances: Maximum capacity of the autoscaling target. Defaults to 100.
+        :key autoscale_mode: "step" scales on p95 TargetResponseTime alarms, one to three tasks at a time.
+                             "target_tracking" keeps ALBRequestCountPerTarget and/or average CPU at a target,
+                             scaling in proportion to the load. Defaults to "step".
+        :key autoscale_request_count_per_target: Requests per task per minute to track in target_tracking mode.
+                                                 Defaults to None (not tracked).
+        :key autoscale_cpu_utilization: Average service CPU percentage to track in target_tracking mode.
+                                        Defaults to 60; None to only track requests.
+        :key autoscale_scale_out_cooldown: Seconds after a target tracking scale-out before the next. Defaults to 60.
+        :key autoscale_scale_in_cooldown: Seconds after a target tracking scale-in before the next. Defaults to 300.
         :key additional_domain_aliases: Optional list of additional domain names to be included in the CloudFront distribution's 
                                       certificate and aliases. Each domain should be a full domain name 
                                       (e.g., ["enrollment.strongmind.com"]). These domains will be added to the certificate's 
@@ -65,6 +109,61 @@ class ContainerComponent(pulumi.ComponentResource):
         :key nat_gateway_cidrs: Tuple of two CIDR blocks for private subnets when use_nat_gateway is True.
                                Must not overlap with existing subnets in the VPC.
                                Defaults to ("172.31.128.0/20", "172.31.144.0/20").
+        :key assets_bucket: An S3 bucket (e.g. StorageComponent.bucket) holding precompiled assets under `assets/`.
+                            When set, the CloudFront distribution serves `/assets/*` from the bucket through an
+                            origin access control instead of from the containers. Defaults to None.
+        :key static_asset_paths: CloudFront path patterns of fingerprinted static files, cached for static_asset_ttl
+                                 whatever cache headers the containers send, and compressed with Brotli or gzip.
+                                 Query strings, cookies and headers are not forwarded for them.
+                                 Defaults to ["/assets/*", "/packs/*"]; `/assets/*` is served from assets_bucket when set.
+        :key static_asset_ttl: Seconds CloudFront caches static_asset_paths for. Defaults to a year.
+        :key origin_shield_region: The region of a CloudFront Origin Shield in front of the load balancer and assets
+                                   bucket, e.g. "us-west-2", so edge caches refill from one regional cache instead
+                                   of the containers. Defaults to None (no Origin Shield).
+        :key fargate_spot_weight: Run the service on a capacity provider strategy, weighting FARGATE_SPOT by this
+                                  against on-demand FARGATE, e.g. 3 for three Spot tasks per on-demand task.
+                                  Spot tasks can be interrupted, so this suits workers rather than web services.
+                                  Setting or removing it on an existing service replaces the ECS service: the old
+                                  service is deleted first, so its tasks stop until the new ones start.
+                                  Defaults to None (on-demand FARGATE only).
+        :key fargate_base: Tasks always run on on-demand FARGATE when fargate_spot_weight is set. Defaults to 1.
+        :key fargate_weight: The weight of on-demand FARGATE when fargate_spot_weight is set. Defaults to 1.
+        :key cpu_architecture: The CPU architecture the tasks run on, "X86_64" or "ARM64" (Graviton). The container image
+                               must be built for it. ARM64 cannot be combined with fargate_spot_weight. Defaults to
+                               None, which leaves the task definition without a runtime platform and runs on X86_64.
+        :key load_balancing_algorithm: How the target group picks a task, "round_robin" or "least_outstanding_requests",
+                                       which routes each request to the task with the fewest in flight so slow requests
+                                       don't pile up on busy tasks. Defaults to "round_robin".
+        :key slow_start: Seconds, 30 to 900, over which a new task's share of traffic ramps up while its caches warm.
+                         Not supported with least_outstanding_requests. Defaults to 0 (off).
+        :key deregistration_delay: Seconds a draining task keeps serving in-flight requests. Defaults to 300.
+        :key idle_timeout: Seconds the load balancer keeps an idle connection open. Defaults to 60.
+        :key deployment_strategy: "rolling" replaces tasks through the ECS rolling deployment controller.
+                                  "blue_green" deploys through CodeDeploy: new tasks start behind a second target
+                                  group, are reachable on a test listener, then take all production traffic at once.
+                                  CodeDeploy rolls back automatically on a failed deployment or when the 5xx or latency
+                                  alarm fires. Requires a load balancer. Switching to blue_green replaces the ECS
+                                  service, deleting the old one first, so the web service is down until the new one
+                                  is running. Switching back to rolling replaces it too, and needs the blue_green
+                                  service deleted beforehand. Defaults to "rolling".
+        :key blue_green_test_port: The HTTPS port of the test listener in blue_green mode. Defaults to 8443.
+        :key blue_green_test_cidrs: CIDR blocks allowed to reach the test listener. Defaults to the CIDR block of the
+                                    default VPC, so unreleased tasks are not public; warm-up requests come from where
+                                    Pulumi runs, so blue_green_warmup_seconds needs that address listed here.
+        :key blue_green_warmup_paths: Paths requested through the test listener to warm up new tasks before they take
+                                      production traffic. Defaults to [custom_health_check_path].
+        :key blue_green_warmup_seconds: Seconds to keep requesting the warm-up paths. Defaults to 0: new tasks take
+                                        production traffic as soon as they are healthy.
+        :key blue_green_termination_wait: Minutes the previous tasks keep running after cutover so a rollback is
+                                          instant. Defaults to 5.
+        :key blue_green_5xx_threshold: Target 5xx responses per minute that roll a deployment back. Defaults to 10.
+        :key blue_green_latency_threshold: p95 TargetResponseTime, in seconds, that rolls a deployment back when
+                                           exceeded for two minutes. Defaults to 2.
+        :key blue_green_deployment_config: The CodeDeploy deployment configuration.
+                                           Defaults to "CodeDeployDefault.ECSAllAtOnce".
+        :key ecs_cluster_capacity_providers: The capacity provider registration of a passed in ecs_cluster, which
+                                             services on a strategy wait for. A passed in cluster must have
+                                             FARGATE_SPOT registered to use fargate_spot_weight.
         """
         super().__init__('strongmind:global_build:commons:container', name, None, opts)
         stack = pulumi.get_stack()
@@ -85,6 +184,9 @@ class ContainerComponent(pulumi.ComponentResource):
         self.nat_eip = None
         self.nat_gateway = None
         self._private_subnet_ids = None
+        self.assets_origin_access_control = None
+        self.assets_bucket_policy = None
+        self.static_assets_cache_policy = None
         self.ecs_cluster = kwargs.get('ecs_cluster')
         self.need_load_balancer = kwargs.get('need_load_balancer', True)
         self.container_image = kwargs.get('container_image')
@@ -101,8 +203,15 @@ class ContainerComponent(pulumi.ComponentResource):
         self.autoscaling_target = None
         self.autoscaling_out_policy = None
         self.autoscale_threshold = kwargs.get('autoscale_threshold', 5)
+        self.autoscale_mode = kwargs.get('autoscale_mode', STEP_SCALING)
+        self.autoscale_request_count_per_target = kwargs.get('autoscale_request_count_per_target')
+        self.autoscale_cpu_utilization = kwargs.get('autoscale_cpu_utilization', DEFAULT_CPU_UTILIZATION_TARGET)
+        self.autoscale_scale_out_cooldown = kwargs.get('autoscale_scale_out_cooldown', 60)
+        self.autoscale_scale_in_cooldown = kwargs.get('autoscale_scale_in_cooldown', 300)
+        self.request_count_scaling_policy = None
+        self.cpu_scaling_policy = None
         self.desired_count = kwargs.get('desired_count', 1)
-        self.max_capacity = 100
+        self.max_capacity = kwargs.get('max_number_of_instances', DEFAULT_MAX_CAPACITY)
         self.min_capacity = kwargs.get('desired_web_count', 1)
         self.sns_topic_arn = kwargs.get('sns_topic_arn')
         self.binary_sns_topic_arn = os.environ.get('BINARY_SNS_TOPIC_ARN')
@@ -115,16 +224,48 @@ class ContainerComponent(pulumi.ComponentResource):
         self.peak_min_capacity = kwargs.get('peak_min_capacity')
         self.use_nat_gateway = kwargs.get('use_nat_gateway', False)
         self.stop_timeout = kwargs.get('stop_timeout')
+        self.health_check_path = kwargs.get('custom_health_check_path', '/up')
+        self.health_check_interval = kwargs.get('health_check_interval', 30)
+        self.health_check_timeout = kwargs.get('health_check_timeout', min(5, self.health_check_interval - 1))
+        if self.health_check_timeout >= self.health_check_interval:
+            raise ValueError(f"health_check_timeout ({self.health_check_timeout}) must be less than "
+                             f"health_check_interval ({self.health_check_interval})")
+        self.healthy_threshold = kwargs.get('healthy_threshold', 2)
+        self.unhealthy_threshold = kwargs.get('unhealthy_threshold', 2)
+        self.container_health_check = self.container_health_check_settings(kwargs.get('container_health_check'))
+        self.health_check_grace_period = kwargs.get('health_check_grace_period', self.default_grace_period())
+        self.container_depends_on = kwargs.get('container_depends_on', {})
+        self.validate_container_depends_on()
+        self.deployment_strategy = kwargs.get('deployment_strategy', ROLLING_DEPLOYMENT)
+        if self.deployment_strategy not in (ROLLING_DEPLOYMENT, BLUE_GREEN_DEPLOYMENT):
+            raise ValueError(f"Unsupported deployment_strategy: {self.deployment_strategy}. "
+                             f"Use {ROLLING_DEPLOYMENT} or {BLUE_GREEN_DEPLOYMENT}")
+        if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT and not self.need_load_balancer:
+            raise ValueError("The blue_green deployment_strategy requires a load balancer")
+        self.green_target_group = None
+        self.test_listener = None
+        self.codedeploy_role = None
+        self.codedeploy_application = None
+        self.deployment_group = None
+        self.rollback_alarms = []
+        self.blue_green_deployment = None
+        self.cpu_architecture = kwargs.get('cpu_architecture')
+        if self.cpu_architecture:
+            self.cpu_architecture = validate_cpu_architecture(self.cpu_architecture)
+        self.fargate_spot_weight = kwargs.get('fargate_spot_weight')
+        if self.fargate_spot_weight:
+            validate_fargate_spot_architecture(self.cpu_architecture, "fargate_spot_weight")
+        self.fargate_base = kwargs.get('fargate_base', 1)
+        self.fargate_weight = kwargs.get('fargate_weight', 1)
+        self.capacity_provider_strategies = None
+        self.ecs_cluster_capacity_providers = kwargs.get('ecs_cluster_capacity_providers')
 
         project = pulumi.get_project()
         self.namespace = kwargs.get('namespace', f"{project}-{stack}")
         if name != 'container':
             self.namespace = f"{self.namespace}-{name}"
 
-        path = subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
-        file_path = f"{path}/CODEOWNERS"
-        with open(file_path, 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         self.tags = {
             "product": project,
@@ -351,6 +492,12 @@ class ContainerComponent(pulumi.ComponentResource):
             secrets=self.secrets,
             environment=[{"name": k, "value": v} for k, v in self.env_vars.items()],
             stop_timeout=self.stop_timeout,
+            health_check=awsx.ecs.TaskDefinitionHealthCheckArgs(
+                **self.container_health_check) if self.container_health_check else None,
+            depends_on=[
+                awsx.ecs.TaskDefinitionContainerDependencyArgs(container_name=container_name, condition=condition)
+                for container_name, condition in self.container_depends_on.items()
+            ] or None,
         )
 
         # Build task definition args - use 'containers' (plural) if we have sidecars, else 'container' (singular)
@@ -360,6 +507,11 @@ class ContainerComponent(pulumi.ComponentResource):
             "skip_destroy": True,
             "family": self.namespace,
         }
+        if self.cpu_architecture:
+            task_def_kwargs["runtime_platform"] = aws.ecs.TaskDefinitionRuntimePlatformArgs(
+                cpu_architecture=self.cpu_architecture,
+                operating_system_family="LINUX",
+            )
         
         # If we have sidecar containers, use 'containers' (plural), otherwise 'container' (singular)
         if self.sidecar_containers:
@@ -398,6 +550,7 @@ class ContainerComponent(pulumi.ComponentResource):
                         entry_point=sidecar.entry_point if hasattr(sidecar, 'entry_point') else None,
                         command=sidecar.command if hasattr(sidecar, 'command') else None,
                         port_mappings=sidecar.port_mappings if hasattr(sidecar, 'port_mappings') else None,
+                        health_check=sidecar.health_check if hasattr(sidecar, 'health_check') else None,
                     )
                     all_containers[sidecar.name] = updated_sidecar
                 else:
@@ -415,21 +568,35 @@ class ContainerComponent(pulumi.ComponentResource):
         
         # Build dependencies list including sidecar log groups
         service_dependencies = [self.logs] + self.sidecar_log_groups
-        
+        service_transforms = []
+        if self.fargate_spot_weight:
+            self.capacity_provider_strategies = fargate_capacity_provider_strategies(
+                self.fargate_spot_weight, base=self.fargate_base, weight=self.fargate_weight)
+            service_transforms.append(use_capacity_provider_strategies(self.capacity_provider_strategies))
+            if self.ecs_cluster_capacity_providers:
+                service_dependencies.append(self.ecs_cluster_capacity_providers)
+        if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT:
+            service_transforms.append(use_code_deploy_controller())
+
         fargate_service_kwargs = dict(
             name=self.namespace,
             desired_count=self.desired_count,
             cluster=self.ecs_cluster_arn,
             continue_before_steady_state=True,
-            health_check_grace_period_seconds=600 if self.need_load_balancer else None,
+            health_check_grace_period_seconds=self.health_check_grace_period if self.need_load_balancer else None,
             propagate_tags="SERVICE",
             enable_execute_command=True,
             task_definition_args=self.task_definition_args,
             deployment_maximum_percent=self.deployment_maximum_percent,
             tags=self.tags,
-            opts=pulumi.ResourceOptions(parent=self, ignore_changes=["desired_count"], depends_on=service_dependencies),
+            opts=pulumi.ResourceOptions(parent=self, ignore_changes=["desired_count"], depends_on=service_dependencies,
+                                        transforms=service_transforms),
         )
 
+        if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT:
+            fargate_service_kwargs['deployment_controller'] = aws.ecs.ServiceDeploymentControllerArgs(
+                type="CODE_DEPLOY")
+
         if self._private_subnet_ids:
             fargate_service_kwargs['network_configuration'] = aws.ecs.ServiceNetworkConfigurationArgs(
                 subnets=self._private_subnet_ids,
@@ -442,11 +609,16 @@ class ContainerComponent(pulumi.ComponentResource):
             qualify_component_name(f'{service_name}', self.kwargs),
             **fargate_service_kwargs,
         )
+        if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT:
+            self.setup_blue_green()
 
         if self.kwargs.get('autoscale'):
             self.autoscaling()
         if self.kwargs.get('worker_autoscale'):
-            self.worker_autoscaling = WorkerAutoscaleComponent(qualify_component_name("worker-autoscale", self.kwargs),
+            worker_autoscale_name = "worker-autoscale"
+            if self.kwargs.get('worker_pool'):
+                worker_autoscale_name = f"{self.kwargs['worker_pool']}-worker-autoscale"
+            self.worker_autoscaling = WorkerAutoscaleComponent(qualify_component_name(worker_autoscale_name, self.kwargs),
                                                                fargate_service=self.fargate_service,
                                                                opts=pulumi.ResourceOptions(
                                                                    parent=self,
@@ -529,7 +701,19 @@ class ContainerComponent(pulumi.ComponentResource):
             )
         )
 
+    def _validate_autoscale_mode(self):
+        if self.autoscale_mode not in (STEP_SCALING, TARGET_TRACKING_SCALING):
+            raise ValueError(f"autoscale_mode must be '{STEP_SCALING}' or '{TARGET_TRACKING_SCALING}'")
+        if self.autoscale_mode != TARGET_TRACKING_SCALING:
+            return
+        if self.autoscale_request_count_per_target is None and self.autoscale_cpu_utilization is None:
+            raise ValueError("autoscale_request_count_per_target or autoscale_cpu_utilization must be provided "
+                             "when autoscale_mode is target_tracking")
+        if self.autoscale_request_count_per_target is not None and not self.need_load_balancer:
+            raise ValueError("autoscale_request_count_per_target requires a load balancer")
+
     def autoscaling(self):
+        self._validate_autoscale_mode()
 
         fargate_service_id = self.fargate_service.service.id.apply(lambda x: x.split(":")[-1])
 
@@ -545,6 +729,82 @@ class ContainerComponent(pulumi.ComponentResource):
                 depends_on=[self.fargate_service]
             ),
         )
+        if self.autoscale_mode == TARGET_TRACKING_SCALING:
+            self._create_target_tracking_policies()
+        else:
+            self._create_step_scaling_policies()
+
+        self.running_tasks_alarm = aws.cloudwatch.MetricAlarm(
+            qualify_component_name("running_tasks_alarm", self.kwargs),
+            name=f"{self.namespace}-running-tasks-alarm",
+            comparison_operator="GreaterThanOrEqualToThreshold",
+            evaluation_periods=1,
+            metric_name="RunningTaskCount",
+            namespace="ECS/ContainerInsights",
+            dimensions={
+                "ClusterName": self.ecs_cluster.name.apply(lambda name: name),
+                "ServiceName": self.namespace
+            },
+            period=60,
+            statistic="Maximum",
+            threshold=self.max_capacity,
+            alarm_actions=[self.sns_topic_arn, self.binary_sns_topic_arn],
+            ok_actions=[self.sns_topic_arn, self.binary_sns_topic_arn],
+            alarm_description=f"Alarm when ECS service running tasks are at Max of {self.max_capacity}",
+            tags=self.tags
+        )
+        pulumi.log.info(f"SCHEDULED SCALING: {self.scheduled_scaling}")
+        if self.scheduled_scaling:
+            self._validate_scheduled_scaling()
+            self._create_scheduled_scaling()
+
+    def _create_target_tracking_policies(self):
+        if self.autoscale_request_count_per_target is not None:
+            resource_label = Output.all(self.load_balancer.arn, self.target_group.arn).apply(
+                lambda arns: f"{arns[0].split('/', 1)[1]}/{arns[1].split(':')[-1]}"
+            )
+            self.request_count_scaling_policy = self._target_tracking_policy(
+                "request_count",
+                self.autoscale_request_count_per_target,
+                aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationPredefinedMetricSpecificationArgs(
+                    predefined_metric_type="ALBRequestCountPerTarget",
+                    resource_label=resource_label,
+                ),
+            )
+        if self.autoscale_cpu_utilization is not None:
+            self.cpu_scaling_policy = self._target_tracking_policy(
+                "cpu",
+                self.autoscale_cpu_utilization,
+                aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationPredefinedMetricSpecificationArgs(
+                    predefined_metric_type="ECSServiceAverageCPUUtilization",
+                ),
+            )
+
+    def _target_tracking_policy(self, metric, target_value, predefined_metric_specification):
+        # With several policies, Application Auto Scaling scales out when any of them asks to
+        # and only scales in when all of them agree.
+        return aws.appautoscaling.Policy(
+            qualify_component_name(f"{metric}_scaling_policy", self.kwargs),
+            name=f"{self.namespace}-{metric.replace('_', '-')}-scaling-policy",
+            policy_type="TargetTrackingScaling",
+            resource_id=self.autoscaling_target.resource_id,
+            scalable_dimension=self.autoscaling_target.scalable_dimension,
+            service_namespace=self.autoscaling_target.service_namespace,
+            target_tracking_scaling_policy_configuration=(
+                aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationArgs(
+                    target_value=target_value,
+                    predefined_metric_specification=predefined_metric_specification,
+                    scale_out_cooldown=self.autoscale_scale_out_cooldown,
+                    scale_in_cooldown=self.autoscale_scale_in_cooldown,
+                )
+            ),
+            opts=pulumi.ResourceOptions(
+                parent=self,
+                depends_on=[self.fargate_service]
+            )
+        )
+
+    def _create_step_scaling_policies(self):
         self.autoscaling_out_policy = aws.appautoscaling.Policy(
             qualify_component_name("autoscaling_out_policy", self.kwargs),
             name=f"{self.namespace}-autoscaling-out-policy",
@@ -654,64 +914,222 @@ class ContainerComponent(pulumi.ComponentResource):
             )
         )
 
-        self.running_tasks_alarm = aws.cloudwatch.MetricAlarm(
-            qualify_component_name("running_tasks_alarm", self.kwargs),
-            name=f"{self.namespace}-running-tasks-alarm",
-            comparison_operator="GreaterThanOrEqualToThreshold",
-            evaluation_periods=1,
-            metric_name="RunningTaskCount",
-            namespace="ECS/ContainerInsights",
-            dimensions={
-                "ClusterName": self.ecs_cluster.name.apply(lambda name: name),
-                "ServiceName": self.namespace
-            },
-            period=60,
-            statistic="Maximum",
-            threshold=100,
-            alarm_actions=[self.sns_topic_arn, self.binary_sns_topic_arn],
-            ok_actions=[self.sns_topic_arn, self.binary_sns_topic_arn],
-            alarm_description="Alarm when ECS service running tasks are at Max of 100",
-            tags=self.tags
+    def container_health_check_settings(self, container_health_check):
+        """
+        The container health check as TaskDefinitionHealthCheckArgs keyword arguments, or None.
+        """
+        if not container_health_check:
+            return None
+        settings = {
+            "command": ["CMD-SHELL", f"curl -f http://localhost:{self.container_port}{self.health_check_path} || exit 1"],
+            **DEFAULT_CONTAINER_HEALTH_CHECK,
+        }
+        if isinstance(container_health_check, dict):
+            settings.update(container_health_check)
+        return settings
+
+    def default_grace_period(self):
+        if not self.container_health_check:
+            return DEFAULT_HEALTH_CHECK_GRACE_PERIOD
+        return (self.container_health_check["start_period"]
+                + self.container_health_check["interval"] * self.container_health_check["retries"])
+
+    def validate_container_depends_on(self):
+        sidecars = {getattr(sidecar, 'name', None): sidecar for sidecar in self.sidecar_containers}
+        for container_name, condition in self.container_depends_on.items():
+            if container_name not in sidecars:
+                raise ValueError(f"container_depends_on names {container_name}, which is not a sidecar container")
+            if condition not in CONTAINER_DEPENDENCY_CONDITIONS:
+                raise ValueError(f"Unsupported container_depends_on condition for {container_name}: {condition}. "
+                                 f"Expected one of {', '.join(CONTAINER_DEPENDENCY_CONDITIONS)}")
+            if condition == "HEALTHY" and not getattr(sidecars[container_name], 'health_check', None):
+                raise ValueError(f"container_depends_on waits for {container_name} to be HEALTHY, "
+                                 f"but it has no health_check")
+
+    def target_group_health_check(self):
+        return aws.lb.TargetGroupHealthCheckArgs(
+            enabled=True,
+            path=self.health_check_path,
+            port=str(self.container_port),
+            protocol="HTTP",
+            matcher="200",
+            interval=self.health_check_interval,
+            timeout=self.health_check_timeout,
+            healthy_threshold=self.healthy_threshold,
+            unhealthy_threshold=self.unhealthy_threshold,
+        )
+
+    def setup_blue_green(self):
+        """
+        Deploys the service through a CodeDeploy blue/green deployment group that shifts production traffic between
+        the target group and the green target group, and rolls back on the 5xx and latency alarms.
+        """
+        self.codedeploy_role = aws.iam.Role(
+            qualify_component_name("codedeploy_role", self.kwargs),
+            name=f"{self.namespace}-codedeploy"[:64],
+            assume_role_policy=json.dumps({
+                "Version": "2012-10-17",
+                "Statement": [{
+                    "Effect": "Allow",
+                    "Principal": {"Service": "codedeploy.amazonaws.com"},
+                    "Action": "sts:AssumeRole",
+                }],
+            }),
+            managed_policy_arns=["arn:aws:iam::aws:policy/AWSCodeDeployRoleForECS"],
+            tags=self.tags,
+            opts=pulumi.ResourceOptions(parent=self),
+        )
+        self.codedeploy_application = aws.codedeploy.Application(
+            qualify_component_name("codedeploy_application", self.kwargs),
+            name=self.namespace,
+            compute_platform="ECS",
+            tags=self.tags,
+            opts=pulumi.ResourceOptions(parent=self),
+        )
+
+        load_balancer_dimension = self.load_balancer.arn.apply(lambda arn: arn.split("/", 1)[1])
+        self.rollback_alarms = [
+            aws.cloudwatch.MetricAlarm(
+                qualify_component_name("deployment_5xx_alarm", self.kwargs),
+                name=f"{self.namespace}-deployment-5xx",
+                comparison_operator="GreaterThanThreshold",
+                metric_name="HTTPCode_Target_5XX_Count",
+                namespace="AWS/ApplicationELB",
+                statistic="Sum",
+                dimensions={"LoadBalancer": load_balancer_dimension},
+                period=60,
+                evaluation_periods=1,
+                threshold=self.kwargs.get('blue_green_5xx_threshold', 10),
+                treat_missing_data="notBreaching",
+                tags=self.tags,
+                opts=pulumi.ResourceOptions(parent=self),
+            ),
+            aws.cloudwatch.MetricAlarm(
+                qualify_component_name("deployment_latency_alarm", self.kwargs),
+                name=f"{self.namespace}-deployment-latency",
+                comparison_operator="GreaterThanThreshold",
+                metric_name="TargetResponseTime",
+                namespace="AWS/ApplicationELB",
+                extended_statistic="p95",
+                dimensions={"LoadBalancer": load_balancer_dimension},
+                period=60,
+                evaluation_periods=2,
+                datapoints_to_alarm=2,
+                threshold=self.kwargs.get('blue_green_latency_threshold', 2),
+                treat_missing_data="notBreaching",
+                tags=self.tags,
+                opts=pulumi.ResourceOptions(parent=self),
+            ),
+        ]
+
+        warmup_seconds = self.kwargs.get('blue_green_warmup_seconds', 0)
+        if warmup_seconds:
+            # Hold new tasks on the test listener until the warm-up has run and continued the deployment
+            deployment_ready_option = aws.codedeploy.DeploymentGroupBlueGreenDeploymentConfigDeploymentReadyOptionArgs(
+                action_on_timeout="STOP_DEPLOYMENT",
+                wait_time_in_minutes=warmup_seconds // 60 + 10,
+            )
+        else:
+            deployment_ready_option = aws.codedeploy.DeploymentGroupBlueGreenDeploymentConfigDeploymentReadyOptionArgs(
+                action_on_timeout="CONTINUE_DEPLOYMENT",
+            )
+        self.deployment_group = aws.codedeploy.DeploymentGroup(
+            qualify_component_name("deployment_group", self.kwargs),
+            app_name=self.codedeploy_application.name,
+            deployment_group_name=self.namespace,
+            service_role_arn=self.codedeploy_role.arn,
+            deployment_config_name=self.kwargs.get('blue_green_deployment_config', "CodeDeployDefault.ECSAllAtOnce"),
+            deployment_style=aws.codedeploy.DeploymentGroupDeploymentStyleArgs(
+                deployment_option="WITH_TRAFFIC_CONTROL",
+                deployment_type="BLUE_GREEN",
+            ),
+            blue_green_deployment_config=aws.codedeploy.DeploymentGroupBlueGreenDeploymentConfigArgs(
+                deployment_ready_option=deployment_ready_option,
+                terminate_blue_instances_on_deployment_success=aws.codedeploy.DeploymentGroupBlueGreenDeploymentConfigTerminateBlueInstancesOnDeploymentSuccessArgs(
+                    action="TERMINATE",
+                    termination_wait_time_in_minutes=self.kwargs.get('blue_green_termination_wait', 5),
+                ),
+            ),
+            auto_rollback_configuration=aws.codedeploy.DeploymentGroupAutoRollbackConfigurationArgs(
+                enabled=True,
+                events=["DEPLOYMENT_FAILURE", "DEPLOYMENT_STOP_ON_ALARM"],
+            ),
+            alarm_configuration=aws.codedeploy.DeploymentGroupAlarmConfigurationArgs(
+                enabled=True,
+                alarms=[alarm.name for alarm in self.rollback_alarms],
+            ),
+            ecs_service=aws.codedeploy.DeploymentGroupEcsServiceArgs(
+                cluster_name=Output.from_input(self.ecs_cluster_arn).apply(lambda arn: arn.split("/")[-1]),
+                service_name=self.fargate_service.service.name,
+            ),
+            load_balancer_info=aws.codedeploy.DeploymentGroupLoadBalancerInfoArgs(
+                target_group_pair_info=aws.codedeploy.DeploymentGroupLoadBalancerInfoTargetGroupPairInfoArgs(
+                    prod_traffic_route=aws.codedeploy.DeploymentGroupLoadBalancerInfoTargetGroupPairInfoProdTrafficRouteArgs(
+                        listener_arns=[self.load_balancer_listener.arn],
+                    ),
+                    test_traffic_route=aws.codedeploy.DeploymentGroupLoadBalancerInfoTargetGroupPairInfoTestTrafficRouteArgs(
+                        listener_arns=[self.test_listener.arn],
+                    ),
+                    target_groups=[
+                        aws.codedeploy.DeploymentGroupLoadBalancerInfoTargetGroupPairInfoTargetGroupArgs(
+                            name=self.target_group.name),
+                        aws.codedeploy.DeploymentGroupLoadBalancerInfoTargetGroupPairInfoTargetGroupArgs(
+                            name=self.green_target_group.name),
+                    ],
+                ),
+            ),
+            tags=self.tags,
+            opts=pulumi.ResourceOptions(parent=self, depends_on=[self.fargate_service]),
+        )
+
+        self.blue_green_deployment = blue_green.BlueGreenDeployment(
+            qualify_component_name("blue_green_deployment", self.kwargs),
+            blue_green.BlueGreenDeploymentInputs(
+                application_name=self.codedeploy_application.name,
+                deployment_group_name=self.deployment_group.deployment_group_name,
+                task_definition_arn=self.fargate_service.task_definition.apply(
+                    lambda task_definition: task_definition.arn if task_definition else None),
+                container_name=self.namespace,
+                container_port=self.container_port,
+                test_url=Output.concat("https://", self.load_balancer.dns_name, ":",
+                                       str(self.kwargs.get('blue_green_test_port', DEFAULT_TEST_LISTENER_PORT))),
+                warmup_paths=self.kwargs.get('blue_green_warmup_paths', [self.health_check_path]),
+                warmup_seconds=warmup_seconds,
+                region=aws.config.region,
+                profile=aws.config.profile,
+            ),
+            opts=pulumi.ResourceOptions(parent=self, depends_on=[self.deployment_group]),
         )
-        pulumi.log.info(f"SCHEDULED SCALING: {self.scheduled_scaling}")
-        if self.scheduled_scaling:
-            self._validate_scheduled_scaling()
-            self._create_scheduled_scaling()
 
     def setup_load_balancer(self, kwargs, project, namespace, stack):
         self.certificate(project, stack)
 
         default_vpc = awsx.ec2.DefaultVpc(qualify_component_name("default_vpc", self.kwargs))
-        health_check_path = kwargs.get('custom_health_check_path', '/up')
 
-        self.target_group = aws.lb.TargetGroup(
-            qualify_component_name("target_group", self.kwargs, truncate=True),
-            name=f"{namespace}-tg"[:32],
-            port=self.container_port,
-            protocol="HTTP",
-            target_type="ip",
-            vpc_id=default_vpc.vpc_id,
-            health_check=aws.lb.TargetGroupHealthCheckArgs(
-                enabled=True,
-                path=health_check_path,
-                port=str(self.container_port),
-                protocol="HTTP",
-                matcher="200",
-                interval=30,
-                timeout=5,
-                healthy_threshold=2,
-                unhealthy_threshold=2,
-            ),
-        )
         alb_args = alb.AlbArgs(
             vpc_id=default_vpc.vpc_id,
             subnets=default_vpc.public_subnet_ids,
             placement=alb.AlbPlacement.EXTERNAL,
             certificate_arn=self.cert.arn,
             tags=self.tags,
-            namespace=self.kwargs.get('namespace', None)
+            namespace=self.kwargs.get('namespace', None),
+            idle_timeout=kwargs.get('idle_timeout', alb.DEFAULT_IDLE_TIMEOUT),
+            load_balancing_algorithm=kwargs.get('load_balancing_algorithm', "round_robin"),
+            slow_start=kwargs.get('slow_start', 0),
+            deregistration_delay=kwargs.get('deregistration_delay', alb.DEFAULT_DEREGISTRATION_DELAY),
         )
         self.alb = alb.Alb(qualify_component_name("loadbalancer", self.kwargs), alb_args, **self.kwargs)
+
+        self.target_group = aws.lb.TargetGroup(
+            qualify_component_name("target_group", self.kwargs, truncate=True),
+            name=f"{namespace}-tg"[:32],
+            port=self.container_port,
+            protocol="HTTP",
+            target_type="ip",
+            vpc_id=default_vpc.vpc_id,
+            health_check=self.target_group_health_check(),
+            **self.alb.target_group_settings(),
+        )
         self.load_balancer = self.alb.alb
         self.load_balancer_listener = self.alb.https_listener
         self.load_balancer_listener_redirect_http_to_https = self.alb.redirect_listener
@@ -732,7 +1150,27 @@ class ContainerComponent(pulumi.ComponentResource):
                     )
                 )
             ],
+            # CodeDeploy swaps the target group of the rule during blue/green deployments
+            opts=pulumi.ResourceOptions(
+                ignore_changes=["actions"] if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT else None),
         )
+        if self.deployment_strategy == BLUE_GREEN_DEPLOYMENT:
+            self.green_target_group = aws.lb.TargetGroup(
+                qualify_component_name("green_target_group", self.kwargs, truncate=True),
+                name=f"{namespace}"[:27] + "-tg-g",
+                port=self.container_port,
+                protocol="HTTP",
+                target_type="ip",
+                vpc_id=default_vpc.vpc_id,
+                health_check=self.target_group_health_check(),
+                **self.alb.target_group_settings(),
+            )
+            self.test_listener = self.alb.create_test_listener(
+                kwargs.get('blue_green_test_port', DEFAULT_TEST_LISTENER_PORT),
+                self.target_group,
+                ingress_cidrs=kwargs.get('blue_green_test_cidrs')
+                or [invoke_cache.invoke(aws.ec2.get_vpc, default=True).cidr_block],
+            )
 
         load_balancer_dimension = self.load_balancer.arn.apply(
             lambda arn: arn.split("/")[-1]
@@ -819,10 +1257,11 @@ class ContainerComponent(pulumi.ComponentResource):
         """
         cidrs = kwargs.get('nat_gateway_cidrs', ("172.31.128.0/20", "172.31.144.0/20"))
 
-        default_vpc = aws.ec2.get_vpc(default=True)
-        azs = aws.get_availability_zones(state="available")
+        default_vpc = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+        azs = invoke_cache.invoke(aws.get_availability_zones, state="available")
 
-        public_subnets = aws.ec2.get_subnets(
+        public_subnets = invoke_cache.invoke(
+            aws.ec2.get_subnets,
             filters=[
                 aws.ec2.GetSubnetsFilterArgs(name="vpc-id", values=[default_vpc.id]),
                 aws.ec2.GetSubnetsFilterArgs(name="default-for-az", values=["true"]),
@@ -957,14 +1396,94 @@ class ContainerComponent(pulumi.ComponentResource):
             )
         )
 
-        cache_policy = aws.cloudfront.get_cache_policy(name="UseOriginCacheControlHeaders-QueryStrings")
-        error_page_policy = aws.cloudfront.get_cache_policy(name="Managed-CachingOptimized")
-        origin_request_policy = aws.cloudfront.get_origin_request_policy(name="Managed-AllViewer")
-        response_header_policy = aws.cloudfront.get_response_headers_policy("5cc3b908-e619-4b99-88e5-2cf7f45965bd")
+        cache_policy = invoke_cache.invoke(aws.cloudfront.get_cache_policy,
+                                           name="UseOriginCacheControlHeaders-QueryStrings")
+        error_page_policy = invoke_cache.invoke(aws.cloudfront.get_cache_policy, name="Managed-CachingOptimized")
+        origin_request_policy = invoke_cache.invoke(aws.cloudfront.get_origin_request_policy, name="Managed-AllViewer")
+        response_header_policy = invoke_cache.invoke(aws.cloudfront.get_response_headers_policy,
+                                                     "5cc3b908-e619-4b99-88e5-2cf7f45965bd")
 
         # Include all domains in CloudFront aliases
         aliases = [full_name] + additional_domains
 
+        origin_shield_region = self.kwargs.get('origin_shield_region')
+        origin_shield = aws.cloudfront.DistributionOriginOriginShieldArgs(
+            enabled=True,
+            origin_shield_region=origin_shield_region,
+        ) if origin_shield_region else None
+
+        assets_bucket = self.kwargs.get('assets_bucket')
+        assets_origins = []
+        assets_cache_behaviors = []
+        if assets_bucket:
+            self.assets_origin_access_control = aws.cloudfront.OriginAccessControl(
+                qualify_component_name("assets-oac", self.kwargs),
+                name=f"{name}-assets",
+                origin_access_control_origin_type="s3",
+                signing_behavior="always",
+                signing_protocol="sigv4",
+                opts=pulumi.ResourceOptions(parent=self),
+            )
+            assets_origins.append(aws.cloudfront.DistributionOriginArgs(
+                domain_name=assets_bucket.bucket_regional_domain_name,
+                origin_id="assets",
+                origin_access_control_id=self.assets_origin_access_control.id,
+                origin_shield=origin_shield,
+            ))
+            # Precompiled assets are fingerprinted, so they can be cached for as long as CloudFront allows
+            assets_cache_behaviors.append(aws.cloudfront.DistributionOrderedCacheBehaviorArgs(
+                path_pattern="/assets/*",
+                target_origin_id="assets",
+                viewer_protocol_policy="redirect-to-https",
+                allowed_methods=["GET", "HEAD"],
+                cached_methods=["GET", "HEAD"],
+                cache_policy_id=error_page_policy.id,
+                compress=True,
+            ))
+
+        static_asset_paths = [path for path in self.kwargs.get('static_asset_paths', DEFAULT_STATIC_ASSET_PATHS)
+                              if not (assets_bucket and path == "/assets/*")]
+        static_asset_cache_behaviors = []
+        if static_asset_paths:
+            static_asset_ttl = self.kwargs.get('static_asset_ttl', IMMUTABLE_ASSET_TTL)
+            # A minimum TTL of the full TTL caches fingerprinted files even when Rails sends no cache headers
+            self.static_assets_cache_policy = aws.cloudfront.CachePolicy(
+                qualify_component_name("static-assets-cache-policy", self.kwargs),
+                name=f"{name}-static-assets",
+                comment="Fingerprinted static assets",
+                min_ttl=static_asset_ttl,
+                default_ttl=static_asset_ttl,
+                max_ttl=static_asset_ttl,
+                parameters_in_cache_key_and_forwarded_to_origin=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginArgs(
+                    cookies_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginCookiesConfigArgs(
+                        cookie_behavior="none",
+                    ),
+                    headers_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginHeadersConfigArgs(
+                        header_behavior="none",
+                    ),
+                    query_strings_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginQueryStringsConfigArgs(
+                        query_string_behavior="none",
+                    ),
+                    enable_accept_encoding_brotli=True,
+                    enable_accept_encoding_gzip=True,
+                ),
+                opts=pulumi.ResourceOptions(parent=self),
+            )
+            static_asset_cache_behaviors = [
+                aws.cloudfront.DistributionOrderedCacheBehaviorArgs(
+                    path_pattern=path,
+                    target_origin_id=self.load_balancer.dns_name,
+                    viewer_protocol_policy="redirect-to-https",
+                    allowed_methods=["GET", "HEAD"],
+                    cached_methods=["GET", "HEAD"],
+                    cache_policy_id=self.static_assets_cache_policy.id,
+                    # The ALB origin only completes TLS for requests carrying the viewer's Host header
+                    origin_request_policy_id=origin_request_policy.id,
+                    compress=True,
+                )
+                for path in static_asset_paths
+            ]
+
         self.cloudfront_distribution = aws.cloudfront.Distribution(
             qualify_component_name("cloudfront", self.kwargs),
             enabled=True,
@@ -978,11 +1497,13 @@ class ContainerComponent(pulumi.ComponentResource):
                         origin_protocol_policy="https-only",
                         origin_ssl_protocols=["TLSv1.2"],
                     ),
+                    origin_shield=origin_shield,
                 ),
                 aws.cloudfront.DistributionOriginArgs(
                     domain_name=f"{cdn_bucket}.s3.us-west-2.amazonaws.com",
                     origin_id=f"{cdn_bucket}.s3.us-west-2.amazonaws.com",
-                )
+                ),
+                *assets_origins,
             ],
             default_root_object="",
             aliases=aliases,
@@ -995,6 +1516,7 @@ class ContainerComponent(pulumi.ComponentResource):
                 depends_on=[self.cloudfront_cert_validation, self.cloudfront_cert]  # Ensure CloudFront waits for certificate creation and validation
             ),
             ordered_cache_behaviors=[
+                *assets_cache_behaviors,
                 aws.cloudfront.DistributionOrderedCacheBehaviorArgs(
                     path_pattern="/504.html",
                     target_origin_id=f"{cdn_bucket}.s3.us-west-2.amazonaws.com",
@@ -1004,7 +1526,8 @@ class ContainerComponent(pulumi.ComponentResource):
                     cache_policy_id=error_page_policy.id,
                     response_headers_policy_id=response_header_policy.id,
                     compress=True,
-                )
+                ),
+                *static_asset_cache_behaviors,
             ],
             default_cache_behavior=aws.cloudfront.DistributionDefaultCacheBehaviorArgs(
                 target_origin_id=self.load_balancer.dns_name,
@@ -1031,6 +1554,26 @@ class ContainerComponent(pulumi.ComponentResource):
             tags=self.tags,
         )
 
+        if assets_bucket:
+            self.assets_bucket_policy = aws.s3.BucketPolicy(
+                qualify_component_name("assets-bucket-policy", self.kwargs),
+                bucket=assets_bucket.id,
+                policy=pulumi.Output.all(assets_bucket.arn, self.cloudfront_distribution.arn).apply(
+                    lambda args: json.dumps({
+                        "Version": "2012-10-17",
+                        "Statement": [{
+                            "Sid": "AllowCloudFrontToReadAssets",
+                            "Effect": "Allow",
+                            "Principal": {"Service": "cloudfront.amazonaws.com"},
+                            "Action": "s3:GetObject",
+                            "Resource": f"{args[0]}/assets/*",
+                            "Condition": {"StringEquals": {"AWS:SourceArn": args[1]}},
+                        }],
+                    })
+                ),
+                opts=pulumi.ResourceOptions(parent=self),
+            )
+
         dns_target = self.cloudfront_distribution.domain_name
         if self.kwargs.get('cname', True):
             # Create CNAME records for all domains
@@ -2,264 +2,197 @@ import pulumi
 import pulumi_aws as aws
 import json
 
+DEFAULT_REGION = "us-west-2"
+DEFAULT_PERIOD = 300
+DASHBOARD_COLUMNS = 24
+DEFAULT_WIDGET_WIDTH = 12
+DEFAULT_WIDGET_HEIGHT = 6
+
+
+def metric_widget(title, metrics, context, stat=None, width=DEFAULT_WIDGET_WIDTH, height=DEFAULT_WIDGET_HEIGHT,
+                  **properties):
+    """
+    Returns a CloudWatch metric widget without a position; layout_widgets places it on the grid.
+    """
+    widget_properties = {"metrics": metrics, "period": DEFAULT_PERIOD}
+    if stat:
+        widget_properties["stat"] = stat
+    return {
+        "type": "metric",
+        "width": width,
+        "height": height,
+        "properties": {
+            **widget_properties,
+            "region": context["region"],
+            "title": title,
+            **properties,
+        }
+    }
+
+
+def layout_widgets(widgets, columns=DASHBOARD_COLUMNS):
+    """
+    Places widgets left to right on a grid `columns` wide, starting a new row when the next widget does not fit.
+    Each row is as tall as its tallest widget, so widgets never overlap and rows have no gaps.
+    Returns new widget dicts with x and y set.
+    """
+    placed = []
+    x = y = row_height = 0
+    for widget in widgets:
+        width = min(widget.get("width", DEFAULT_WIDGET_WIDTH), columns)
+        height = widget.get("height", DEFAULT_WIDGET_HEIGHT)
+        if x + width > columns:
+            x, y, row_height = 0, y + row_height, 0
+        placed.append({**widget, "x": x, "y": y, "width": width, "height": height})
+        x += width
+        row_height = max(row_height, height)
+    return placed
+
+
+def log_metric_widgets(context):
+    return [
+        metric_widget(log_metric_filter["metric_transformation"]["name"],
+                      [[log_metric_filter["metric_transformation"]["namespace"],
+                        log_metric_filter["metric_transformation"]["name"],
+                        "LogGroupName", f"/aws/ecs/{context['namespace']}"]],
+                      context, stat="Sum")
+        for log_metric_filter in context["log_metric_filters"]
+    ]
+
+
+def ecs_widgets(context):
+    service = ["ClusterName", context["cluster_name"], "ServiceName", context["service_name"]]
+    widgets = [metric_widget("ECS CPU Utilization", [["AWS/ECS", "CPUUtilization", *service]],
+                             context, stat="Average")]
+    if context["autoscale"]:
+        widgets.append(metric_widget("ECS Auto-Scaling Actions",
+                                     [["AWS/ApplicationAutoScaling", "NumberOfTasks", *service,
+                                       {"stat": "SampleCount"}]],
+                                     context, view="timeSeries", stacked=False))
+    widgets.append(metric_widget("ECS Memory Utilization", [["AWS/ECS", "MemoryUtilization", *service]],
+                                 context, stat="Average"))
+    return widgets
+
+
+def load_balancer_widgets(context):
+    load_balancer = ["LoadBalancer", context["load_balancer"]]
+    return [
+        metric_widget("Healthy Hosts (Minimum)",
+                      [["AWS/ApplicationELB", "HealthyHostCount", *load_balancer,
+                        "TargetGroup", context["target_group"]]],
+                      context, stat="Minimum"),
+        metric_widget("LB Request Count", [["AWS/ApplicationELB", "RequestCount", *load_balancer, {"stat": "Sum"}]],
+                      context, stat="Sum"),
+        metric_widget("LB Target Response Time",
+                      [["AWS/ApplicationELB", "TargetResponseTime", *load_balancer, {"stat": "Average"}]],
+                      context, stat="Average"),
+        metric_widget("LB HTTP 5XX Count",
+                      [["AWS/ApplicationELB", "HTTPCode_Target_5XX_Count", *load_balancer, {"stat": "Sum"}]],
+                      context, stat="Sum"),
+        metric_widget("LB HTTP 4XX Count",
+                      [["AWS/ApplicationELB", "HTTPCode_Target_4XX_Count", *load_balancer, {"stat": "Sum"}]],
+                      context, stat="Sum"),
+    ]
+
+
+def rds_widgets(context):
+    instance = ["DBInstanceIdentifier", context["db_instance_identifier"]]
+    return [
+        metric_widget("RDS CPU Utilization", [["AWS/RDS", "CPUUtilization", *instance]], context, stat="Average"),
+        metric_widget("RDS Database Connections", [["AWS/RDS", "DatabaseConnections", *instance]],
+                      context, stat="Average"),
+        metric_widget("RDS ACU Utilization", [["AWS/RDS", "ACUUtilization", *instance]], context, stat="Average"),
+    ]
+
+
+def rds_proxy_widgets(context):
+    """
+    Graphs how well an RDS proxy multiplexes clients onto database connections. Needs `db_proxy_name` in
+    widget_inputs. Many pinned sessions or a rising borrow latency mean the pool is too small or sessions are
+    pinned by prepared statements or session state.
+    """
+    proxy = ["ProxyName", context["db_proxy_name"]]
+    return [
+        metric_widget("RDS Proxy Connections",
+                      [["AWS/RDS", "ClientConnections", *proxy], ["AWS/RDS", "DatabaseConnections", *proxy]],
+                      context, stat="Sum"),
+        metric_widget("RDS Proxy Borrow Latency", [["AWS/RDS", "DatabaseConnectionsBorrowLatency", *proxy]],
+                      context, stat="Average"),
+        metric_widget("RDS Proxy Pinned Sessions",
+                      [["AWS/RDS", "DatabaseConnectionsCurrentlySessionPinned", *proxy]],
+                      context, stat="Sum"),
+    ]
+
+
+DEFAULT_WIDGET_PROVIDERS = (log_metric_widgets, ecs_widgets, load_balancer_widgets, rds_widgets)
+
 
 class DashboardComponent(pulumi.ComponentResource):
     def __init__(self, name, **kwargs):
+        """
+        Resource that produces a CloudWatch dashboard for a web container, its cluster and its database.
+
+        :key web_container: The ContainerComponent whose service and load balancer are graphed.
+        :key ecs_cluster: The ECS cluster the web container runs in.
+        :key rds_serverless_cluster_instance: The database instance that is graphed.
+        :key namespace: The dashboard name. Defaults to "{project}-{stack}".
+        :key autoscale: Whether to graph ECS auto-scaling actions. Defaults to False.
+        :key log_metric_filters: Log metric filter definitions to graph, one widget each.
+        :key load_balancer_arn: Overrides the web container's load balancer ARN.
+        :key region: The region the metrics are read from. Defaults to "us-west-2".
+        :key widget_providers: Callables taking the resolved context dict and returning a list of widgets.
+            Defaults to DEFAULT_WIDGET_PROVIDERS; widgets are laid out in the order they are returned.
+        :key widget_inputs: Extra values or Outputs, by name, to resolve into the context for custom providers.
+        """
         super().__init__('strongmind:global_build:commons:dashboard', name)
         self.namespace = kwargs.get("namespace", f"{pulumi.get_project()}-{pulumi.get_stack()}")
         self.web_container = kwargs['web_container']
         self.ecs_cluster = kwargs['ecs_cluster']
         self.rds_serverless_cluster_instance = kwargs['rds_serverless_cluster_instance']
         self.autoscale = kwargs.get('autoscale', False)
+        self.region = kwargs.get('region', DEFAULT_REGION)
+        self.widget_providers = kwargs.get('widget_providers', DEFAULT_WIDGET_PROVIDERS)
+        self.widget_inputs = kwargs.get('widget_inputs', {})
         self.kwargs = kwargs
         self.log_metric_filter_definitions = []
-        self.load_balancer_arn_name = ""
-        self.target_group_arn = ""
+        self.load_balancer_arn = None
         self.setup_dashboard(**kwargs)
 
-    def setup_dashboard(self, **kwargs):
-        self.log_metric_filter_definitions = self.kwargs.get('log_metric_filters', [])
-        load_balancer_arn = kwargs.get('load_balancer_arn', self.web_container.load_balancer.arn)
-        self.load_balancer_arn_name = load_balancer_arn.apply(lambda arn: arn.split("loadbalancer/")[1])
-        self.target_group_arn = self.web_container.target_group.arn.apply(lambda arn: arn.split(":")[-1])
-        widgets = []
+    @property
+    def load_balancer_arn_name(self):
+        return self.load_balancer_arn.apply(lambda arn: arn.split("loadbalancer/")[1])
 
-        # Add log metrics widgets
-        for log_metric_filter in self.log_metric_filter_definitions:
-            widgets.append(self.ecs_cluster.name.apply(lambda name: {
-                "type": "metric",
-                "x": 0,
-                "y": 0,  # Stacking widgets vertically
-                "width": 12,
-                "height": 6,
-                "properties": {
-                    "metrics": [
-                        [
-                            log_metric_filter["metric_transformation"]["namespace"],
-                            log_metric_filter["metric_transformation"]["name"],
-                            "LogGroupName", f"/aws/ecs/{self.namespace}"
-                        ]
-                    ],
-                    "period": 300,
-                    "stat": "Sum",
-                    "region": "us-west-2",  # Specify your region
-                    "title": log_metric_filter["metric_transformation"]["name"]
-                }
-            }))
+    @property
+    def target_group_arn(self):
+        return self.web_container.target_group.arn.apply(lambda arn: arn.split(":")[-1])
 
-        # ECS CPU Utilization widget
-        widgets.append(self.ecs_cluster.name.apply(lambda name: {
-            "type": "metric",
-            "x": 0,
-            "y": 6,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ECS", "CPUUtilization", "ClusterName",
-                     self.ecs_cluster.name.apply(lambda cluster_name: cluster_name), "ServiceName",
-                     self.web_container.fargate_service.name.apply(lambda service_name: service_name)]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "ECS CPU Utilization"
-            }
-        }))
+    def setup_dashboard(self, **kwargs):
+        self.log_metric_filter_definitions = self.kwargs.get('log_metric_filters', [])
+        self.load_balancer_arn = kwargs.get('load_balancer_arn', self.web_container.load_balancer.arn)
 
-        # ECS Auto-Scaling Actions widget
-        if self.autoscale:
-            widgets.append(self.ecs_cluster.name.apply(lambda name: {
-                "type": "metric",
-                "x": 12,
-                "y": 0,
-                "width": 12,
-                "height": 6,
-                "properties": {
-                    "metrics": [
-                        ["AWS/ApplicationAutoScaling", "NumberOfTasks", "ClusterName",
-                         self.ecs_cluster.name.apply(lambda cluster_name: cluster_name), "ServiceName",
-                         self.web_container.fargate_service.name.apply(lambda service_name: service_name),
-                         {"stat": "SampleCount"}]
-                    ],
-                    "period": 300,
-                    "view": "timeSeries",
-                    "stacked": False,
-                    "region": "us-west-2",
-                    "title": "ECS Auto-Scaling Actions"
-                }
-            }))
-        # ECS Memory Utilization widget
-        widgets.append(self.ecs_cluster.name.apply(lambda name: {
-            "type": "metric",
-            "x": 12,
-            "y": 6,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ECS", "MemoryUtilization", "ClusterName",
-                     self.ecs_cluster.name.apply(lambda cluster_name: cluster_name), "ServiceName",
-                     self.web_container.fargate_service.name.apply(lambda service_name: service_name)]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "ECS Memory Utilization"
-            }
-        }))
-        # Healthy Nodes Target Group widget
-        widgets.append(self.load_balancer_arn_name.apply(lambda name: {
-            "type": "metric",
-            "x": 0,
-            "y": 12,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ApplicationELB", "HealthyHostCount", "LoadBalancer",
-                     self.load_balancer_arn_name.apply(lambda load_balancer_arn_name: load_balancer_arn_name),
-                     "TargetGroup", self.target_group_arn.apply(lambda target_group_arn: target_group_arn)]
-                ],
-                "period": 300,
-                "stat": "Minimum",
-                "region": "us-west-2",
-                "title": "Healthy Hosts (Minimum)"
-            }
-        }))
-        # Request Count widget
-        widgets.append(self.load_balancer_arn_name.apply(lambda name: {
-            "type": "metric",
-            "x": 12,
-            "y": 24,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ApplicationELB", "RequestCount", "LoadBalancer",
-                     self.load_balancer_arn_name.apply(lambda load_balancer_arn_name: load_balancer_arn_name),
-                     {"stat": "Sum"}]
-                ],
-                "period": 300,
-                "stat": "Sum",
-                "region": "us-west-2",
-                "title": "LB Request Count"
-            }
-        }))
-        # Target Response Time widget
-        widgets.append(self.load_balancer_arn_name.apply(lambda name: {
-            "type": "metric",
-            "x": 12,
-            "y": 30,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ApplicationELB", "TargetResponseTime", "LoadBalancer",
-                     self.load_balancer_arn_name.apply(lambda load_balancer_arn_name: load_balancer_arn_name),
-                     {"stat": "Average"}]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "LB Target Response Time"
-            }
-        }))
-        # HTTP 5XX Count widget
-        widgets.append(self.load_balancer_arn_name.apply(lambda name: {
-            "type": "metric",
-            "x": 12,
-            "y": 36,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ApplicationELB", "HTTPCode_Target_5XX_Count", "LoadBalancer",
-                     self.load_balancer_arn_name.apply(lambda load_balancer_arn_name: load_balancer_arn_name),
-                     {"stat": "Sum"}]
-                ],
-                "period": 300,
-                "stat": "Sum",
-                "region": "us-west-2",
-                "title": "LB HTTP 5XX Count"
-            }
-        }))
-        # HTTP 4XX Count widget
-        widgets.append(self.load_balancer_arn_name.apply(lambda name: {
-            "type": "metric",
-            "x": 12,
-            "y": 42,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/ApplicationELB", "HTTPCode_Target_4XX_Count", "LoadBalancer",
-                     self.load_balancer_arn_name.apply(lambda load_balancer_arn_name: load_balancer_arn_name),
-                     {"stat": "Sum"}]
-                ],
-                "period": 300,
-                "stat": "Sum",
-                "region": "us-west-2",
-                "title": "LB HTTP 4XX Count"
-            }
-        }))
-        # RDS CPU Utilization widget
-        widgets.append(self.rds_serverless_cluster_instance.identifier.apply(lambda name: {
-            "type": "metric",
-            "x": 0,
-            "y": 18,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/RDS", "CPUUtilization", "DBInstanceIdentifier",
-                     self.rds_serverless_cluster_instance.identifier.apply(lambda identifier: identifier)]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "RDS CPU Utilization"
-            }
-        }))
-        # RDS Database Connections widget
-        widgets.append(self.rds_serverless_cluster_instance.identifier.apply(lambda name: {
-            "type": "metric",
-            "x": 0,
-            "y": 24,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/RDS", "DatabaseConnections", "DBInstanceIdentifier",
-                     self.rds_serverless_cluster_instance.identifier.apply(lambda identifier: identifier)]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "RDS Database Connections"
-            }
-        }))
-        # RDS ACUUtilization widget
-        widgets.append(self.rds_serverless_cluster_instance.identifier.apply(lambda name: {
-            "type": "metric",
-            "x": 0,
-            "y": 30,
-            "width": 12,
-            "height": 6,
-            "properties": {
-                "metrics": [
-                    ["AWS/RDS", "ACUUtilization", "DBInstanceIdentifier",
-                     self.rds_serverless_cluster_instance.identifier.apply(lambda identifier: identifier)]
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-west-2",
-                "title": "RDS ACU Utilization"
-            }
-        }))
+        # Every Output the widgets need is resolved together, so the body costs a single apply.
+        self.dashboard_body = pulumi.Output.all(
+            cluster_name=self.ecs_cluster.name,
+            service_name=self.web_container.fargate_service.name,
+            load_balancer_arn=self.load_balancer_arn,
+            target_group_arn=self.web_container.target_group.arn,
+            db_instance_identifier=self.rds_serverless_cluster_instance.identifier,
+            **self.widget_inputs,
+        ).apply(self.render_body)
 
-        dashboard_body = pulumi.Output.all(*widgets).apply(lambda ws: json.dumps({"widgets": ws}))
+        self.dashboard = aws.cloudwatch.Dashboard(f"{self.namespace}-dashboard",
+                                                  dashboard_body=self.dashboard_body,
+                                                  dashboard_name=f"{self.namespace}")
 
-        dashboard = aws.cloudwatch.Dashboard(f"{self.namespace}-dashboard",
-                                             dashboard_body=dashboard_body,
-                                             dashboard_name=f"{self.namespace}")
+    def render_body(self, resolved):
+        context = {
+            **resolved,
+            "namespace": self.namespace,
+            "region": self.region,
+            "autoscale": self.autoscale,
+            "log_metric_filters": self.log_metric_filter_definitions,
+            "load_balancer": resolved["load_balancer_arn"].split("loadbalancer/")[1],
+            "target_group": resolved["target_group_arn"].split(":")[-1],
+        }
+        widgets = [widget for provider in self.widget_providers for widget in provider(context)]
+        return json.dumps({"widgets": layout_widgets(widgets)})
@@ -1,9 +1,37 @@
+import glob
+import hashlib
+import json
+import os
+import random
 import time
+from collections import deque
+from datetime import datetime, timezone
 from typing import Optional
 
 import boto3
 import pulumi
+from botocore.exceptions import ClientError
 from pulumi import ResourceOptions
+from pulumi.runtime.rpc import UNKNOWN
+
+DEFAULT_TIMEOUT = 3600
+DEFAULT_INITIAL_POLL_INTERVAL = 1
+DEFAULT_MAX_POLL_INTERVAL = 20
+DEFAULT_LOG_DIRECTORY = "execution-logs"
+DEFAULT_LOG_BUFFER_LINES = 1000
+DESCRIBE_TASKS_BATCH_SIZE = 100
+THROTTLING_ERROR_CODES = ("ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded")
+# The task lifecycle as reported by ECS, with the timestamp ECS records when a task enters that phase
+TASK_PHASES = (
+    ("PROVISIONING", "createdAt"),
+    ("PENDING", "pullStartedAt"),
+    ("ACTIVATING", "pullStoppedAt"),
+    ("RUNNING", "startedAt"),
+    ("DEACTIVATING", "executionStoppedAt"),
+    ("STOPPING", "stoppingAt"),
+    ("DEPROVISIONING", None),
+    ("STOPPED", "stoppedAt"),
+)
 
 
 class ExecutionResourceInputs:
@@ -12,13 +40,41 @@ class ExecutionResourceInputs:
     subnets: pulumi.Input[str]
     security_groups: pulumi.Input[str]
     ecs_client: pulumi.Input[boto3.client]
+    timeout: pulumi.Input[int]
+    initial_poll_interval: pulumi.Input[float]
+    max_poll_interval: pulumi.Input[float]
+    logs_client: pulumi.Input[boto3.client]
+    log_directory: pulumi.Input[str]
+    log_buffer_lines: pulumi.Input[int]
+    image: pulumi.Input[str]
+    command: pulumi.Input[list]
+    migration_fingerprint: pulumi.Input[str]
+    skip_unchanged: pulumi.Input[bool]
+    force_run: pulumi.Input[bool]
+    tasks: pulumi.Input[list]
 
-    def __init__(self, cluster, family, subnets, security_groups, ecs_client=None):
+    def __init__(self, cluster, family, subnets, security_groups, ecs_client=None, timeout=DEFAULT_TIMEOUT,
+                 initial_poll_interval=DEFAULT_INITIAL_POLL_INTERVAL, max_poll_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 logs_client=None, log_directory=DEFAULT_LOG_DIRECTORY, log_buffer_lines=DEFAULT_LOG_BUFFER_LINES,
+                 image=None, command=None, migration_fingerprint=None, skip_unchanged=False, force_run=False,
+                 tasks=None):
         self.cluster = cluster
         self.family = family
         self.subnets = subnets
         self.security_groups = security_groups
         self.ecs_client = ecs_client
+        self.timeout = timeout
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.logs_client = logs_client
+        self.log_directory = log_directory
+        self.log_buffer_lines = log_buffer_lines
+        self.image = image
+        self.command = command
+        self.migration_fingerprint = migration_fingerprint
+        self.skip_unchanged = skip_unchanged
+        self.force_run = force_run
+        self.tasks = tasks
 
 
 class _ExecutionResourceProviderInputs:
@@ -27,34 +83,377 @@ class _ExecutionResourceProviderInputs:
     subnets: str
     security_groups: str
     ecs_client: boto3.client
+    timeout: int
+    initial_poll_interval: float
+    max_poll_interval: float
+    logs_client: boto3.client
+    log_directory: str
+    log_buffer_lines: int
+    image: str
+    command: list
+    migration_fingerprint: str
+    skip_unchanged: bool
+    force_run: bool
+    tasks: list
 
-    def __init__(self, cluster, family, subnets, security_groups, ecs_client=None):
+    def __init__(self, cluster, family, subnets, security_groups, ecs_client=None, timeout=DEFAULT_TIMEOUT,
+                 initial_poll_interval=DEFAULT_INITIAL_POLL_INTERVAL, max_poll_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 logs_client=None, log_directory=DEFAULT_LOG_DIRECTORY, log_buffer_lines=DEFAULT_LOG_BUFFER_LINES,
+                 image=None, command=None, migration_fingerprint=None, skip_unchanged=False, force_run=False,
+                 tasks=None):
         self.cluster = cluster
         self.family = family
         self.subnets = subnets
         self.security_groups = security_groups
         self.ecs_client = ecs_client
+        self.timeout = timeout
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.logs_client = logs_client
+        self.log_directory = log_directory
+        self.log_buffer_lines = log_buffer_lines
+        self.image = image
+        self.command = command
+        self.migration_fingerprint = migration_fingerprint
+        self.skip_unchanged = skip_unchanged
+        self.force_run = force_run
+        self.tasks = tasks
+
+
+class TaskCompletionWaiter:
+    """
+    Waits for ECS tasks to stop, describing every outstanding task in a single describe_tasks call per poll.
+
+    Polling starts at initial_poll_interval seconds and backs off with jitter up to max_poll_interval,
+    backing off further when ECS throttles us. Tasks still running after timeout seconds are stopped
+    and reported as a failure.
+    """
+
+    def __init__(self, ecs_client, cluster, timeout=DEFAULT_TIMEOUT,
+                 initial_poll_interval=DEFAULT_INITIAL_POLL_INTERVAL, max_poll_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.ecs_client = ecs_client
+        self.cluster = cluster
+        self.timeout = timeout
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.sleep = sleep
+        self.clock = clock
+        self.deadline = None
+        self.phases = {}
+
+    def wait(self, task_arns, on_poll=None, first_completed=False):
+        """
+        Blocks until every task has stopped, or with first_completed until at least one has, and returns
+        the final description of the stopped tasks keyed by task ARN.
+        The first time each task was seen in each phase is kept in self.phases.
+        on_poll, if given, is called after every describe_tasks, e.g. to tail the task's logs.
+        The deadline starts with the first call, so it covers every task waited for with this waiter.
+        """
+        if self.deadline is None:
+            self.deadline = self.clock() + self.timeout
+        deadline = self.deadline
+        interval = self.initial_poll_interval
+        stopped = {}
+        pending = list(task_arns)
+        while True:
+            try:
+                tasks = self._describe(pending)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in THROTTLING_ERROR_CODES:
+                    raise
+                tasks = {}
+                interval = min(interval * 2, self.max_poll_interval)
+            for task_arn, task in tasks.items():
+                self._record_phase(task_arn, task)
+                if task.get('lastStatus') == 'STOPPED':
+                    stopped[task_arn] = task
+            if on_poll:
+                on_poll()
+            pending = [task_arn for task_arn in pending if task_arn not in stopped]
+            if not pending or (first_completed and stopped):
+                return stopped
+
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                self._stop(pending)
+                raise Exception(f"Tasks {', '.join(pending)} did not stop within {self.timeout} seconds")
+            self.sleep(min(random.uniform(interval / 2, interval), remaining))
+            interval = min(interval * 1.5, self.max_poll_interval)
+
+    def _describe(self, task_arns):
+        tasks = {}
+        for start in range(0, len(task_arns), DESCRIBE_TASKS_BATCH_SIZE):
+            batch = task_arns[start:start + DESCRIBE_TASKS_BATCH_SIZE]
+            response = self.ecs_client.describe_tasks(cluster=self.cluster, tasks=batch)
+            described = response.get('tasks', [])
+            if len(batch) == 1 and len(described) == 1:
+                tasks[batch[0]] = described[0]
+                continue
+            for task in described:
+                tasks[task.get('taskArn')] = task
+        return tasks
+
+    def _record_phase(self, task_arn, task):
+        phases = self.phases.setdefault(task_arn, {})
+        if task.get('lastStatus'):
+            phases.setdefault(task['lastStatus'], _now())
+        for phase, timestamp_key in TASK_PHASES:
+            timestamp = task.get(timestamp_key) if timestamp_key else None
+            if isinstance(timestamp, datetime):
+                phases[phase] = timestamp.astimezone(timezone.utc).isoformat()
+        order = [phase for phase, _ in TASK_PHASES]
+        self.phases[task_arn] = dict(sorted(
+            phases.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
+
+    def _stop(self, task_arns):
+        for task_arn in task_arns:
+            try:
+                self.ecs_client.stop_task(cluster=self.cluster, task=task_arn,
+                                          reason=f"Exceeded the {self.timeout} second deployment deadline")
+            except ClientError as e:
+                print(f"Could not stop task {task_arn}: {e}")
+
+
+class LogTailer:
+    """
+    Follows a CloudWatch log stream while a task runs.
+
+    Each poll() reads every page written since the last one using nextForwardToken, echoes the new lines,
+    appends them to log_file and keeps the last buffer_lines in memory for error reports.
+    """
+
+    def __init__(self, logs_client, log_group_name, log_stream_name, log_file=None,
+                 buffer_lines=DEFAULT_LOG_BUFFER_LINES, echo=print):
+        self.logs_client = logs_client
+        self.log_group_name = log_group_name
+        self.log_stream_name = log_stream_name
+        self.log_file = log_file
+        self.lines = deque(maxlen=buffer_lines)
+        self.echo = echo
+        self.next_token = None
+        self._file = None
+
+    def poll(self):
+        """
+        Reads everything new in the stream and returns the number of lines read.
+        A stream that does not exist yet, or a throttled read, is retried on the next poll.
+        """
+        read = 0
+        while True:
+            request = {
+                'logGroupName': self.log_group_name,
+                'logStreamName': self.log_stream_name,
+                'startFromHead': True,
+            }
+            if self.next_token:
+                request['nextToken'] = self.next_token
+            try:
+                response = self.logs_client.get_log_events(**request)
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code == 'ResourceNotFoundException' or code in THROTTLING_ERROR_CODES:
+                    return read
+                raise
+            events = response.get('events', [])
+            for event in events:
+                self._append(event['message'])
+            read += len(events)
+            next_token = response.get('nextForwardToken')
+            reached_the_end = not events or next_token == self.next_token
+            self.next_token = next_token or self.next_token
+            if reached_the_end:
+                return read
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _append(self, message):
+        self.lines.append(message)
+        self.echo(message)
+        if not self.log_file:
+            return
+        if not self._file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_file)), exist_ok=True)
+            self._file = open(self.log_file, "a")
+        self._file.write(message.rstrip("\n") + "\n")
+        self._file.flush()
+
+
+def phase_durations(phases):
+    """
+    Seconds spent starting up (until RUNNING), running (until STOPPED) and in total, for the phases that were seen.
+    """
+    times = {phase: datetime.fromisoformat(timestamp) for phase, timestamp in phases.items()}
+    durations = {}
+    if 'PROVISIONING' in times and 'RUNNING' in times:
+        durations['startup'] = (times['RUNNING'] - times['PROVISIONING']).total_seconds()
+    if 'RUNNING' in times and 'STOPPED' in times:
+        durations['running'] = (times['STOPPED'] - times['RUNNING']).total_seconds()
+    if times and 'STOPPED' in times:
+        durations['total'] = (times['STOPPED'] - min(times.values())).total_seconds()
+    return durations
+
+
+def execution_fingerprint(inputs):
+    """
+    Hashes what decides whether the execution needs to run again: the container image, the command
+    (or task graph) and the migration fingerprint. Returns None while any of them is unknown, e.g. during a preview.
+    """
+    values = [inputs.get('image'), inputs.get('command'), inputs.get('migration_fingerprint')]
+    if inputs.get('tasks'):
+        values.append(inputs['tasks'])
+    if UNKNOWN in json.dumps(values):
+        return None
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def fingerprint_files(*patterns):
+    """
+    Hashes the names and contents of the files matching the glob patterns, e.g.
+    `fingerprint_files("db/migrate/*.rb", "db/schema.rb")`, for use as a migration fingerprint.
+    """
+    digest = hashlib.sha256()
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)
+                    if os.path.isfile(path)})
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def order_task_graph(tasks):
+    """
+    Returns the names of the tasks in an order where every task comes after its dependencies.
+    Each task is a dict with a `name`, an optional `command` and optional `depends_on` names.
+    Raises a ValueError for duplicate names, unknown dependencies and cycles.
+    """
+    names = [task['name'] for task in tasks]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Execution tasks must have unique names, found duplicates: {', '.join(duplicates)}")
+    dependencies = {task['name']: list(task.get('depends_on') or []) for task in tasks}
+    for name, depends_on in dependencies.items():
+        unknown = [dependency for dependency in depends_on if dependency not in dependencies]
+        if unknown:
+            raise ValueError(f"Execution task {name} depends on unknown tasks: {', '.join(unknown)}")
+
+    ordered = []
+    while len(ordered) < len(names):
+        ready = [name for name in names
+                 if name not in ordered and all(dependency in ordered for dependency in dependencies[name])]
+        if not ready:
+            cycle = [name for name in names if name not in ordered]
+            raise ValueError(f"Execution tasks have a dependency cycle between: {', '.join(cycle)}")
+        ordered.extend(ready)
+    return ordered
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
 
 
 class ExecutionResourceProvider(pulumi.dynamic.ResourceProvider):
     ecs_client: boto3.client
 
     def create(self, props):
-        self.ecs_client = props.get('ecs_client', boto3.client('ecs'))
-        output = self.run_task(props)
-        return pulumi.dynamic.CreateResult(id_="0", outs={"output": output})
+        self.ecs_client = props.get('ecs_client') or boto3.client('ecs')
+        outs = self.run_task(props)
+        return pulumi.dynamic.CreateResult(id_="0", outs=outs)
 
     def update(self, id, _olds, props):
-        self.ecs_client = props.get('ecs_client', boto3.client('ecs'))
-        output = self.run_task(props)
-        return pulumi.dynamic.UpdateResult(outs={"output": output})
+        self.ecs_client = props.get('ecs_client') or boto3.client('ecs')
+        outs = self.run_task(props)
+        return pulumi.dynamic.UpdateResult(outs=outs)
 
-    def diff(self, _id: str, _olds, _news):
-        # Show that this has "changed" so that it runs every time
-        return pulumi.dynamic.DiffResult(changes=True)
+    def diff(self, _id: str, olds, news):
+        if not news.get('skip_unchanged') or news.get('force_run'):
+            # Show that this has "changed" so that it runs every time
+            return pulumi.dynamic.DiffResult(changes=True)
+        fingerprint = execution_fingerprint(news)
+        return pulumi.dynamic.DiffResult(changes=fingerprint is None or fingerprint != olds.get('fingerprint'))
 
-    #
     def run_task(self, inputs):
+        tasks = inputs.get('tasks')
+        if not tasks:
+            run = self.run_task_graph(inputs, [{'name': None}])[0]
+            return {
+                "output": True,
+                "task_arn": run.task_arn,
+                "phases": run.phases,
+                "durations": run.durations,
+                "log_file": run.log_file,
+                "fingerprint": execution_fingerprint(inputs),
+            }
+
+        started = time.monotonic()
+        runs = self.run_task_graph(inputs, tasks)
+        return {
+            "output": True,
+            "durations": {"total": round(time.monotonic() - started, 3)},
+            "task_results": {run.name: run.result() for run in runs},
+            "fingerprint": execution_fingerprint(inputs),
+        }
+
+    def run_task_graph(self, inputs, tasks):
+        """
+        Starts every task whose dependencies have succeeded, concurrently, on the execution task family,
+        overriding the container command when the task has one. Waits for them together and starts
+        dependants as their dependencies finish. After a failure no new tasks are started; the running
+        ones are waited for and an exception is raised.
+        """
+        order = order_task_graph(tasks)
+        definitions = {task['name']: task for task in tasks}
+        waiter = TaskCompletionWaiter(
+            self.ecs_client,
+            inputs['cluster'],
+            timeout=inputs.get('timeout') or DEFAULT_TIMEOUT,
+            initial_poll_interval=inputs.get('initial_poll_interval') or DEFAULT_INITIAL_POLL_INTERVAL,
+            max_poll_interval=inputs.get('max_poll_interval') or DEFAULT_MAX_POLL_INTERVAL,
+        )
+        logs_client = inputs.get('logs_client') or boto3.client('logs')
+        runs = []
+        failed = []
+        try:
+            while True:
+                finished = {run.name for run in runs if run.finished and not run.failed}
+                started = {run.name for run in runs}
+                if not failed:
+                    for name in order:
+                        depends_on = definitions[name].get('depends_on') or []
+                        if name not in started and all(dependency in finished for dependency in depends_on):
+                            runs.append(self._start(inputs, definitions[name], logs_client))
+                running = [run for run in runs if not run.finished]
+                if not running:
+                    break
+                stopped = waiter.wait([run.task_arn for run in running],
+                                      on_poll=lambda: [run.tailer.poll() for run in running],
+                                      first_completed=True)
+                for run in running:
+                    if run.task_arn in stopped:
+                        run.finish(stopped[run.task_arn], waiter.phases.get(run.task_arn, {}))
+                        if run.failed:
+                            failed.append(run)
+        finally:
+            for run in runs:
+                run.tailer.close()
+
+        for run in failed:
+            run.report_failure()
+        if failed:
+            raise Exception("; ".join(run.failure for run in failed))
+        return runs
+
+    def _start(self, inputs, definition, logs_client):
+        family = str(inputs['family'])
+        request = {}
+        if definition.get('command'):
+            request['overrides'] = {
+                'containerOverrides': [{'name': family, 'command': list(definition['command'])}]
+            }
         response = self.ecs_client.run_task(
             taskDefinition=inputs['family'],
             cluster=inputs['cluster'],
@@ -66,40 +465,96 @@ class ExecutionResourceProvider(pulumi.dynamic.ResourceProvider):
                     'assignPublicIp': 'ENABLED'
                 }
             },
-            startedBy='rails-component'
-        )
-        task_arn = response['tasks'][0]['taskArn']
-        task_id = task_arn.split('/')[-1]
-        task = self.ecs_client.describe_tasks(
-            cluster=inputs['cluster'],
-            tasks=[task_id]
+            startedBy='rails-component',
+            **request
         )
-        while task['tasks'][0]['lastStatus'] != 'STOPPED':
-            time.sleep(5)
-            task = self.ecs_client.describe_tasks(
-                cluster=inputs['cluster'],
-                tasks=[task_id]
-            )
-        exit_code = task['tasks'][0]['containers'][0]['exitCode']
-        if exit_code:
-            logs = boto3.client('logs')
-            family = str(inputs['family'])
-            log_group_name = f'/aws/ecs/{family}'
-            print(f"Log group name: {log_group_name}")
-            log_stream_name = f'container/{family}/{format(task_id)}'
-            print(f"Log stream name: {log_stream_name}")
-            response = logs.get_log_events(
-                logGroupName=log_group_name,
-                logStreamName=log_stream_name,
-                startFromHead=True
-            )
-            for each in response['events']:
-                print(each['message'])
-
-            raise Exception(f"Task exited with code {exit_code}")
-        return True
+        return _TaskRun(definition['name'], family, response['tasks'][0]['taskArn'], logs_client,
+                        inputs.get('log_directory') or DEFAULT_LOG_DIRECTORY,
+                        inputs.get('log_buffer_lines') or DEFAULT_LOG_BUFFER_LINES)
+
+
+class _TaskRun:
+    def __init__(self, name, family, task_arn, logs_client, log_directory, log_buffer_lines):
+        self.name = name
+        self.family = family
+        self.task_arn = task_arn
+        self.task_id = task_arn.split('/')[-1]
+        self.label = f"{name} task {self.task_id}" if name else f"Task {self.task_id}"
+        log_group_name = f'/aws/ecs/{family}'
+        log_stream_name = f'container/{family}/{format(self.task_id)}'
+        print(f"{self.label}: tailing log stream {log_stream_name} in {log_group_name}")
+        file_name = f"{family}-{name}-{self.task_id}.log" if name else f"{family}-{self.task_id}.log"
+        self.log_file = os.path.abspath(os.path.join(log_directory, file_name))
+        self.tailer = LogTailer(logs_client, log_group_name, log_stream_name, log_file=self.log_file,
+                                buffer_lines=log_buffer_lines,
+                                echo=(lambda message: print(f"[{name}] {message}")) if name else print)
+        self.finished = False
+        self.exit_code = None
+        self.failure = None
+        self.phases = {}
+        self.durations = {}
+
+    @property
+    def failed(self):
+        return self.failure is not None
+
+    def finish(self, task, phases):
+        # CloudWatch can lag behind the task stopping
+        self.tailer.poll()
+        self.finished = True
+        self.phases = phases
+        self.durations = phase_durations(phases)
+        print(f"{self.label} phases: {phases}")
+        containers = task.get('containers', [])
+        container = next((c for c in containers if c.get('name') == self.family), containers[0] if containers else {})
+        self.exit_code = container.get('exitCode')
+        if self.exit_code is None:
+            self.failure = f"{self.label} stopped without an exit code: {task.get('stoppedReason')}"
+        elif self.exit_code:
+            self.failure = f"{self.label} exited with code {self.exit_code}"
+
+    def report_failure(self):
+        print(f"Last {len(self.tailer.lines)} log lines of {self.label}:")
+        for line in self.tailer.lines:
+            print(line)
+        print(f"Full log written to {self.log_file}")
+
+    def result(self):
+        return {
+            "task_arn": self.task_arn,
+            "exit_code": self.exit_code,
+            "phases": self.phases,
+            "durations": self.durations,
+            "log_file": self.log_file,
+        }
 
 
 class ExecutionComponent(pulumi.dynamic.Resource):
+    output: pulumi.Output[bool]
+    task_arn: pulumi.Output[str]
+    phases: pulumi.Output[dict]
+    durations: pulumi.Output[dict]
+    log_file: pulumi.Output[str]
+    fingerprint: pulumi.Output[str]
+    task_results: pulumi.Output[dict]
+
     def __init__(self, name: str, props: ExecutionResourceInputs, opts: Optional[ResourceOptions] = None):
-        super().__init__(ExecutionResourceProvider(), name, {**vars(props)}, opts)
+        """
+        Runs the migration task family once per deployment and waits for it to stop.
+
+        Exposes `phases`, the UTC ISO timestamp the task entered each ECS lifecycle phase
+        (PROVISIONING, PENDING, RUNNING, ..., STOPPED), and `durations`, the seconds spent
+        in startup, running and in total.
+        The task's log is streamed while it runs and written in full to `log_file`.
+
+        With `skip_unchanged`, the task only runs when the fingerprint of the image, command and
+        migration_fingerprint differs from the last run; `force_run` runs it regardless.
+
+        With `tasks`, a list of `{"name", "command", "depends_on"}` dicts, the family is run once per task
+        with the command overridden, independent tasks concurrently, and each task's ARN, exit code,
+        phases, durations and log file are output in `task_results`.
+        """
+        super().__init__(ExecutionResourceProvider(), name,
+                         {**vars(props), "output": None, "task_arn": None, "phases": None, "durations": None,
+                          "log_file": None, "fingerprint": None, "task_results": None},
+                         opts)
@@ -0,0 +1,187 @@
+import hashlib
+import importlib
+import json
+import os
+import time
+from enum import Enum
+
+import pulumi
+import pulumi_aws as aws
+
+CACHE_DIR_ENV_VAR = "STRONGMIND_INVOKE_CACHE_DIR"
+CACHE_TTL_ENV_VAR = "STRONGMIND_INVOKE_CACHE_TTL"
+DEFAULT_CACHE_TTL = 3600
+
+# Data sources whose results are stable enough to share between previews of different stacks.
+# Anything not listed here (e.g. secret values) is only memoized for the life of the program.
+PERSISTABLE_INVOKES = (
+    "aws.ec2.get_vpc",
+    "aws.ec2.get_subnets",
+    "aws.ec2.get_security_group",
+    "aws.get_availability_zones",
+    "aws.get_region",
+    "aws.iam.get_account_alias",
+    "aws.iam.get_policy_document",
+    "aws.cloudfront.get_cache_policy",
+    "aws.cloudfront.get_origin_request_policy",
+    "aws.cloudfront.get_response_headers_policy",
+    "aws.lambda_.get_layer_version",
+)
+
+_memory_cache = {}
+
+
+def invoke(fn, *args, **kwargs):
+    """
+    Calls a Pulumi data-source function such as aws.ec2.get_vpc, memoizing the result per stack.
+
+    Results are keyed by the function and its arguments. Calls with unresolved Outputs in their
+    arguments are passed straight through.
+    When STRONGMIND_INVOKE_CACHE_DIR (or the `invoke_cache_dir` Pulumi config) is set, results of
+    PERSISTABLE_INVOKES are also written to disk as JSON, keyed by account and region, and reused for
+    STRONGMIND_INVOKE_CACHE_TTL seconds (default 3600). Only pulumi_aws result types are rebuilt from the files.
+
+    Example:
+        from strongmind_deployment import invoke_cache
+        default_vpc = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+    """
+    name = _function_name(fn)
+    try:
+        frozen_args = _freeze([args, kwargs])
+    except _Unhashable:
+        return fn(*args, **kwargs)
+
+    key = (pulumi.get_project(), pulumi.get_stack(), name, frozen_args)
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    cache_file = _cache_file(name, frozen_args) if name in PERSISTABLE_INVOKES else None
+    result = _read_cache_file(cache_file)
+    if result is None:
+        result = fn(*args, **kwargs)
+        _write_cache_file(cache_file, result)
+
+    _memory_cache[key] = result
+    return result
+
+
+def clear_cache():
+    """
+    Forgets all memoized results held in memory. The on-disk cache expires through its TTL.
+    """
+    _memory_cache.clear()
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _function_name(fn) -> str:
+    # pulumi_aws.ec2.get_vpc.get_vpc -> aws.ec2.get_vpc
+    module = fn.__module__.split(".")
+    if module[-1] == fn.__name__:
+        module = module[:-1]
+    module[0] = module[0].replace("pulumi_", "", 1)
+    return ".".join(module + [fn.__name__])
+
+
+def _freeze(value) -> str:
+    return json.dumps(_plain(value), sort_keys=True)
+
+
+def _plain(value):
+    if isinstance(value, (pulumi.Output, pulumi.Resource)) or hasattr(value, "__await__"):
+        raise _Unhashable()
+    if isinstance(value, Enum):
+        return value.value
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "__dict__"):
+        return {"__type__": type(value).__name__, **_plain(vars(value))}
+    raise _Unhashable()
+
+
+def _cache_dir():
+    directory = os.environ.get(CACHE_DIR_ENV_VAR) or pulumi.Config().get("invoke_cache_dir")
+    return directory or None
+
+
+def _cache_ttl() -> int:
+    ttl = os.environ.get(CACHE_TTL_ENV_VAR) or pulumi.Config().get("invoke_cache_ttl")
+    return int(ttl) if ttl else DEFAULT_CACHE_TTL
+
+
+def _cache_file(name, frozen_args):
+    directory = _cache_dir()
+    if not directory:
+        return None
+    # The caller identity is only memoized in memory: it is what scopes the on-disk cache.
+    account_id = invoke(aws.get_caller_identity).account_id
+    region = (pulumi.Config("aws").get("region")
+              or os.environ.get("AWS_REGION")
+              or os.environ.get("AWS_DEFAULT_REGION")
+              or "us-west-2")
+    digest = hashlib.sha256(f"{name}:{frozen_args}".encode("utf-8")).hexdigest()
+    return os.path.join(directory, f"{account_id}-{region}", f"{name}-{digest}.json")
+
+
+def _dump(value):
+    # Result types are plain classes holding their fields as attributes, and their nested types are dicts;
+    # both are written with their class so they can be rebuilt, plain dicts and lists as they are.
+    if isinstance(value, (list, tuple)):
+        return [_dump(v) for v in value]
+    if type(value).__module__.startswith("pulumi_aws."):
+        fields = value if isinstance(value, dict) else vars(value)
+        return {"__type__": f"{type(value).__module__}:{type(value).__qualname__}",
+                "fields": {k: _dump(v) for k, v in fields.items()}}
+    if isinstance(value, dict):
+        return {"__dict__": {str(k): _dump(v) for k, v in value.items()}}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+
+def _load(value):
+    if isinstance(value, list):
+        return [_load(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__dict__" in value:
+        return {k: _load(v) for k, v in value["__dict__"].items()}
+    module_name, _, class_name = value["__type__"].partition(":")
+    if not module_name.startswith("pulumi_aws.") or "." in class_name:
+        raise ValueError(f"Refusing to load {value['__type__']}")
+    result_type = getattr(importlib.import_module(module_name), class_name)
+    if not isinstance(result_type, type):
+        raise ValueError(f"Refusing to load {value['__type__']}")
+    return result_type(**{k: _load(v) for k, v in value["fields"].items()})
+
+
+def _read_cache_file(cache_file):
+    if not cache_file or not os.path.exists(cache_file):
+        return None
+    if time.time() - os.path.getmtime(cache_file) > _cache_ttl():
+        return None
+    try:
+        with open(cache_file, encoding="utf-8") as file:
+            return _load(json.load(file))
+    except Exception as e:
+        pulumi.log.warn(f"Ignoring unreadable invoke cache file {cache_file}: {e}")
+        return None
+
+
+def _write_cache_file(cache_file, result):
+    if not cache_file:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(_dump(result), file)
+        os.replace(temporary_file, cache_file)
+    except Exception as e:
+        pulumi.log.warn(f"Could not write invoke cache file {cache_file}: {e}")
@@ -4,7 +4,9 @@ import os
 import json
 from typing import Optional, List, Dict, Union, Any
 
+from strongmind_deployment import invoke_cache
 from strongmind_deployment.operations import get_code_owner_team_name
+from strongmind_deployment.util import validate_cpu_architecture
 
 
 # lambda_component.py
@@ -20,16 +22,27 @@ class LambdaArgs:
             runtime: str = "python3.11",
             timeout: int = 60,
             memory_size: int = 1024,
-            layers: Optional[List[str]] = None
+            layers: Optional[List[str]] = None,
+            cpu_architecture: Optional[str] = None
     ):
         self.handler = handler
         self.runtime = runtime
         self.timeout = timeout
         self.memory_size = memory_size
         self.layers = layers or []
+        self.cpu_architecture = cpu_architecture
 
         self.validate()
 
+    @property
+    def architectures(self):
+        """
+        The function's `architectures`, in Lambda's lower case spelling, or None for the x86_64 default.
+        """
+        if not self.cpu_architecture:
+            return None
+        return [self.cpu_architecture.lower()]
+
     def validate(self):
         # Validate runtime
         valid_runtimes = [
@@ -55,6 +68,27 @@ class LambdaArgs:
                 if not isinstance(layer, str):
                     raise ValueError("Each layer ARN must be a string")
 
+        if self.cpu_architecture:
+            self.cpu_architecture = validate_cpu_architecture(self.cpu_architecture)
+
+    def validate_layer_architectures(self):
+        """
+        Looks up each layer version and raises ValueError if it declares compatible architectures that do not
+        include cpu_architecture. Layers that declare none are assumed to be compatible.
+        """
+        if not self.cpu_architecture:
+            return
+        for layer in self.layers:
+            layer_name, _, version = layer.rpartition(":")
+            if not layer_name or not version.isdigit():
+                raise ValueError(f"Layer {layer} must be a layer version ARN to check its architectures")
+            layer_version = invoke_cache.invoke(aws.lambda_.get_layer_version,
+                                                layer_name=layer_name, version=int(version))
+            compatible_architectures = layer_version.compatible_architectures or []
+            if compatible_architectures and self.architectures[0] not in compatible_architectures:
+                raise ValueError(f"Layer {layer} supports {', '.join(compatible_architectures)}, "
+                                 f"not {self.architectures[0]}")
+
 
 class LambdaEnvVariables:
     """
@@ -112,6 +146,7 @@ class LambdaComponent(pulumi.ComponentResource):
         self.timeout = self.lambda_args.timeout
         self.runtime = self.lambda_args.runtime
         self.memory_size = self.lambda_args.memory_size
+        self.lambda_args.validate_layer_architectures()
 
         self.lambda_role = aws.iam.Role(
             f"{self.name}-lambda-role",
@@ -146,6 +181,7 @@ class LambdaComponent(pulumi.ComponentResource):
                 layer_name=f"{self.name}-layer",
                 code=pulumi.FileArchive("../lambda_layer.zip"),
                 compatible_runtimes=[self.lambda_args.runtime],
+                compatible_architectures=self.lambda_args.architectures,
             )
 
         # Build layers list - include custom layers from lambda_args and optionally the created layer
@@ -161,6 +197,7 @@ class LambdaComponent(pulumi.ComponentResource):
             handler=self.lambda_args.handler,
             runtime=self.runtime,
             layers=layers_list if layers_list else None,
+            architectures=self.lambda_args.architectures,
             memory_size=self.memory_size,
             timeout=self.timeout,
             environment={
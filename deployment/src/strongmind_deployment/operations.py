@@ -1,16 +1,15 @@
-import subprocess
 import pulumi_aws as aws
 import pulumi
 
+from strongmind_deployment import invoke_cache
+from strongmind_deployment.repository import get_owning_team
+
 def get_code_owner_team_name()-> str:
     """
-    Gets the code owner from the repositories CODEOWNERS file
+    Gets the code owner from the repositories CODEOWNERS file.
+    The lookup is memoized for the process, see strongmind_deployment.repository.
     """
-    path = subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
-    file_path = f"{path}/CODEOWNERS"
-    with open(file_path, 'r') as file:
-        owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
-    return owning_team
+    return get_owning_team()
 
 def get_opsgenie_sns_topic_arn()-> str:
     """
@@ -20,8 +19,8 @@ def get_opsgenie_sns_topic_arn()-> str:
     """
     owning_team = get_code_owner_team_name()
 
-    region = aws.get_region().name
-    account_id = aws.get_caller_identity().account_id
+    region = invoke_cache.invoke(aws.get_region).name
+    account_id = invoke_cache.invoke(aws.get_caller_identity).account_id
     return f"arn:aws:sns:{region}:{account_id}:{owning_team}-opsgenie"
 
 def get_opsgenie_metric_alarm_config() -> dict:
@@ -0,0 +1,327 @@
+import atexit
+import functools
+import importlib
+import json
+import os
+import pkgutil
+import subprocess
+import time
+from collections import Counter
+
+import pulumi
+
+PROFILE_ENV_VAR = "STRONGMIND_PROFILE"
+PROFILE_CONFIG_NAMESPACE = "strongmind"
+PROFILE_CONFIG_KEY = "profile"
+DEFAULT_REPORT_NAME = "strongmind-profile"
+
+_TRUTHY = ("1", "true", "yes", "on")
+
+_state = {
+    "enabled": False,
+    "patches": [],
+    "wrapped": [],
+    "report_path": None,
+    "started": time.perf_counter(),
+}
+_stack = []
+
+
+class _Frame:
+    """
+    Everything that happened while one component's __init__ was on the stack, excluding nested components.
+    """
+    def __init__(self, type_name, name):
+        self.type_name = type_name
+        self.name = name
+        self.wall_time = 0.0
+        self.resources = 0
+        self.deferred_resources = 0
+        self.invokes = Counter()
+        self.boto3_clients = Counter()
+        self.boto3_calls = Counter()
+        self.subprocesses = []
+        self.children = []
+
+    @property
+    def label(self):
+        return f"{self.type_name}({self.name})".replace(";", "_").replace(" ", "_")
+
+    def self_time(self):
+        return max(self.wall_time - sum(child.wall_time for child in self.children), 0.0)
+
+    def as_dict(self):
+        return {
+            "type": self.type_name,
+            "name": self.name,
+            "wall_time": round(self.wall_time, 6),
+            "self_time": round(self.self_time(), 6),
+            "resources": self.resources,
+            "deferred_resources": self.deferred_resources,
+            "invokes": dict(self.invokes),
+            "boto3_clients": dict(self.boto3_clients),
+            "boto3_calls": dict(self.boto3_calls),
+            "subprocesses": self.subprocesses,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+_root = _Frame("program", "")
+
+
+def enable_if_requested():
+    """
+    Enables the profiler when STRONGMIND_PROFILE or the `strongmind:profile` Pulumi config is set.
+    The value is either a truthy flag or the path prefix for the report files.
+    Nothing is patched on import: call this at the top of __main__.py, before any component is created.
+
+    Example:
+        from strongmind_deployment import profiler
+        profiler.enable_if_requested()
+    """
+    setting = os.environ.get(PROFILE_ENV_VAR) or _config_value(PROFILE_CONFIG_KEY)
+    if not setting or setting.lower() in ("0", "false", "no", "off"):
+        return
+    enable(None if setting.lower() in _TRUTHY else setting)
+
+
+def enable(report_path=None):
+    """
+    Wraps the __init__ of every strongmind_deployment component and starts counting resource registrations,
+    data-source invokes, boto3 calls and subprocesses per component.
+
+    A JSON report (`<report_path>.json`) and folded stacks for flame graph tools (`<report_path>.folded`,
+    self time in microseconds) are written when the program exits.
+    Without a report_path, the files are named strongmind-profile-<project>-<stack> in the working directory.
+    """
+    if _state["enabled"]:
+        return
+    _state["enabled"] = True
+    _state["report_path"] = report_path
+    _reset()
+    _install_patches()
+    for component_class in _component_classes():
+        wrap(component_class)
+    atexit.register(write_report)
+
+
+def disable():
+    """
+    Removes every wrapper and patch installed by enable() without writing a report.
+    """
+    if not _state["enabled"]:
+        return
+    atexit.unregister(write_report)
+    for owner, attribute, original in reversed(_state["patches"]):
+        setattr(owner, attribute, original)
+    for component_class, original in _state["wrapped"]:
+        component_class.__init__ = original
+    _state["patches"].clear()
+    _state["wrapped"].clear()
+    _state["enabled"] = False
+
+
+def wrap(component_class):
+    """
+    Profiles construction of `component_class`. Classes already wrapped, or inheriting a wrapped __init__,
+    are left alone so each component is only counted once.
+    """
+    original = component_class.__init__
+    if getattr(original, "_strongmind_profiled", False):
+        return
+
+    @functools.wraps(original)
+    def profiled_init(self, name, *args, **kwargs):
+        if getattr(self, "_strongmind_profile", None):
+            # A subclass calling super().__init__: already being profiled.
+            return original(self, name, *args, **kwargs)
+        frame = _Frame(type(self).__name__, name)
+        _current().children.append(frame)
+        self._strongmind_profile = frame
+        _stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return original(self, name, *args, **kwargs)
+        finally:
+            frame.wall_time = time.perf_counter() - start
+            _stack.pop()
+
+    profiled_init._strongmind_profiled = True
+    component_class.__init__ = profiled_init
+    _state["wrapped"].append((component_class, original))
+
+
+def report():
+    """
+    Returns the profile gathered so far as a dict.
+    """
+    _root.wall_time = time.perf_counter() - _state["started"]
+    return {
+        "project": _safe(pulumi.get_project),
+        "stack": _safe(pulumi.get_stack),
+        "program": _root.as_dict(),
+        "by_type": _totals_by_type(),
+    }
+
+
+def folded_stacks():
+    """
+    Returns the profile as `program;Outer(name);Inner(name) <self time in microseconds>` lines,
+    the input format of flamegraph.pl and speedscope.
+    """
+    _root.wall_time = time.perf_counter() - _state["started"]
+    lines = []
+
+    def visit(frame, prefix):
+        path = f"{prefix};{frame.label}" if prefix else frame.type_name
+        lines.append(f"{path} {int(frame.self_time() * 1_000_000)}")
+        for child in frame.children:
+            visit(child, path)
+
+    visit(_root, "")
+    return lines
+
+
+def write_report():
+    """
+    Writes the JSON report and folded stacks. Called automatically at exit once enabled.
+    """
+    path = _state["report_path"] or os.path.join(
+        os.getcwd(), f"{DEFAULT_REPORT_NAME}-{_safe(pulumi.get_project)}-{_safe(pulumi.get_stack)}")
+    try:
+        with open(f"{path}.json", "w") as file:
+            json.dump(report(), file, indent=2)
+        with open(f"{path}.folded", "w") as file:
+            file.write("\n".join(folded_stacks()) + "\n")
+        print(f"Construction profile written to {path}.json and {path}.folded")
+    except Exception as e:
+        print(f"ERROR writing construction profile to {path}: {e}")
+    return path
+
+
+def _reset():
+    global _root
+    _root = _Frame("program", "")
+    _stack.clear()
+    _state["started"] = time.perf_counter()
+
+
+def _current():
+    return _stack[-1] if _stack else _root
+
+
+def _patch(owner, attribute, replacement):
+    _state["patches"].append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, replacement)
+
+
+def _install_patches():
+    resource_init = pulumi.Resource.__init__
+
+    def counting_resource_init(self, t, name, custom, props=None, opts=None, *args, **kwargs):
+        if not getattr(self, "_strongmind_profile", None):
+            _count_resource(self, opts)
+        return resource_init(self, t, name, custom, props, opts, *args, **kwargs)
+
+    _patch(pulumi.Resource, "__init__", counting_resource_init)
+
+    for attribute in ("invoke", "invoke_async", "invoke_output"):
+        original = getattr(pulumi.runtime, attribute, None)
+        if original:
+            _patch(pulumi.runtime, attribute, _counting_invoke(original))
+
+    popen_init = subprocess.Popen.__init__
+
+    def counting_popen_init(self, args, *rest, **kwargs):
+        _current().subprocesses.append(args if isinstance(args, str) else " ".join(str(arg) for arg in args))
+        return popen_init(self, args, *rest, **kwargs)
+
+    _patch(subprocess.Popen, "__init__", counting_popen_init)
+
+    try:
+        import botocore.client
+        import botocore.session
+    except ImportError:
+        return
+
+    make_api_call = botocore.client.BaseClient._make_api_call
+    create_client = botocore.session.Session.create_client
+
+    def counting_make_api_call(self, operation_name, api_params):
+        _current().boto3_calls[f"{self.meta.service_model.service_name}:{operation_name}"] += 1
+        return make_api_call(self, operation_name, api_params)
+
+    def counting_create_client(self, service_name, *args, **kwargs):
+        _current().boto3_clients[service_name] += 1
+        return create_client(self, service_name, *args, **kwargs)
+
+    _patch(botocore.client.BaseClient, "_make_api_call", counting_make_api_call)
+    _patch(botocore.session.Session, "create_client", counting_create_client)
+
+
+def _counting_invoke(original):
+    @functools.wraps(original)
+    def counting_invoke(tok, *args, **kwargs):
+        _current().invokes[tok] += 1
+        return original(tok, *args, **kwargs)
+
+    return counting_invoke
+
+
+def _count_resource(resource, opts):
+    if _stack:
+        _stack[-1].resources += 1
+        resource._strongmind_owner = _stack[-1]
+        return
+    # Registered after construction, e.g. inside an apply: attribute it to the profiled parent.
+    parent = getattr(opts, "parent", None)
+    owner = getattr(parent, "_strongmind_profile", None) or getattr(parent, "_strongmind_owner", None)
+    if owner:
+        owner.deferred_resources += 1
+        resource._strongmind_owner = owner
+    else:
+        _root.resources += 1
+
+
+def _component_classes():
+    import strongmind_deployment
+
+    for module_info in pkgutil.iter_modules(strongmind_deployment.__path__):
+        if module_info.name == "profiler":
+            continue
+        module = importlib.import_module(f"strongmind_deployment.{module_info.name}")
+        for value in vars(module).values():
+            if (isinstance(value, type)
+                    and issubclass(value, pulumi.Resource)
+                    and value.__module__ == module.__name__):
+                yield value
+
+
+def _totals_by_type():
+    totals = {}
+
+    def visit(frame):
+        for child in frame.children:
+            total = totals.setdefault(child.type_name, {"count": 0, "self_time": 0.0, "resources": 0, "invokes": 0})
+            total["count"] += 1
+            total["self_time"] = round(total["self_time"] + child.self_time(), 6)
+            total["resources"] += child.resources + child.deferred_resources
+            total["invokes"] += sum(child.invokes.values())
+            visit(child)
+
+    visit(_root)
+    return dict(sorted(totals.items(), key=lambda item: item[1]["self_time"], reverse=True))
+
+
+def _safe(getter):
+    try:
+        return getter()
+    except Exception:
+        return "unknown"
+
+
+def _config_value(key: str):
+    try:
+        return pulumi.Config(PROFILE_CONFIG_NAMESPACE).get(key)
+    except Exception:
+        return None
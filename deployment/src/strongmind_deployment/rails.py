@@ -1,6 +1,5 @@
 import hashlib
 import os
-import subprocess
 
 import pulumi
 import pulumi_aws as aws
@@ -10,20 +9,97 @@ from pulumi import export, Output
 import boto3
 from botocore.exceptions import ClientError
 
+from strongmind_deployment import invoke_cache
 from strongmind_deployment import operations
 from strongmind_deployment.container import ContainerComponent
-from strongmind_deployment.execution import ExecutionComponent, ExecutionResourceInputs
+from strongmind_deployment.execution import ExecutionComponent, ExecutionResourceInputs, fingerprint_files, \
+    order_task_graph, DEFAULT_TIMEOUT as DEFAULT_EXECUTION_TIMEOUT
+from strongmind_deployment.repository import get_owning_team
 from strongmind_deployment.redis import RedisComponent, QueueComponent, CacheComponent
 from strongmind_deployment.secrets import SecretsComponent
 from strongmind_deployment.storage import StorageComponent
-from strongmind_deployment.dashboard import DashboardComponent
-from strongmind_deployment.util import create_ecs_cluster, qualify_component_name
+from strongmind_deployment.dashboard import DashboardComponent, DEFAULT_WIDGET_PROVIDERS, rds_proxy_widgets
+from strongmind_deployment.util import create_ecs_cluster, qualify_component_name, validate_fargate_spot_architecture
 
 
 def sidekiq_present():  # pragma: no cover
     return os.path.exists('../Gemfile') and 'sidekiq' in open('../Gemfile').read()
 
 
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_ASSET_UPLOAD_CMD = f"aws s3 sync public/assets s3://$S3_BUCKET_NAME/assets --cache-control '{ASSET_CACHE_CONTROL}'"
+DEFAULT_ASSET_MANIFEST_CMD = ("aws s3 sync s3://$S3_BUCKET_NAME/assets public/assets "
+                              "--exclude '*' --include '*manifest*.json'")
+# Aurora clusters have at most 15 replicas
+MAX_READER_COUNT = 15
+READER_AUTOSCALING_METRICS = {
+    "cpu": "RDSReaderAverageCPUUtilization",
+    "connections": "RDSReaderAverageDatabaseConnections",
+}
+DEFAULT_READER_AUTOSCALING_TARGETS = {"cpu": 60, "connections": 500}
+# SET statements from the pg adapter on connect would otherwise pin every Rails session to one database connection
+DEFAULT_SESSION_PINNING_FILTERS = ["EXCLUDE_VARIABLE_SETS"]
+# The longest start period ECS allows, for web tasks that compile assets before serving
+PRECOMPILE_START_PERIOD = 300
+# Web container settings the one-off migration task has no use for; it has no load balancer to deploy blue/green behind
+WEB_ONLY_KWARGS = ('container_health_check', 'health_check_grace_period', 'deployment_strategy')
+# Cluster parameters, by preset. work_mem is in kB and the auto_explain durations in ms.
+DB_PARAMETER_PRESETS = {
+    "oltp": {
+        "shared_preload_libraries": "pg_stat_statements,auto_explain",
+        "pg_stat_statements.track": "top",
+        "auto_explain.log_min_duration": 1000,
+        "random_page_cost": 1.1,
+        "work_mem": 16384,
+        "max_parallel_workers_per_gather": 0,
+        "idle_in_transaction_session_timeout": 300000,
+    },
+    "reporting": {
+        "shared_preload_libraries": "pg_stat_statements,auto_explain",
+        "pg_stat_statements.track": "all",
+        "auto_explain.log_min_duration": 10000,
+        "random_page_cost": 1.1,
+        "work_mem": 262144,
+        "max_parallel_workers_per_gather": 4,
+    },
+}
+# Parameters known to be dynamic, which are applied immediately. AWS rejects "immediate" for static parameters, so
+# every other parameter is applied at the next reboot unless it is given with an apply_method.
+IMMEDIATE_DB_PARAMETERS = {
+    "auto_explain.log_min_duration",
+    "idle_in_transaction_session_timeout",
+    "log_min_duration_statement",
+    "max_parallel_workers_per_gather",
+    "pg_stat_statements.track",
+    "random_page_cost",
+    "statement_timeout",
+    "work_mem",
+}
+
+
+def default_migration_fingerprint():
+    return fingerprint_files('../db/migrate/*', '../db/schema.rb', '../db/structure.sql', '../db/seeds.rb')
+
+
+def image_by_digest(image):
+    """
+    Returns `image` referenced by digest, so pushing a new image to a mutable tag such as `:latest` changes the
+    execution fingerprint. Tags of ECR images are resolved to their digest; other images must be referenced by digest.
+    """
+    if "@sha256:" in image:
+        return image
+    repository_url, tag = image, "latest"
+    if ":" in image.rsplit("/", 1)[-1]:
+        repository_url, tag = image.rsplit(":", 1)
+    registry, _, repository_name = repository_url.partition("/")
+    if ".dkr.ecr." not in registry:
+        raise ValueError(f"skip_unchanged_execution needs an ECR image or an image referenced by digest, got {image}")
+    digest = aws.ecr.get_image_output(registry_id=registry.split(".")[0],
+                                      repository_name=repository_name,
+                                      image_tag=tag).image_digest
+    return Output.concat(repository_url, "@", digest)
+
+
 class RailsComponent(pulumi.ComponentResource):
 
     def __init__(self, name, opts=None, **kwargs):
@@ -34,10 +110,26 @@ class RailsComponent(pulumi.ComponentResource):
         :param opts: A bag of optional settings that control this resource's behavior.
         :key env_vars: A dictionary of environment variables to pass to the Rails application.
         :key namespace: A name to override the default naming of resources and DNS names.
-        :key queue_redis: Either True to create a default queue Redis instance or a RedisComponent to use. Defaults to True if sidekiq is in the Gemfile.
-        :key cache_redis: Either True to create a default cache Redis instance or a RedisComponent to use.
+        :key queue_redis: Either True to create a default queue Redis instance, a dictionary of QueueComponent settings
+                          (e.g. `{"replicas": 1}` for automatic failover), or a RedisComponent to use. Defaults to True if sidekiq is in the Gemfile.
+                          Adding replicas to an existing queue replaces its Redis node and drops the queued jobs.
+        :key cache_redis: Either True to create a default cache Redis instance, a dictionary of CacheComponent settings
+                          (e.g. `{"replicas": 2}` for a replication group with a reader endpoint), or a RedisComponent to use.
+                          Its reader endpoint is exported as CACHE_REDIS_READER_URL, the primary URL with a single node.
         :key execution_cmd: The command for the pre-deployment execution container. Defaults to `["sh", "-c",
                                       "bundle exec rails db:prepare db:migrate db:seed assets:precompile && echo 'Migrations complete'"]`.
+        :key execution_timeout: Seconds to wait for the pre-deployment execution task before stopping it and failing the deployment. Defaults to 3600.
+        :key skip_unchanged_execution: Whether to skip the pre-deployment execution when the container image digest, execution command
+                                       and migration fingerprint are unchanged since it last ran. Tags of ECR images are resolved to
+                                       their digest; images from other registries must be referenced by digest. Defaults to False.
+        :key migration_fingerprint: A string that changes whenever the execution needs to run again, e.g. the schema version.
+                                    Defaults to a hash of db/migrate, db/schema.rb, db/structure.sql and db/seeds.rb in the parent directory.
+        :key force_execution: Whether to run the pre-deployment execution even if skip_unchanged_execution finds nothing changed. Defaults to False.
+        :key execution_tasks: Named pre-deployment tasks to run instead of the single execution_cmd, as a dictionary of
+                              name to `{"command": [...], "depends_on": [names]}`. Each runs on the migration task definition
+                              with its command overridden; tasks whose dependencies have finished run concurrently, e.g.
+                              `{"migrate": {"command": [...]}, "seed": {"command": [...], "depends_on": ["migrate"]},
+                              "assets": {"command": [...]}}`. Defaults to None.
         :key web_entry_point: The entry point for the web container. Defaults to the ENTRYPOINT in the Dockerfile.
         :key web_cmd: The command for the web container. Defaults to `["sh", "-c", "rails assets:precompile && rails server -b 0.0.0.0"]`.
         :key cpu: The number of CPU units to reserve for the web container. Defaults to 2048.
@@ -45,20 +137,64 @@ class RailsComponent(pulumi.ComponentResource):
         :key need_worker: Whether to create a worker container. Defaults to True if sidekiq is in the Gemfile.
         :key worker_entry_point: The entry point for the worker container. Defaults to the ENTRYPOINT in the Dockerfile. Requires need_worker to be True.
         :key worker_cmd: The command for the worker container. Defaults to `["sh", "-c", "bundle exec sidekiq"]`. Requires need_worker to be True.
+        :key cpu_architecture: The CPU architecture of the web, worker and migration tasks, "X86_64" or "ARM64" (Graviton).
+                               The container images must be built for it. ARM64 cannot be combined with
+                               worker_fargate_spot_weight. Defaults to None (X86_64).
         :key worker_cpu: The number of CPU units to reserve for the worker container. Defaults to 2048.
         :key worker_memory: The amount of memory (in MiB) to allow the worker container to use. Defaults to 4096.
+        :key worker_fargate_spot_weight: Run workers on FARGATE_SPOT as well as on-demand FARGATE, weighting Spot by this
+                                         against on-demand, e.g. 3 for three Spot tasks per on-demand task. Sidekiq
+                                         retries jobs from interrupted tasks. Setting it on a live stack replaces the
+                                         worker service, deleting the old one first. Defaults to None (on-demand only).
+        :key worker_fargate_base: Workers always run on on-demand FARGATE when worker_fargate_spot_weight is set.
+                                  Defaults to 1.
         :key worker_log_metric_filters: A list of log metric filters to create for the worker container. Defaults to `[]`.
+        :key worker_pools: Separate Sidekiq worker services, as a dictionary of pool name to settings, instead of the single
+                           worker container. Each pool needs `queues`, the queues its workers process (`sidekiq -q` order),
+                           and may override any ContainerComponent or WorkerAutoscaleComponent setting, e.g. `cpu`, `memory`,
+                           `desired_count`, `worker_min_number_of_instances`, `worker_max_number_of_instances`,
+                           `max_queue_latency_threshold`, `command`, or `worker_queue_name` (the QueueName dimension of the
+                           queue latency metric, defaulting to the pool name). Each pool gets its own ECS service and autoscaler.
+                           worker_log_metric_filters are not applied to pools; give a pool its own `log_metric_filters`.
+                           Defaults to None.
         :key dynamo_tables: A list of DynamoDB tables to create. Defaults to `[]`. Each table is a DynamoComponent.
         :key md5_hash_db_password: Whether to MD5 hash the database password. Defaults to False.
         :key storage: Whether to create an S3 bucket for the Rails application. Defaults to False.
         :key storage_private: Sets the bucket to public when false. Defaults to True.
+        :key precompile_assets_once: Whether to compile assets once per image in the pre-deployment execution instead of in every web task.
+                                     Creates the storage bucket, uploads public/assets to it and serves `/assets/*` from it
+                                     through CloudFront. Web tasks only fetch the asset manifest before running `rails server`.
+                                     A custom execution_cmd must upload the assets itself. Defaults to False.
+        :key asset_upload_cmd: The shell command that uploads compiled assets when precompile_assets_once is True.
+                               Defaults to an `aws s3 sync` of public/assets with a one year immutable Cache-Control.
+        :key asset_manifest_cmd: The shell command web tasks run to fetch the asset manifest when precompile_assets_once is True.
+                                 Defaults to an `aws s3 sync` of the manifest files only.
         :key custom_health_check_path: The path to use for the health check. Defaults to `/up`.
+        :key load_balancing_algorithm: How the web target group picks a task, "round_robin" or "least_outstanding_requests". See ContainerComponent.
+        :key slow_start: Seconds over which a new web task's share of traffic ramps up. See ContainerComponent. Defaults to 0 (off).
+        :key deregistration_delay: Seconds a draining web task keeps serving in-flight requests. Defaults to 300.
+        :key idle_timeout: Seconds the load balancer keeps an idle connection open. Defaults to 60.
+        :key health_check_interval: Seconds between load balancer health checks of web tasks. Defaults to 30.
+        :key healthy_threshold: Consecutive passing health checks before a web task receives traffic. Defaults to 2.
+        :key container_health_check: A health check ECS runs inside the web container. See ContainerComponent. Unless
+                                     precompile_assets_once is set, its start_period defaults to 300 seconds, the most
+                                     ECS allows, to cover `rails assets:precompile` at boot. Defaults to None.
+        :key health_check_grace_period: Seconds ECS ignores load balancer health checks after a web task starts. See ContainerComponent.
+        :key container_depends_on: Sidecar containers the web and worker containers wait for, by name, with the condition
+                                   to wait for, e.g. `{"datadog-agent": "HEALTHY"}`. Defaults to {}.
+        :key deployment_strategy: How the web container deploys, "rolling" or "blue_green" through CodeDeploy with automatic rollback.
+                                  See ContainerComponent for the blue_green_* settings. Workers always roll. Defaults to "rolling".
+        :key worker_container_health_check: A health check ECS runs inside the worker container, like container_health_check
+                                            but without a default command: it must be a dictionary with `command`.
+                                            Defaults to None.
         :key snapshot_identifier: The snapshot identifier to use for the RDS cluster. Defaults to None.
         :key kms_key_id: The KMS key ID to use for the RDS cluster. Defaults to None.
         :key db_name: The name of the database. Defaults to app.
         :key db_username: The username for connecting to the app database. Defaults to project name and environment.
         :key autoscale: Whether to autoscale the web container. Defaults to True.
+        :key autoscale_mode: How the web container autoscales, "step" or "target_tracking". See ContainerComponent. Defaults to "step".
         :key worker_autoscale: Whether to autoscale the worker container. Defaults to True.
+        :key worker_autoscale_mode: How the worker container follows the queue, "step", "proportional" or "target_tracking". See WorkerAutoscaleComponent. Defaults to "step".
         :key db_engine_version: The version of the database engine. Defaults to 15.4.
         :key desired_web_count: The number of instances of the web container to run. Defaults to 1.
         :key desired_worker_count: The number of instances of the worker container to run. Defaults to 1.
@@ -68,9 +204,21 @@ class RailsComponent(pulumi.ComponentResource):
                                         Note: All containers automatically have access to assume the StrongmindStageAccessRole.
         :key cross_account_arn_role: The primary cross-account role ARN that containers can assume. Defaults to StrongmindStageAccessRole.
         :key reader_instance_count: The number of reader instances for the RDS cluster. Defaults to 0.
+        :key reader_autoscaling: Whether Application Auto Scaling adds and removes db.serverless reader instances to keep
+                                 the average reader metric at reader_autoscaling_target. The reader_instance_count readers
+                                 are kept and count towards reader_min_count. Defaults to False.
+        :key reader_min_count: The fewest readers when reader_autoscaling. Must be at least 1 so the reader metric has data.
+                               Defaults to reader_instance_count, or 1.
+        :key reader_max_count: The most readers when reader_autoscaling, at most 15. Defaults to 5.
+        :key reader_autoscaling_metric: The reader metric to track, "cpu" (RDSReaderAverageCPUUtilization) or "connections"
+                                        (RDSReaderAverageDatabaseConnections). Defaults to "cpu".
+        :key reader_autoscaling_target: The target average of the reader metric. Defaults to 60 (% CPU) or 500 (connections).
+        :key reader_scale_out_cooldown: Seconds after adding a reader before adding another. Defaults to 300.
+        :key reader_scale_in_cooldown: Seconds after removing a reader before removing another. Defaults to 900.
         :key enable_rds_proxy: Whether to enable RDS Proxy for connection pooling. Defaults to False.
                                When enabled, creates a read/write proxy endpoint (exported as 'rds_proxy_endpoint').
-                               If reader_instance_count > 0, also creates a read-only proxy endpoint (exported as 'rds_proxy_readonly_endpoint').
+                               If reader_instance_count > 0 or reader_autoscaling, also creates a read-only proxy endpoint
+                               (exported as 'rds_proxy_readonly_endpoint') that spreads connections over the readers.
                                The following environment variables are automatically added to containers:
                                - RDS_PROXY_ENDPOINT: The read/write proxy endpoint
                                - RDS_PROXY_READONLY_ENDPOINT: The read-only proxy endpoint (only if reader instances exist)
@@ -78,6 +226,18 @@ class RailsComponent(pulumi.ComponentResource):
                                1. Primary authentication using the master database credentials
                                2. ELT reader authentication using a placeholder secret ({namespace}-rds-proxy-elt-reader-secret)
                                   that must be manually populated with the appropriate database user credentials
+        :key rds_proxy_max_connections_percent: The share of the database's max_connections the proxy may open, 1 to 100.
+                                                Lower it when other clients connect to the database directly. Defaults to 100.
+        :key rds_proxy_max_idle_connections_percent: The share of the database's max_connections the proxy keeps open while
+                                                     idle, at most rds_proxy_max_connections_percent. Defaults to 5.
+        :key rds_proxy_connection_borrow_timeout: Seconds a client waits for a database connection when the pool is exhausted,
+                                                  0 to 3600. Defaults to 120.
+        :key rds_proxy_init_query: SQL the proxy runs on each new database connection, e.g. `SET TIME ZONE 'UTC'`,
+                                   so clients do not need session state that pins. Defaults to None.
+        :key rds_proxy_session_pinning_filters: Statements that do not pin a session to a database connection.
+                                                Defaults to ["EXCLUDE_VARIABLE_SETS"]. Prepared statements still pin, so
+                                                set `prepared_statements: false` in database.yml to multiplex Rails sessions.
+                                                The proxy's connection, borrow latency and pinning metrics are added to the dashboard.
         :key vpc_subnet_ids: Optional list of VPC subnet IDs for the RDS Proxy. If not provided when enable_rds_proxy is True, uses default VPC public subnets.
         :key vpc_security_group_ids: Optional list of VPC security group IDs for the RDS Proxy. If not provided, AWS will use the default VPC security group.
         :key sidecar_containers: Optional list of additional container definitions to run alongside Rails containers (e.g., Datadog agent, logging sidecars).
@@ -85,6 +245,19 @@ class RailsComponent(pulumi.ComponentResource):
         :key enable_db_cloudwatch_logs: Whether to enable CloudWatch Logs exports for the RDS cluster. Defaults to True.
                                         When enabled, PostgreSQL logs are exported to CloudWatch Logs at /aws/rds/cluster/{cluster-identifier}/postgresql.
                                         This enables monitoring of slow queries, connections, errors, and DDL statements.
+        :key db_parameter_preset: Creates and attaches a managed cluster parameter group with the named preset, "oltp"
+                                  (pg_stat_statements, auto_explain, small work_mem, no parallel queries) or "reporting"
+                                  (pg_stat_statements, auto_explain, large work_mem, parallel queries). Defaults to None:
+                                  the cluster and instances keep the default parameter groups unless parameters are given.
+        :key db_cluster_parameters: Cluster parameters by name, merged over the preset, e.g. `{"work_mem": 65536}`.
+                                    A parameter can also be a dictionary of `value` and `apply_method`, e.g.
+                                    `{"rds.logical_replication": {"value": 1, "apply_method": "pending-reboot"}}`.
+                                    Defaults to {}.
+        :key db_instance_parameters: Parameters by name for a DB parameter group attached to the writer and every
+                                     reader instance, given like db_cluster_parameters. Defaults to {}.
+                                     Parameters without an apply_method are applied immediately only when they are
+                                     known to be dynamic (IMMEDIATE_DB_PARAMETERS), and otherwise with pending-reboot,
+                                     so a deploy never restarts the database; they take effect at the next reboot.
         :key rds_tags: Optional dictionary of additional tags to apply to RDS resources (cluster and instances). Defaults to {}.
                       These tags are merged with the default tags (product, repository, service, environment, owner).
         """
@@ -92,6 +265,7 @@ class RailsComponent(pulumi.ComponentResource):
         self.container_security_groups = None
         self.execution = None
         self.ecs_cluster = None
+        self.ecs_cluster_capacity_providers = None
         self.migration_container = None
         self.queue_redis = None
         self.cache_redis = None
@@ -102,6 +276,7 @@ class RailsComponent(pulumi.ComponentResource):
         self.firewall_rule = None
         self.web_container = None
         self.worker_container = None
+        self.worker_containers = {}
         self.secret = None
         self.kwargs = kwargs
         self.worker_log_metric_filters = self.kwargs.get('worker_log_metric_filters', [])
@@ -117,6 +292,16 @@ class RailsComponent(pulumi.ComponentResource):
         self.rds_minimum_capacity = self.kwargs.get('rds_minimum_capacity', 1)
         self.rds_maximum_capacity = self.kwargs.get('rds_maximum_capacity', 128)
         self.enable_db_cloudwatch_logs = self.kwargs.get('enable_db_cloudwatch_logs', True)
+        self.precompile_assets_once = self.kwargs.get('precompile_assets_once', False)
+        if self.precompile_assets_once and not self.kwargs.get('use_cloudfront', True):
+            raise ValueError("precompile_assets_once serves assets through CloudFront and requires use_cloudfront")
+        if self.kwargs.get('worker_fargate_spot_weight'):
+            validate_fargate_spot_architecture(self.kwargs.get('cpu_architecture'), "worker_fargate_spot_weight")
+        worker_container_health_check = self.kwargs.get('worker_container_health_check')
+        if worker_container_health_check and not (isinstance(worker_container_health_check, dict)
+                                                  and 'command' in worker_container_health_check):
+            raise ValueError("worker_container_health_check needs a command, the web health check does not apply "
+                             "to workers")
         self.kwargs['sns_topic_arn'] = self.kwargs.get('sns_topic_arn',
                                                        operations.get_opsgenie_sns_topic_arn())
         
@@ -129,10 +314,7 @@ class RailsComponent(pulumi.ComponentResource):
         project = pulumi.get_project()
         stack = pulumi.get_stack()
         self.namespace = self.kwargs.get('namespace', f"{project}-{stack}")
-        path = subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
-        file_path = f"{path}/CODEOWNERS"
-        with open(file_path, 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         self.tags = {
             "product": project,
@@ -208,6 +390,8 @@ class RailsComponent(pulumi.ComponentResource):
             if isinstance(self.kwargs['queue_redis'], RedisComponent):
                 self.queue_redis = self.kwargs['queue_redis']
             elif self.kwargs['queue_redis']:
+                if isinstance(self.kwargs['queue_redis'], dict):
+                    queue_redis_kwargs.update(self.kwargs['queue_redis'])
                 self.queue_redis = QueueComponent(qualify_component_name('queue-redis', self.kwargs),
                                                   **queue_redis_kwargs)
 
@@ -220,12 +404,15 @@ class RailsComponent(pulumi.ComponentResource):
                 cache_redis_kwargs = {}
                 if 'namespace' in self.kwargs:
                     cache_redis_kwargs['namespace'] = self.kwargs['namespace']
+                if isinstance(self.kwargs['cache_redis'], dict):
+                    cache_redis_kwargs.update(self.kwargs['cache_redis'])
                 self.cache_redis = CacheComponent(qualify_component_name('cache-redis', self.kwargs),
                                                   **cache_redis_kwargs)
 
             if self.cache_redis:
                 self.env_vars['CACHE_REDIS_URL'] = self.cache_redis.url
                 self.env_vars['REDIS_SERVER'] = self.cache_redis.url
+                self.env_vars['CACHE_REDIS_READER_URL'] = self.cache_redis.reader_url
 
     def security(self):
         self.firewall_rule = aws.ec2.SecurityGroupRule(
@@ -241,9 +428,31 @@ class RailsComponent(pulumi.ComponentResource):
                                                     self.web_container])
         )
 
+    def execution_tasks(self):
+        execution_tasks = self.kwargs.get('execution_tasks')
+        if not execution_tasks:
+            return None
+        if self.precompile_assets_once and 'assets' not in execution_tasks:
+            asset_upload = self.kwargs.get('asset_upload_cmd', DEFAULT_ASSET_UPLOAD_CMD)
+            execution_tasks = {
+                **execution_tasks,
+                'assets': {"command": ["sh", "-c", f"bundle exec rails assets:precompile && {asset_upload}"]},
+            }
+        tasks = [
+            {
+                "name": name,
+                "command": list(task.get("command") or []),
+                "depends_on": list(task.get("depends_on") or []),
+            }
+            for name, task in execution_tasks.items()
+        ]
+        order_task_graph(tasks)
+        return tasks
+
     def ecs(self):
         self.ecs_cluster = create_ecs_cluster(self, self.namespace, self.kwargs)
         self.kwargs['ecs_cluster'] = self.ecs_cluster
+        self.kwargs['ecs_cluster_capacity_providers'] = self.ecs_cluster_capacity_providers
 
         container_image = os.environ['CONTAINER_IMAGE']
         master_key = os.environ['RAILS_MASTER_KEY']
@@ -275,13 +484,15 @@ class RailsComponent(pulumi.ComponentResource):
         execution_entry_point = self.kwargs.get("execution_entry_point", [])
         self.kwargs['entry_point'] = execution_entry_point
 
+        asset_upload = f"{self.kwargs.get('asset_upload_cmd', DEFAULT_ASSET_UPLOAD_CMD)} && " \
+            if self.precompile_assets_once else ""
         execution_cmd = self.kwargs.get("execution_cmd",
                                         ["sh", "-c",
                                          "bundle exec rails db:prepare db:migrate db:seed assets:precompile && "
-                                         "echo 'Migrations complete'"])
+                                         f"{asset_upload}echo 'Migrations complete'"])
         self.kwargs['command'] = execution_cmd
 
-        if self.kwargs.get('storage', False):
+        if self.kwargs.get('storage', False) or self.precompile_assets_once:
             self.setup_storage()
             self.kwargs['env_vars'].update(self.storage.s3_env_vars)
 
@@ -294,7 +505,7 @@ class RailsComponent(pulumi.ComponentResource):
             desired_count=0,
             opts=pulumi.ResourceOptions(parent=self,
                                         depends_on=[self.rds_serverless_cluster_instance]),
-            **self.kwargs
+            **{key: value for key, value in self.kwargs.items() if key not in WEB_ONLY_KWARGS}
         )
 
         subnets = self.kwargs.get(
@@ -308,14 +519,30 @@ class RailsComponent(pulumi.ComponentResource):
             family=self.migration_container.namespace,
             subnets=subnets,
             security_groups=self.container_security_groups,
+            timeout=self.kwargs.get('execution_timeout', DEFAULT_EXECUTION_TIMEOUT),
+            image=container_image,
+            command=execution_cmd,
+            skip_unchanged=self.kwargs.get('skip_unchanged_execution', False),
+            force_run=self.kwargs.get('force_execution', False),
+            tasks=self.execution_tasks(),
         )
+        if execution_inputs.skip_unchanged:
+            execution_inputs.image = image_by_digest(container_image)
+            execution_inputs.migration_fingerprint = self.kwargs.get('migration_fingerprint')
+            if execution_inputs.migration_fingerprint is None:
+                execution_inputs.migration_fingerprint = default_migration_fingerprint()
         self.execution = ExecutionComponent(qualify_component_name("execution", self.kwargs),
                                             execution_inputs,
                                             opts=pulumi.ResourceOptions(parent=self,
                                                                         depends_on=[self.migration_container]))
 
         web_entry_point = self.kwargs.get('web_entry_point')
-        web_command = self.kwargs.get('web_cmd', ["sh", "-c", "rails assets:precompile && rails server -b 0.0.0.0"])
+        if self.precompile_assets_once:
+            asset_manifest = self.kwargs.get('asset_manifest_cmd', DEFAULT_ASSET_MANIFEST_CMD)
+            web_command = self.kwargs.get('web_cmd', ["sh", "-c", f"{asset_manifest} && rails server -b 0.0.0.0"])
+            self.kwargs['assets_bucket'] = self.storage.bucket
+        else:
+            web_command = self.kwargs.get('web_cmd', ["sh", "-c", "rails assets:precompile && rails server -b 0.0.0.0"])
 
         self.kwargs['secrets'] = self.secret.get_secrets()  # pragma: no cover
         self.kwargs['entry_point'] = web_entry_point
@@ -326,6 +553,7 @@ class RailsComponent(pulumi.ComponentResource):
         self.kwargs['desired_count'] = self.current_desired_count
         self.kwargs['autoscale'] = self.autoscale
         self.kwargs['worker_autoscale'] = False
+        self.kwargs['container_health_check'] = self.web_container_health_check()
         
         self.web_container = ContainerComponent(qualify_component_name("container", self.kwargs),
                                                 pulumi.ResourceOptions(parent=self,
@@ -333,6 +561,7 @@ class RailsComponent(pulumi.ComponentResource):
                                                                        ),
                                                 **self.kwargs
                                                 )
+        self.kwargs.pop('assets_bucket', None)
         self.need_worker = self.kwargs.get('need_worker', None)
         if self.need_worker is None:  # pragma: no cover
             # If we don't know if we need a worker, check for sidekiq in the Gemfile
@@ -341,6 +570,16 @@ class RailsComponent(pulumi.ComponentResource):
         if self.need_worker:
             self.setup_worker()
 
+    def web_container_health_check(self):
+        """
+        The web container health check, with a start period long enough for assets to compile at boot.
+        """
+        container_health_check = self.kwargs.get('container_health_check')
+        if not container_health_check or self.precompile_assets_once:
+            return container_health_check
+        settings = container_health_check if isinstance(container_health_check, dict) else {}
+        return {"start_period": PRECOMPILE_START_PERIOD, **settings}
+
     def setup_worker(self):  # , execution):
         worker_cmd = self.kwargs.get('worker_cmd', ["sh", "-c", "bundle exec sidekiq"])
         worker_entry_point = self.kwargs.get('worker_entry_point')
@@ -354,24 +593,57 @@ class RailsComponent(pulumi.ComponentResource):
             self.kwargs['memory'] = self.kwargs.get('worker_memory')
         self.kwargs['ecs_cluster_arn'] = self.ecs_cluster.arn
         self.kwargs['need_load_balancer'] = False
-        self.kwargs['secrets'] = self.secret.get_secrets()  # pragma: no cover
         self.kwargs['log_metric_filters'] = self.worker_log_metric_filters
         self.kwargs['desired_count'] = self.desired_worker_count
         self.kwargs['autoscale'] = False
         self.kwargs['worker_autoscale'] = self.worker_autoscale
         self.kwargs['deployment_maximum_percent'] = 200
+        self.kwargs['fargate_spot_weight'] = self.kwargs.get('worker_fargate_spot_weight')
+        self.kwargs['fargate_base'] = self.kwargs.get('worker_fargate_base', 1)
+        self.kwargs['container_health_check'] = self.kwargs.get('worker_container_health_check')
+        self.kwargs['deployment_strategy'] = "rolling"
         self.kwargs['env_vars'].update({
             'PROCESS_TYPE': 'worker'
         })
 
-        self.worker_container = ContainerComponent(qualify_component_name("worker", self.kwargs),
-                                                   pulumi.ResourceOptions(parent=self,
-                                                                          depends_on=[self.execution]
-                                                                          ),
-                                                   **self.kwargs
-                                                   )
+        if self.kwargs.get('worker_pools'):
+            self.setup_worker_pools(self.kwargs['worker_pools'])
+        else:
+            self.kwargs['secrets'] = self.secret.get_secrets()  # pragma: no cover
+            self.worker_container = ContainerComponent(qualify_component_name("worker", self.kwargs),
+                                                       pulumi.ResourceOptions(parent=self,
+                                                                              depends_on=[self.execution]
+                                                                              ),
+                                                       **self.kwargs
+                                                       )
         self.kwargs['log_metric_filters'] = []
 
+    def setup_worker_pools(self, worker_pools):
+        """
+        Creates one worker service, with its own autoscaling, per pool so that queues in one pool can't
+        starve the others of workers.
+        """
+        for pool_name, pool in worker_pools.items():
+            if not pool.get('queues'):
+                raise ValueError(f"worker pool {pool_name} must list the queues it processes")
+        for pool_name, pool in worker_pools.items():
+            queue_args = " ".join(f"-q {queue}" for queue in pool['queues'])
+            pool_kwargs = {
+                **self.kwargs,
+                'command': ["sh", "-c", f"bundle exec sidekiq {queue_args}"],
+                'worker_pool': pool_name,
+                'worker_queue_name': pool_name,
+                'secrets': self.secret.get_secrets(),  # pragma: no cover
+                'env_vars': {**self.kwargs['env_vars'], 'WORKER_POOL': pool_name},
+                'log_metric_filters': [],
+                **{key: value for key, value in pool.items() if key != 'queues'},
+            }
+            self.worker_containers[pool_name] = ContainerComponent(
+                qualify_component_name(f"worker-{pool_name}", self.kwargs),
+                pulumi.ResourceOptions(parent=self, depends_on=[self.execution]),
+                **pool_kwargs
+            )
+
     def secrets(self):
         self.secret = SecretsComponent(qualify_component_name("secrets", self.kwargs),
                                        pulumi.ResourceOptions(parent=self),
@@ -391,6 +663,7 @@ class RailsComponent(pulumi.ComponentResource):
         self.db_name = self.kwargs.get("db_name", "app")
 
         self.hashed_password = self.db_password.result.apply(self.salt_and_hash_password)
+        self._create_parameter_groups()
 
         master_db_password = self.db_password.result
         if self.kwargs.get('md5_hash_db_password'):
@@ -416,6 +689,7 @@ class RailsComponent(pulumi.ComponentResource):
                 max_capacity=self.rds_maximum_capacity,
             ),
             snapshot_identifier=self.snapshot_identifier,
+            db_cluster_parameter_group_name=self.cluster_parameter_group.name if self.cluster_parameter_group else None,
             kms_key_id=self.kms_key_id,
             storage_encrypted=bool(self.kms_key_id),
             tags=self.rds_tags,
@@ -439,6 +713,7 @@ class RailsComponent(pulumi.ComponentResource):
             instance_class='db.serverless',
             engine=self.rds_serverless_cluster.engine,
             engine_version=self.rds_serverless_cluster.engine_version,
+            db_parameter_group_name=self.db_parameter_group_name,
             apply_immediately=True,
             publicly_accessible=True,
             tags=self.rds_tags,
@@ -464,6 +739,7 @@ class RailsComponent(pulumi.ComponentResource):
                 instance_class='db.serverless',
                 engine=self.rds_serverless_cluster.engine,
                 engine_version=self.rds_serverless_cluster.engine_version,
+                db_parameter_group_name=self.db_parameter_group_name,
                 apply_immediately=True,
                 publicly_accessible=True,
                 promotion_tier=i + 2,  # Higher tier = lower priority for promotion
@@ -481,6 +757,12 @@ class RailsComponent(pulumi.ComponentResource):
                 ),
             )
             self.reader_instances.append(reader_instance)
+
+        self.reader_autoscaling = self.kwargs.get('reader_autoscaling', False)
+        self.reader_autoscaling_target = None
+        self.reader_scaling_policy = None
+        if self.reader_autoscaling:
+            self._create_reader_autoscaling(reader_instance_count)
         
         # Create RDS Proxy if enabled
         enable_rds_proxy = self.kwargs.get('enable_rds_proxy', False)
@@ -493,6 +775,136 @@ class RailsComponent(pulumi.ComponentResource):
 
         export("db_endpoint", Output.concat(self.rds_serverless_cluster.endpoint))
 
+    @property
+    def db_parameter_group_name(self):
+        return self.db_parameter_group.name if self.db_parameter_group else None
+
+    def _create_parameter_groups(self):
+        """
+        Create the cluster and DB parameter groups when a preset or parameters are given. Their names include the
+        parameter group family, so a major version upgrade creates new groups instead of modifying the attached ones.
+        """
+        self.cluster_parameter_group = None
+        self.db_parameter_group = None
+        preset = self.kwargs.get('db_parameter_preset')
+        cluster_parameters = self.kwargs.get('db_cluster_parameters', {})
+        instance_parameters = self.kwargs.get('db_instance_parameters', {})
+        if preset is not None and preset not in DB_PARAMETER_PRESETS:
+            raise ValueError(f"db_parameter_preset must be one of {', '.join(DB_PARAMETER_PRESETS)}")
+        if preset is None and not cluster_parameters and not instance_parameters:
+            return
+
+        family = f"aurora-postgresql{self.engine_version.split('.')[0]}"
+        cluster_parameters = {**DB_PARAMETER_PRESETS.get(preset, {}), **cluster_parameters}
+        pending_reboot = sorted({name for parameters in (cluster_parameters, instance_parameters)
+                                 for name, setting in parameters.items()
+                                 if self._db_parameter(name, setting)[1] == "pending-reboot"})
+        if pending_reboot:
+            pulumi.log.info(f"DB parameters {', '.join(pending_reboot)} take effect at the next database reboot")
+
+        self.cluster_parameter_group = aws.rds.ClusterParameterGroup(
+            qualify_component_name('rds_cluster_parameter_group', self.kwargs),
+            name=f"{self.namespace}-{family}",
+            family=family,
+            description=f"{self.namespace} cluster parameters ({preset or 'custom'})",
+            parameters=self._db_parameters(cluster_parameters, aws.rds.ClusterParameterGroupParameterArgs),
+            tags=self.rds_tags,
+            opts=pulumi.ResourceOptions(parent=self),
+        )
+        self.db_parameter_group = aws.rds.ParameterGroup(
+            qualify_component_name('rds_db_parameter_group', self.kwargs),
+            name=f"{self.namespace}-{family}-instance",
+            family=family,
+            description=f"{self.namespace} instance parameters",
+            parameters=self._db_parameters(instance_parameters, aws.rds.ParameterGroupParameterArgs),
+            tags=self.rds_tags,
+            opts=pulumi.ResourceOptions(parent=self),
+        )
+
+    @staticmethod
+    def _db_parameter(name, setting):
+        """
+        The value and apply method of a parameter given either as a value or as a dictionary of `value` and
+        `apply_method`.
+        """
+        apply_method = "immediate" if name in IMMEDIATE_DB_PARAMETERS else "pending-reboot"
+        if isinstance(setting, dict):
+            return str(setting["value"]), setting.get("apply_method", apply_method)
+        return str(setting), apply_method
+
+    @classmethod
+    def _db_parameters(cls, parameters, parameter_args):
+        parameter_list = []
+        for name, setting in sorted(parameters.items()):
+            value, apply_method = cls._db_parameter(name, setting)
+            parameter_list.append(parameter_args(name=name, value=value, apply_method=apply_method))
+        return parameter_list
+
+    def _create_reader_autoscaling(self, reader_instance_count):
+        """
+        Register the replica count of the cluster with Application Auto Scaling. Aurora creates the readers it adds
+        with the instance class of the writer and removes only the readers it added.
+        """
+        min_count = self.kwargs.get('reader_min_count', max(reader_instance_count, 1))
+        max_count = self.kwargs.get('reader_max_count', 5)
+        metric = self.kwargs.get('reader_autoscaling_metric', 'cpu')
+        if metric not in READER_AUTOSCALING_METRICS:
+            raise ValueError(f"reader_autoscaling_metric must be one of {', '.join(READER_AUTOSCALING_METRICS)}")
+        if min_count < 1:
+            raise ValueError("reader_min_count must be at least 1 when reader_autoscaling")
+        if max_count < min_count or max_count > MAX_READER_COUNT:
+            raise ValueError(f"reader_max_count must be between reader_min_count and {MAX_READER_COUNT}")
+
+        self.reader_autoscaling_target = aws.appautoscaling.Target(
+            qualify_component_name('rds_reader_autoscaling_target', self.kwargs),
+            min_capacity=min_count,
+            max_capacity=max_count,
+            resource_id=Output.concat("cluster:", self.rds_serverless_cluster.cluster_identifier),
+            scalable_dimension="rds:cluster:ReadReplicaCount",
+            service_namespace="rds",
+            opts=pulumi.ResourceOptions(
+                parent=self,
+                depends_on=[self.rds_serverless_cluster_instance] + self.reader_instances
+            ),
+        )
+        self.reader_scaling_policy = aws.appautoscaling.Policy(
+            qualify_component_name('rds_reader_scaling_policy', self.kwargs),
+            name=f"{self.namespace}-rds-reader-{metric}-scaling-policy",
+            policy_type="TargetTrackingScaling",
+            resource_id=self.reader_autoscaling_target.resource_id,
+            scalable_dimension=self.reader_autoscaling_target.scalable_dimension,
+            service_namespace=self.reader_autoscaling_target.service_namespace,
+            target_tracking_scaling_policy_configuration=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationArgs(
+                target_value=self.kwargs.get('reader_autoscaling_target', DEFAULT_READER_AUTOSCALING_TARGETS[metric]),
+                predefined_metric_specification=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationPredefinedMetricSpecificationArgs(
+                    predefined_metric_type=READER_AUTOSCALING_METRICS[metric],
+                ),
+                scale_out_cooldown=self.kwargs.get('reader_scale_out_cooldown', 300),
+                scale_in_cooldown=self.kwargs.get('reader_scale_in_cooldown', 900),
+            ),
+            opts=pulumi.ResourceOptions(parent=self.reader_autoscaling_target),
+        )
+
+    def _proxy_connection_pool_config(self):
+        max_connections_percent = self.kwargs.get('rds_proxy_max_connections_percent', 100)
+        max_idle_connections_percent = self.kwargs.get('rds_proxy_max_idle_connections_percent', 5)
+        connection_borrow_timeout = self.kwargs.get('rds_proxy_connection_borrow_timeout', 120)
+        if not 1 <= max_connections_percent <= 100:
+            raise ValueError("rds_proxy_max_connections_percent must be between 1 and 100")
+        if not 0 <= max_idle_connections_percent <= max_connections_percent:
+            raise ValueError("rds_proxy_max_idle_connections_percent must be between 0 and "
+                             "rds_proxy_max_connections_percent")
+        if not 0 <= connection_borrow_timeout <= 3600:
+            raise ValueError("rds_proxy_connection_borrow_timeout must be between 0 and 3600 seconds")
+        return aws.rds.ProxyDefaultTargetGroupConnectionPoolConfigArgs(
+            max_connections_percent=max_connections_percent,
+            max_idle_connections_percent=max_idle_connections_percent,
+            connection_borrow_timeout=connection_borrow_timeout,
+            init_query=self.kwargs.get('rds_proxy_init_query'),
+            session_pinning_filters=self.kwargs.get('rds_proxy_session_pinning_filters',
+                                                    DEFAULT_SESSION_PINNING_FILTERS),
+        )
+
     def _create_rds_proxy(self):
         """Create an RDS Proxy for connection pooling."""
         vpc_subnet_ids = self.kwargs.get('vpc_subnet_ids')
@@ -533,7 +945,8 @@ class RailsComponent(pulumi.ComponentResource):
         )
 
         # Create IAM role for RDS Proxy
-        assume_role_policy = aws.iam.get_policy_document(
+        assume_role_policy = invoke_cache.invoke(
+            aws.iam.get_policy_document,
             statements=[aws.iam.GetPolicyDocumentStatementArgs(
                 actions=["sts:AssumeRole"],
                 principals=[aws.iam.GetPolicyDocumentStatementPrincipalArgs(
@@ -624,11 +1037,7 @@ class RailsComponent(pulumi.ComponentResource):
         self.proxy_default_target_group = aws.rds.ProxyDefaultTargetGroup(
             qualify_component_name('rds_proxy_target_group', self.kwargs),
             db_proxy_name=self.rds_proxy.name,
-            connection_pool_config=aws.rds.ProxyDefaultTargetGroupConnectionPoolConfigArgs(
-                max_connections_percent=100,
-                max_idle_connections_percent=5,
-                connection_borrow_timeout=120,
-            ),
+            connection_pool_config=self._proxy_connection_pool_config(),
             opts=pulumi.ResourceOptions(parent=self.rds_proxy)
         )
 
@@ -641,8 +1050,9 @@ class RailsComponent(pulumi.ComponentResource):
             opts=pulumi.ResourceOptions(parent=self.proxy_default_target_group)
         )
 
-        # Create a read-only endpoint for the proxy if there are reader instances
-        if self.reader_instances:
+        # Create a read-only endpoint for the proxy if there are or will be reader instances.
+        # The proxy targets the cluster, so it picks up readers added by autoscaling.
+        if self.reader_instances or self.reader_autoscaling:
             self.proxy_readonly_endpoint = aws.rds.ProxyEndpoint(
                 qualify_component_name('rds_proxy_readonly_endpoint', self.kwargs),
                 db_proxy_name=self.rds_proxy.name,
@@ -671,10 +1081,17 @@ class RailsComponent(pulumi.ComponentResource):
         self.env_vars.update(self.storage.s3_env_vars)
 
     def setup_dashboard(self, namespace):
+        widget_providers = DEFAULT_WIDGET_PROVIDERS
+        widget_inputs = {}
+        if self.kwargs.get('enable_rds_proxy', False):
+            widget_providers = (*DEFAULT_WIDGET_PROVIDERS, rds_proxy_widgets)
+            widget_inputs['db_proxy_name'] = self.rds_proxy.name
         self.dashboard = DashboardComponent(qualify_component_name("dashboard", self.kwargs),
             namespace=self.namespace,
             web_container=self.web_container,
             ecs_cluster=self.ecs_cluster,
             rds_serverless_cluster_instance=self.rds_serverless_cluster_instance,
+            widget_providers=widget_providers,
+            widget_inputs=widget_inputs,
                                             opts=pulumi.ResourceOptions(parent=self, depends_on=self.ecs_cluster),
         )
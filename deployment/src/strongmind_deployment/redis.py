@@ -1,30 +1,80 @@
 import os
-import subprocess
 
 import pulumi
 import pulumi_aws as aws
 from pulumi import Output
 
+from strongmind_deployment.repository import get_owning_team
+
+
+REDIS_PORT = 6379
+
+
+def cluster_mode_enabled(kwargs):
+    return bool(kwargs.get('num_shards'))
+
+
+def parameter_group_name(namespace, kind, kwargs):
+    # Cluster mode needs cluster-enabled=yes, which AWS will not set on a parameter group in use,
+    # so cluster mode gets a group of its own.
+    suffix = "-cluster" if cluster_mode_enabled(kwargs) else ""
+    return f"{namespace}-{kind}-redis7{suffix}"
+
+
+def parameter_group_parameters(maxmemory_policy, kwargs):
+    parameters = [aws.elasticache.ParameterGroupParameterArgs(name="maxmemory-policy", value=maxmemory_policy)]
+    if cluster_mode_enabled(kwargs):
+        parameters.append(aws.elasticache.ParameterGroupParameterArgs(name="cluster-enabled", value="yes"))
+    return parameters
+
 
 class RedisComponent(pulumi.ComponentResource):
     def __init__(self, name, opts=None, **kwargs):
+        """
+        Resource that produces a Redis cache, a single node by default.
+
+        Setting replicas or num_shards on an existing component does not convert its single-node cluster:
+        Pulumi creates a new, empty replication group and then deletes the cluster with all its data.
+        For a QueueComponent that drops every queued job, so drain the queue (or copy the data to the new group)
+        before deploying the switch, and expect the same when moving back to a single node.
+
+        :key namespace: A name to override the default naming of resources.
+        :key node_type: The node type. Defaults to "cache.t4g.small".
+        :key num_cache_nodes: The number of nodes of the single-node cluster. Defaults to 1.
+        :key parameter_group_name: The parameter group. Defaults to "default.redis7",
+                                   or "default.redis7.cluster.on" in cluster mode.
+        :key replicas: The number of read replicas per shard. Setting it (or num_shards) creates a replication
+                       group, with a reader endpoint, instead of a single-node cluster. Defaults to None.
+        :key num_shards: Enables cluster mode with this many shards. Clients must support Redis Cluster.
+                         Defaults to None (cluster mode disabled).
+        :key automatic_failover: Whether a replica is promoted when the primary fails. Cluster mode requires it.
+                                 Defaults to True when there are replicas or shards.
+        :key multi_az: Whether replicas are placed in other availability zones than their primary.
+                       Defaults to automatic_failover when there are replicas.
+        """
         super().__init__('strongmind:global_build:commons:redis', name, None, opts)
         self.kwargs = kwargs
         self.env_vars = self.kwargs.get('env_vars', {})
         self.node_type = self.kwargs.get('node_type', 'cache.t4g.small')
         self.num_cache_nodes = self.kwargs.get('num_cache_nodes', 1)
+        self.num_shards = self.kwargs.get('num_shards')
+        self.replicas = self.kwargs.get('replicas', 1 if self.num_shards else None)
+        self.automatic_failover = self.kwargs.get('automatic_failover', bool(self.replicas or self.num_shards))
+        if self.num_shards and not self.automatic_failover:
+            raise ValueError("Cluster mode (num_shards) requires automatic_failover")
+        self.multi_az = self.kwargs.get('multi_az', self.automatic_failover and bool(self.replicas))
+        self.cluster = None
+        self.replication_group = None
 
         self.env_name = os.environ.get('ENVIRONMENT_NAME', 'stage')
-        self.parameter_group_name = self.kwargs.get('parameter_group_name', 'default.redis7')
+        default_parameter_group_name = 'default.redis7.cluster.on' if cluster_mode_enabled(kwargs) else 'default.redis7'
+        self.parameter_group_name = self.kwargs.get('parameter_group_name', default_parameter_group_name)
 
         project = pulumi.get_project()
         stack = pulumi.get_stack()
         self.namespace = self.kwargs.get('namespace', f"{project}-{stack}")
 
-        path = subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
-        file_path = f"{path}/CODEOWNERS"
-        with open(file_path, 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         self.tags = {
             "product": project,
@@ -40,41 +90,81 @@ class RedisComponent(pulumi.ComponentResource):
             cluster_id = name
         else:
             cluster_id = f"{self.namespace}-{name}"
-        self.cluster = aws.elasticache.Cluster(
-            name,
-            cluster_id=cluster_id,
-            engine="redis",
-            node_type=self.node_type,
-            engine_version="7.0",
-            num_cache_nodes=self.num_cache_nodes,
-            parameter_group_name=self.parameter_group_name,
-            port=6379,
-            tags=self.tags,
-            opts=pulumi.ResourceOptions(parent=self, depends_on=dependencies),
-        )
+        if self.replicas is not None:
+            self.replication_group = aws.elasticache.ReplicationGroup(
+                name,
+                replication_group_id=cluster_id,
+                description=f"{cluster_id} Redis",
+                engine="redis",
+                node_type=self.node_type,
+                engine_version="7.0",
+                parameter_group_name=self.parameter_group_name,
+                port=REDIS_PORT,
+                automatic_failover_enabled=self.automatic_failover,
+                multi_az_enabled=self.multi_az,
+                **self._replication_group_size(),
+                tags=self.tags,
+                opts=pulumi.ResourceOptions(parent=self, depends_on=dependencies),
+            )
+        else:
+            self.cluster = aws.elasticache.Cluster(
+                name,
+                cluster_id=cluster_id,
+                engine="redis",
+                node_type=self.node_type,
+                engine_version="7.0",
+                num_cache_nodes=self.num_cache_nodes,
+                parameter_group_name=self.parameter_group_name,
+                port=REDIS_PORT,
+                tags=self.tags,
+                opts=pulumi.ResourceOptions(parent=self, depends_on=dependencies),
+            )
 
         self.register_outputs({})
 
+    def _replication_group_size(self):
+        if self.num_shards:
+            return {"num_node_groups": self.num_shards, "replicas_per_node_group": self.replicas}
+        return {"num_cache_clusters": self.replicas + 1}
+
     @property
     def url(self):
-        return Output.concat("redis://", self.cluster.cache_nodes[0].address, ":6379")
+        """
+        The primary endpoint, or in cluster mode the configuration endpoint, which serves every shard.
+        """
+        if self.replication_group is None:
+            return Output.concat("redis://", self.cluster.cache_nodes[0].address, f":{REDIS_PORT}")
+        if self.num_shards:
+            return Output.concat("redis://", self.replication_group.configuration_endpoint_address, f":{REDIS_PORT}")
+        return Output.concat("redis://", self.replication_group.primary_endpoint_address, f":{REDIS_PORT}")
+
+    @property
+    def reader_url(self):
+        """
+        The reader endpoint, which spreads connections over the replicas. A single node, and cluster mode,
+        where clients find replicas through the configuration endpoint, return url.
+        """
+        if self.replication_group is None or self.num_shards:
+            return self.url
+        return Output.concat("redis://", self.replication_group.reader_endpoint_address, f":{REDIS_PORT}")
 
 
 class QueueComponent(RedisComponent):
     def __init__(self, name, opts=None, **kwargs):
+        """
+        A RedisComponent that never evicts keys, for job queues such as Sidekiq.
+        Switching an existing queue to or from a replication group (replicas, num_shards) replaces the Redis
+        node and loses the queued jobs; see RedisComponent.
+        """
         project = pulumi.get_project()
         stack = pulumi.get_stack()
         namespace = kwargs.get('namespace', f"{project}-{stack}")
-        kwargs['parameter_group_name'] = f"{namespace}-queue-redis7"
+        kwargs['parameter_group_name'] = parameter_group_name(namespace, "queue", kwargs)
         self.parameter_group = aws.elasticache.ParameterGroup(
             f"{name}-parameter-group",
             name=kwargs['parameter_group_name'],
             family="redis7",
-            parameters=[
-                aws.elasticache.ParameterGroupParameterArgs(
-                    name="maxmemory-policy",
-                    value="noeviction")
-            ]
+            parameters=parameter_group_parameters("noeviction", kwargs)
         )
         super().__init__(name, opts, **kwargs)
 
@@ -84,15 +174,11 @@ class CacheComponent(RedisComponent):
         project = pulumi.get_project()
         stack = pulumi.get_stack()
         namespace = kwargs.get('namespace', f"{project}-{stack}")
-        kwargs['parameter_group_name'] = f"{namespace}-cache-redis7"
+        kwargs['parameter_group_name'] = parameter_group_name(namespace, "cache", kwargs)
         self.parameter_group = aws.elasticache.ParameterGroup(
             f"{name}-parameter-group",
             name=kwargs['parameter_group_name'],
             family="redis7",
-            parameters=[
-                aws.elasticache.ParameterGroupParameterArgs(
-                    name="maxmemory-policy",
-                    value="allkeys-lru")
-            ]
+            parameters=parameter_group_parameters("allkeys-lru", kwargs)
         )
         super().__init__(name, opts, **kwargs)
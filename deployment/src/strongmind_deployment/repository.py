@@ -0,0 +1,72 @@
+import functools
+import os
+import subprocess
+
+import pulumi
+
+GIT_ROOT_ENV_VAR = "STRONGMIND_GIT_ROOT"
+REPOSITORY_NAME_ENV_VAR = "STRONGMIND_REPOSITORY_NAME"
+OWNING_TEAM_ENV_VAR = "STRONGMIND_OWNING_TEAM"
+
+
+def get_git_root() -> str:
+    """
+    Gets the top level directory of the current git repository.
+    Resolved once per process; set STRONGMIND_GIT_ROOT to skip git entirely.
+    """
+    return os.environ.get(GIT_ROOT_ENV_VAR) or _git_root()
+
+
+def get_repository_name() -> str:
+    """
+    Gets the repository name.
+    Order of precedence: STRONGMIND_REPOSITORY_NAME, the `tags:repository` Pulumi config, the git root directory name.
+    """
+    override = os.environ.get(REPOSITORY_NAME_ENV_VAR) or _config_value("repository")
+    if override:
+        return override
+    try:
+        return os.path.basename(get_git_root())
+    except Exception as e:
+        print(
+            f"ERROR fetching git repository. Please set this in 'add_standard_billing_tags': {e}"
+        )
+        return "notset"
+
+
+def get_owning_team() -> str:
+    """
+    Gets the owning team from the repository's CODEOWNERS file.
+    Order of precedence: STRONGMIND_OWNING_TEAM, the `tags:owner` Pulumi config, the last team in CODEOWNERS.
+    """
+    override = os.environ.get(OWNING_TEAM_ENV_VAR) or _config_value("owner")
+    if override:
+        return override
+    return _codeowners_team(get_git_root())
+
+
+def clear_cache():
+    """
+    Forgets the memoized git root and CODEOWNERS team, e.g. after changing directories in tests.
+    """
+    _git_root.cache_clear()
+    _codeowners_team.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _git_root() -> str:
+    return subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _codeowners_team(git_root: str) -> str:
+    file_path = f"{git_root}/CODEOWNERS"
+    with open(file_path, 'r') as file:
+        return [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+
+
+def _config_value(key: str):
+    try:
+        return pulumi.Config("tags").get(key)
+    except Exception:
+        return None
@@ -1,9 +1,25 @@
+import asyncio
+
 import pulumi
 import pulumi_aws as aws
 from pulumi import Output
 import os
 import json
-import subprocess
+
+import boto3
+
+from strongmind_deployment import invoke_cache
+from strongmind_deployment.repository import get_owning_team
+
+# BatchGetSecretValue accepts at most 20 secret IDs per call
+BATCH_SIZE = 20
+
+# (project, stack, secret ARN) -> (ARN, version ID, secret string) of its current version
+_secret_values = {}
+# (ARN, version ID) -> formatted valueFrom list
+_formatted_secrets = {}
+# (profile, region) -> Secrets Manager client; each new session loads the botocore service models again
+_clients = {}
 
 
 class SecretsComponent(pulumi.ComponentResource):
@@ -24,10 +40,7 @@ class SecretsComponent(pulumi.ComponentResource):
         stack = pulumi.get_stack()
         self.namespace = kwargs.get('namespace', f"{project}-{stack}")
 
-        path = subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
-        file_path = f"{path}/CODEOWNERS"
-        with open(file_path, 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         self.tags = {
             "product": project,
@@ -52,21 +65,99 @@ class SecretsComponent(pulumi.ComponentResource):
         self.register_outputs({})
 
     async def get_secrets(self):
-        is_known = await self.sm_secret.arn.is_known()
-        if is_known:
-            return self.get_known_secrets()
+        return (await resolve_secrets(self))[0]
 
-    def get_known_secrets(self):
-        formatted_secrets = []
-        secret_value = aws.secretsmanager.get_secret_version(
-            secret_id=self.sm_secret.arn,
-        )
-        secrets = json.loads(secret_value.secret_string)
-        for secret in secrets.keys():
-            formatted_secrets.append(
-                {
-                    "name": secret,
-                    "valueFrom": f"{secret_value.arn}:{secret}::",
-                }
-            )
-        return formatted_secrets
+    def get_known_secrets(self, secret_arn=None):
+        """
+        Formats each key of the secret as a container secret `{"name", "valueFrom"}`.
+        The secret is read and formatted once per ARN and version, however many containers use it.
+        """
+        if secret_arn is None:
+            secret_value = aws.secretsmanager.get_secret_version(secret_id=self.sm_secret.arn)
+            return _format_secrets(secret_value.arn, secret_value.version_id, secret_value.secret_string)
+        key = _cache_key(secret_arn)
+        if key not in _secret_values:
+            secret_value = invoke_cache.invoke(aws.secretsmanager.get_secret_version, secret_id=secret_arn)
+            _secret_values[key] = (secret_value.arn, secret_value.version_id, secret_value.secret_string)
+        return _format_secrets(*_secret_values[key])
+
+
+async def resolve_secrets(*components, batch_read=False, secretsmanager_client=None):
+    """
+    Resolves the container secrets of one or more SecretsComponents, e.g. the app and RDS proxy secrets.
+    Each secret is read once per stack through a memoized get_secret_version invoke.
+
+    With `batch_read`, several unread secrets are fetched instead with one BatchGetSecretValue call per 20 secrets,
+    off the event loop. That call goes through boto3 with only the profile and region of the aws provider
+    configuration, not an assumed role or explicit provider, so it is opt-in. Secrets it cannot read fall back to
+    the invoke.
+    Returns one list per component, or None for a component whose ARN is not known yet (e.g. during a preview).
+    """
+    secret_arns = []
+    for component in components:
+        is_known = await component.sm_secret.arn.is_known()
+        secret_arns.append(await component.sm_secret.arn.future() if is_known else None)
+
+    unread = sorted({arn for arn in secret_arns if arn and _cache_key(arn) not in _secret_values})
+    if batch_read and len(unread) > 1:
+        await asyncio.get_event_loop().run_in_executor(None, _batch_read, unread, secretsmanager_client)
+
+    for arn in set(arn for arn in secret_arns if arn):
+        await _read(arn)
+    return [component.get_known_secrets(arn) if arn else None for component, arn in zip(components, secret_arns)]
+
+
+def clear_cache():
+    """
+    Forgets every secret read so far.
+    """
+    _secret_values.clear()
+    _formatted_secrets.clear()
+
+
+async def _read(secret_arn):
+    key = _cache_key(secret_arn)
+    if key in _secret_values:
+        return
+    # The memoized Output is shared by every container waiting on the same secret
+    secret_value = invoke_cache.invoke(aws.secretsmanager.get_secret_version_output, secret_id=secret_arn)
+    _secret_values[key] = tuple(await Output.all(secret_value.arn, secret_value.version_id,
+                                                 secret_value.secret_string).future())
+
+
+def _batch_read(secret_arns, client):
+    try:
+        client = client or _secretsmanager_client(aws.config.profile,
+                                                  aws.config.region or secret_arns[0].split(':')[3])
+        for start in range(0, len(secret_arns), BATCH_SIZE):
+            response = client.batch_get_secret_value(SecretIdList=secret_arns[start:start + BATCH_SIZE])
+            for secret in response.get('SecretValues', []):
+                _secret_values[_cache_key(secret['ARN'])] = (secret['ARN'], secret.get('VersionId'),
+                                                             secret['SecretString'])
+    except Exception as e:
+        pulumi.log.warn(f"Could not batch read secrets, reading them one at a time: {e}")
+
+
+def _secretsmanager_client(profile, region):
+    key = (profile, region)
+    if key not in _clients:
+        _clients[key] = boto3.Session(profile_name=profile).client('secretsmanager', region_name=region)
+    return _clients[key]
+
+
+def _cache_key(secret_arn):
+    return pulumi.get_project(), pulumi.get_stack(), secret_arn
+
+
+def _format_secrets(arn, version_id, secret_string):
+    key = (arn, version_id or secret_string)
+    if key not in _formatted_secrets:
+        secrets = json.loads(secret_string)
+        _formatted_secrets[key] = [
+            {
+                "name": secret,
+                "valueFrom": f"{arn}:{secret}::",
+            }
+            for secret in secrets.keys()
+        ]
+    return [dict(secret) for secret in _formatted_secrets[key]]
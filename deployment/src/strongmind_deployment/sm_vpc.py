@@ -5,6 +5,8 @@ import re
 import os
 import ipaddress
 
+from strongmind_deployment.repository import get_owning_team
+
 class VpcComponent(pulumi.ComponentResource):
     def __init__(self, name, **kwargs):
         super().__init__("custom:module:VPC", name, {})
@@ -25,8 +27,7 @@ class VpcComponent(pulumi.ComponentResource):
         self.env_name = os.environ.get('ENVIRONMENT_NAME', 'stage')
         project = pulumi.get_project()
         stack = pulumi.get_stack()
-        with open('../CODEOWNERS', 'r') as file:
-            owning_team = [line.strip().split('@')[-1] for line in file if '@' in line][-1].split('/')[1]
+        owning_team = get_owning_team()
 
         tags = {
             "product": project,
@@ -1,6 +1,8 @@
 import pulumi
 import pulumi_aws as aws
 
+from strongmind_deployment import invoke_cache
+
 def get_project_stack() -> str:
     """
     Typically used in pulumi logical and physical resource naming
@@ -21,22 +23,108 @@ def get_account_stack_name(force_stack: str = None) -> str:
     """
     Typically used to retrieve a Pulumi stack reference for the current account stack.
     """
-    alias = aws.iam.get_account_alias().account_alias
+    alias = invoke_cache.invoke(aws.iam.get_account_alias).account_alias
     account_stack_name = alias.replace("-","_")
     account_stack = force_stack or account_stack_name
     return f"organization/account/{account_stack}"
 
 
+FARGATE_CAPACITY_PROVIDERS = ["FARGATE", "FARGATE_SPOT"]
+CPU_ARCHITECTURES = ("X86_64", "ARM64")
+
+
 def create_ecs_cluster(parent_component, name, kwargs):
-    return aws.ecs.Cluster(qualify_component_name("cluster", kwargs),
-                           name=name,
-                           tags=parent_component.tags,
-                           settings=[{
-                               "name": "containerInsights",
-                               "value": "enabled",
-                           }],
-                           opts=pulumi.ResourceOptions(parent=parent_component),
-                           )
+    """
+    Creates the ECS cluster with both Fargate capacity providers registered, so services can mix on-demand
+    and Spot tasks. Services without a strategy keep running on on-demand FARGATE.
+    The registration is kept on the parent as `ecs_cluster_capacity_providers`, for services to depend on.
+    """
+    cluster = aws.ecs.Cluster(qualify_component_name("cluster", kwargs),
+                              name=name,
+                              tags=parent_component.tags,
+                              settings=[{
+                                  "name": "containerInsights",
+                                  "value": "enabled",
+                              }],
+                              opts=pulumi.ResourceOptions(parent=parent_component),
+                              )
+    parent_component.ecs_cluster_capacity_providers = aws.ecs.ClusterCapacityProviders(
+        qualify_component_name("cluster-capacity-providers", kwargs),
+        cluster_name=cluster.name,
+        capacity_providers=FARGATE_CAPACITY_PROVIDERS,
+        default_capacity_provider_strategies=[{
+            "capacity_provider": "FARGATE",
+            "weight": 1,
+        }],
+        opts=pulumi.ResourceOptions(parent=parent_component),
+    )
+    return cluster
+
+
+def fargate_capacity_provider_strategies(spot_weight, base=1, weight=1):
+    """
+    A strategy keeping `base` tasks on on-demand FARGATE and splitting the rest between FARGATE and
+    FARGATE_SPOT by `weight` to `spot_weight`.
+    """
+    return [
+        {"capacityProvider": "FARGATE", "base": base, "weight": weight},
+        {"capacityProvider": "FARGATE_SPOT", "weight": spot_weight},
+    ]
+
+
+def use_capacity_provider_strategies(strategies):
+    """
+    A resource transform that places the ECS service of an awsx FargateService on `strategies`
+    instead of the FARGATE launch type; FargateService does not take a strategy itself.
+    Moving an existing service off the launch type replaces it, and ECS refuses a second service with the
+    same name, so the old service is deleted before its replacement is created.
+    """
+    def transform(args):
+        if args.type_ != "aws:ecs/service:Service":
+            return None
+        props = {key: value for key, value in args.props.items() if key != "launchType"}
+        props["capacityProviderStrategies"] = strategies
+        opts = pulumi.ResourceOptions.merge(args.opts, pulumi.ResourceOptions(delete_before_replace=True))
+        return pulumi.ResourceTransformResult(props=props, opts=opts)
+
+    return transform
+
+
+def use_code_deploy_controller():
+    """
+    A resource transform that leaves the task definition and load balancers of the ECS service of an awsx
+    FargateService to CodeDeploy, which swaps them during blue/green deployments.
+    ECS only sets the deployment controller of a new service, so switching an existing service replaces it, and the
+    old service is deleted first because ECS refuses a second service with the same name.
+    """
+    def transform(args):
+        if args.type_ != "aws:ecs/service:Service":
+            return None
+        opts = pulumi.ResourceOptions.merge(args.opts,
+                                            pulumi.ResourceOptions(ignore_changes=["taskDefinition", "loadBalancers"],
+                                                                   delete_before_replace=True))
+        return pulumi.ResourceTransformResult(props=args.props, opts=opts)
+
+    return transform
+
+
+def validate_cpu_architecture(cpu_architecture):
+    """
+    Returns `cpu_architecture` in the spelling ECS and Batch use, X86_64 or ARM64, accepting either case.
+    Lambda spells them in lower case.
+    """
+    if str(cpu_architecture).upper() not in CPU_ARCHITECTURES:
+        raise ValueError(f"Unsupported cpu_architecture: {cpu_architecture}. Use one of {', '.join(CPU_ARCHITECTURES)}")
+    return cpu_architecture.upper()
+
+
+def validate_fargate_spot_architecture(cpu_architecture, spot_option):
+    """
+    Raises when `spot_option` puts tasks on FARGATE_SPOT with an ARM64 `cpu_architecture`: Spot only runs X86_64
+    Linux tasks, and ECS would only refuse the tasks at deploy time.
+    """
+    if cpu_architecture and str(cpu_architecture).upper() == "ARM64":
+        raise ValueError(f"{spot_option} runs tasks on FARGATE_SPOT, which does not support the ARM64 cpu_architecture")
 
 
 def qualify_component_name(name, kwargs, truncate=False):
@@ -2,6 +2,7 @@ from enum import Enum
 import pulumi
 import pulumi_aws as aws
 from typing import List, Optional, Sequence
+from strongmind_deployment import invoke_cache
 from strongmind_deployment.subnet import SubnetSpec, SubnetType
 
 
@@ -49,7 +50,7 @@ class VpcComponent(pulumi.ComponentResource):
         self.vpc_name = name
         self.subnet_specs = SubnetSpec.get_standard_subnet_specs(args.cidr_block)
         self.args: VpcComponentArgs = args
-        self.azs = aws.get_availability_zones(state="available").names[:3]
+        self.azs = invoke_cache.invoke(aws.get_availability_zones, state="available").names[:3]
         self.validate_args()
         self.create_resources()
 
@@ -293,7 +294,7 @@ class VpcComponent(pulumi.ComponentResource):
         return self.create_private_link_interface(service_name, placement)
 
     def create_private_link_gateway(self, service_name: str) -> aws.ec2.VpcEndpoint:
-        region = aws.get_region().name
+        region = invoke_cache.invoke(aws.get_region).name
         return aws.ec2.VpcEndpoint(
             f"{service_name}-gateway",
             vpc_id=self.vpc.id,
@@ -309,7 +310,7 @@ class VpcComponent(pulumi.ComponentResource):
         service_name: str,
         subnet_type: SubnetType = SubnetType.PRIVATE,
     ) -> aws.ec2.VpcEndpoint:
-        region = aws.get_region().name
+        region = invoke_cache.invoke(aws.get_region).name
         target_subnet_ids = self.get_subnets(self.vpc.id, subnet_type)
         return aws.ec2.VpcEndpoint(
             f"{service_name}-interface",
@@ -330,7 +331,8 @@ class VpcComponent(pulumi.ComponentResource):
         """
         Get the subnet ids for a given subnet type.
         """
-        subnets_result: aws.ec2.AwaitableGetSubnetsResult = aws.ec2.get_subnets(
+        subnets_result: aws.ec2.AwaitableGetSubnetsResult = invoke_cache.invoke(
+            aws.ec2.get_subnets,
             filters=[
                 aws.ec2.GetSubnetsFilterArgs(
                     name="vpc-id",
@@ -350,7 +352,8 @@ class VpcComponent(pulumi.ComponentResource):
         """
         Get the subnet id for a given subnet type and availability zone.
         """
-        subnets_result: aws.ec2.AwaitableGetSubnetsResult = aws.ec2.get_subnets(
+        subnets_result: aws.ec2.AwaitableGetSubnetsResult = invoke_cache.invoke(
+            aws.ec2.get_subnets,
             filters=[
                 aws.ec2.GetSubnetsFilterArgs(
                     name="vpc-id",
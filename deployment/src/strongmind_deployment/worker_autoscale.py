@@ -3,6 +3,14 @@ import pulumi_aws as aws
 
 from strongmind_deployment.util import qualify_component_name
 
+STEP_SCALING = "step"
+PROPORTIONAL_SCALING = "proportional"
+TARGET_TRACKING_SCALING = "target_tracking"
+
+# (seconds of queue latency above the scaling threshold, percent of the running workers to add)
+DEFAULT_PROPORTIONAL_STEPS = [(0, 50), (300, 100), (900, 200)]
+DEFAULT_SCALE_IN_PERCENT = 25
+
 
 class WorkerAutoscaleComponent(pulumi.ComponentResource):
     def __init__(self, name, opts=None, **kwargs):
@@ -10,6 +18,24 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
         :key worker_max_number_of_instances: The maximum number of instances available in the scaling policy for the worker.
         :key worker_min_number_of_instances: The minimum number of instances available in the scaling policy for the worker. Defaults to desired_count.
         :key worker_autoscale_threshold: The threshold for the worker autoscaling policy. Default is 3.
+        :key worker_queue_name: The QueueName dimension of the queue latency metric. Defaults to "AllQueues".
+        :key worker_pool: The name of the worker pool being scaled, when a service runs several. Prefixes the
+            resource and alarm names so each pool gets its own. Defaults to None.
+        :key worker_autoscale_mode: How the workers follow the queue. Defaults to "step".
+            - "step" adds or removes one worker per alarm evaluation.
+            - "proportional" adds a percentage of the running workers that grows with the queue latency above
+              the threshold (see worker_scale_out_steps), and removes worker_scale_in_percent at a time.
+            - "target_tracking" keeps the queue latency per running worker at worker_backlog_per_task_target.
+        :key worker_scale_out_steps: (seconds above the threshold, percent to add) pairs for proportional scaling,
+            starting at 0 in ascending order. Defaults to DEFAULT_PROPORTIONAL_STEPS.
+        :key worker_min_scale_out: The fewest workers a proportional scale-out adds. Defaults to 1.
+        :key worker_scale_in_percent: The percent of running workers a proportional scale-in removes. Defaults to 25.
+        :key worker_backlog_per_task_target: Seconds of queue latency per running worker to track in target_tracking mode.
+            Defaults to max_queue_latency_threshold.
+        :key worker_scale_in_cooldown: Seconds after a scale-in before workers are removed again.
+            Defaults to 60, or 300 in target_tracking mode.
+        :key worker_scale_in_evaluation_periods: Minutes the queue must stay under the threshold before a step or
+            proportional scale-in. Defaults to 5.
         """
         super().__init__('strongmind:global_build:commons:worker-autoscale', name, None, opts)
         self.fargate_service = kwargs.get('fargate_service')
@@ -19,8 +45,11 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
         self.worker_autoscaling_out_alarm = None
         self.worker_autoscaling_out_policy = None
         self.worker_autoscaling_target = None
+        self.worker_backlog_scaling_policy = None
         self.kwargs = kwargs
         self.namespace = kwargs.get("namespace", f"{pulumi.get_project()}-{pulumi.get_stack()}")
+        self.worker_pool = kwargs.get('worker_pool')
+        self.name_prefix = f"{self.namespace}-{self.worker_pool}" if self.worker_pool else self.namespace
         self.worker_max_capacity = kwargs.get('worker_max_number_of_instances', 65)
         desired_count = kwargs.get('desired_count', 1)
         self.worker_min_capacity = kwargs.get('worker_min_number_of_instances', desired_count)
@@ -29,17 +58,37 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
         self.sns_topic_arn = kwargs.get('sns_topic_arn')
         self.canvas = kwargs.get("namespace", False)
         self.metric_name = "JobStaleness" if self.canvas else "MaxQueueLatency"
-        self.dimensions = {'domain': f'{self.namespace}.strongmind.com'} if self.canvas else {"QueueName": "AllQueues"}
+        self.dimensions = {'domain': f'{self.namespace}.strongmind.com'} if self.canvas else {"QueueName": kwargs.get('worker_queue_name', "AllQueues")}
         self.alarm_namespace = "Canvas" if self.canvas else self.namespace
+        self.autoscale_mode = kwargs.get('worker_autoscale_mode', STEP_SCALING)
+        self.scale_out_steps = kwargs.get('worker_scale_out_steps', DEFAULT_PROPORTIONAL_STEPS)
+        self.min_scale_out = kwargs.get('worker_min_scale_out', 1)
+        self.scale_in_percent = kwargs.get('worker_scale_in_percent', DEFAULT_SCALE_IN_PERCENT)
+        self.backlog_per_task_target = kwargs.get('worker_backlog_per_task_target', self.scaling_threshold)
+        self.scale_in_cooldown = kwargs.get('worker_scale_in_cooldown',
+                                            300 if self.autoscale_mode == TARGET_TRACKING_SCALING else 60)
+        self.scale_in_evaluation_periods = kwargs.get('worker_scale_in_evaluation_periods', 5)
+        self._validate_autoscale_mode()
         self.worker_autoscaling()
 
+    def _resource_name(self, name):
+        return qualify_component_name(f"{self.worker_pool}-{name}" if self.worker_pool else name, self.kwargs)
+
+    def _validate_autoscale_mode(self):
+        modes = (STEP_SCALING, PROPORTIONAL_SCALING, TARGET_TRACKING_SCALING)
+        if self.autoscale_mode not in modes:
+            raise ValueError(f"worker_autoscale_mode must be one of {', '.join(modes)}")
+        if self.autoscale_mode == PROPORTIONAL_SCALING:
+            bounds = [bound for bound, _ in self.scale_out_steps]
+            if not bounds or bounds[0] != 0 or bounds != sorted(set(bounds)):
+                raise ValueError("worker_scale_out_steps must start at 0 and be in ascending order")
 
     def worker_autoscaling(self):
 
         fargate_service_id = self.fargate_service.service.id.apply(lambda x: x.split(":")[-1])
 
         self.worker_autoscaling_target = aws.appautoscaling.Target(
-            qualify_component_name("worker_autoscaling_target", self.kwargs),
+            self._resource_name("worker_autoscaling_target"),
             max_capacity=self.worker_max_capacity,
             min_capacity=self.worker_min_capacity,
             resource_id=fargate_service_id,
@@ -49,37 +98,15 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
                 parent=self,
             )
         )
-        self.worker_autoscaling_out_policy = aws.appautoscaling.Policy(
-            qualify_component_name("worker_autoscaling_out_policy", self.kwargs),
-            name=f"{self.namespace}-worker-autoscaling-out-policy",
-            policy_type="StepScaling",
-            resource_id=self.worker_autoscaling_target.resource_id,
-            scalable_dimension=self.worker_autoscaling_target.scalable_dimension,
-            service_namespace=self.worker_autoscaling_target.service_namespace,
-            step_scaling_policy_configuration=aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
-                adjustment_type="ChangeInCapacity",
-                cooldown=60,
-                metric_aggregation_type="Maximum",
-                step_adjustments=[
-                    aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
-                        metric_interval_upper_bound="600",
-                        metric_interval_lower_bound="0",
-                        scaling_adjustment=1,
-                    ),
-                    aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
-                        metric_interval_lower_bound="600",
-                        scaling_adjustment=1,
-                    )
-                ],
-            ),
-            opts=pulumi.ResourceOptions(
-                parent=self,
-            )
-        )
 
-        self.worker_autoscaling_out_alarm = aws.cloudwatch.MetricAlarm(
-            qualify_component_name("worker_autoscaling_out_alarm", self.kwargs),
-            name=f"{self.namespace}-worker-auto-scaling-out-alarm",
+        if self.autoscale_mode == TARGET_TRACKING_SCALING:
+            self.worker_backlog_scaling()
+        else:
+            self.worker_step_scaling()
+
+        self.worker_queue_latency_alarm = aws.cloudwatch.MetricAlarm(
+            self._resource_name("worker_queue_latency_alarm"),
+            name=f"{self.name_prefix}-worker-queue-latency-alarm",
             comparison_operator="GreaterThanThreshold",
             evaluation_periods=1,
             metric_name=self.metric_name,
@@ -88,16 +115,33 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
             namespace=self.alarm_namespace,
             period=60,
             statistic="Maximum",
-            threshold=self.scaling_threshold,
-            alarm_actions=[self.worker_autoscaling_out_policy.arn],
+            threshold=self.alert_threshold,
+            alarm_actions=[self.sns_topic_arn],
+            ok_actions=[self.sns_topic_arn],
             opts=pulumi.ResourceOptions(
                 parent=self,
             )
         )
 
-        self.worker_queue_latency_alarm = aws.cloudwatch.MetricAlarm(
-            qualify_component_name("worker_queue_latency_alarm", self.kwargs),
-            name=f"{self.namespace}-worker-queue-latency-alarm",
+        self.register_outputs({})
+
+    def worker_step_scaling(self):
+        self.worker_autoscaling_out_policy = aws.appautoscaling.Policy(
+            self._resource_name("worker_autoscaling_out_policy"),
+            name=f"{self.name_prefix}-worker-autoscaling-out-policy",
+            policy_type="StepScaling",
+            resource_id=self.worker_autoscaling_target.resource_id,
+            scalable_dimension=self.worker_autoscaling_target.scalable_dimension,
+            service_namespace=self.worker_autoscaling_target.service_namespace,
+            step_scaling_policy_configuration=self._scale_out_configuration(),
+            opts=pulumi.ResourceOptions(
+                parent=self,
+            )
+        )
+
+        self.worker_autoscaling_out_alarm = aws.cloudwatch.MetricAlarm(
+            self._resource_name("worker_autoscaling_out_alarm"),
+            name=f"{self.name_prefix}-worker-auto-scaling-out-alarm",
             comparison_operator="GreaterThanThreshold",
             evaluation_periods=1,
             metric_name=self.metric_name,
@@ -106,42 +150,31 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
             namespace=self.alarm_namespace,
             period=60,
             statistic="Maximum",
-            threshold=self.alert_threshold,
-            alarm_actions=[self.sns_topic_arn],
-            ok_actions=[self.sns_topic_arn],
+            threshold=self.scaling_threshold,
+            alarm_actions=[self.worker_autoscaling_out_policy.arn],
             opts=pulumi.ResourceOptions(
                 parent=self,
             )
         )
 
         self.worker_autoscaling_in_policy = aws.appautoscaling.Policy(
-            qualify_component_name("worker_autoscaling_in_policy", self.kwargs),
-            name=f"{self.namespace}-worker-autoscaling-in-policy",
+            self._resource_name("worker_autoscaling_in_policy"),
+            name=f"{self.name_prefix}-worker-autoscaling-in-policy",
             policy_type="StepScaling",
             resource_id=self.worker_autoscaling_target.resource_id,
             scalable_dimension=self.worker_autoscaling_target.scalable_dimension,
             service_namespace=self.worker_autoscaling_target.service_namespace,
-            step_scaling_policy_configuration=aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
-                adjustment_type="ChangeInCapacity",
-                cooldown=60,
-                metric_aggregation_type="Maximum",
-                step_adjustments=[
-                    aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
-                        metric_interval_upper_bound="0",
-                        scaling_adjustment=-1,
-                    )
-                ],
-            ),
+            step_scaling_policy_configuration=self._scale_in_configuration(),
             opts=pulumi.ResourceOptions(
                 parent=self,
             )
         )
 
         self.worker_autoscaling_in_alarm = aws.cloudwatch.MetricAlarm(
-            qualify_component_name("worker_autoscaling_in_alarm", self.kwargs),
-            name=f"{self.namespace}-worker-auto-scaling-in-alarm",
+            self._resource_name("worker_autoscaling_in_alarm"),
+            name=f"{self.name_prefix}-worker-auto-scaling-in-alarm",
             comparison_operator="LessThanOrEqualToThreshold",
-            evaluation_periods=5,
+            evaluation_periods=self.scale_in_evaluation_periods,
             metric_name=self.metric_name,
             unit="Seconds",
             dimensions=self.dimensions,
@@ -155,4 +188,118 @@ class WorkerAutoscaleComponent(pulumi.ComponentResource):
             )
         )
 
-        self.register_outputs({})
+    def _scale_out_configuration(self):
+        if self.autoscale_mode == PROPORTIONAL_SCALING:
+            upper_bounds = [str(bound) for bound, _ in self.scale_out_steps[1:]] + [None]
+            return aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
+                adjustment_type="PercentChangeInCapacity",
+                min_adjustment_magnitude=self.min_scale_out,
+                cooldown=60,
+                metric_aggregation_type="Maximum",
+                step_adjustments=[
+                    aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+                        metric_interval_lower_bound=str(lower_bound),
+                        metric_interval_upper_bound=upper_bound,
+                        scaling_adjustment=percent,
+                    )
+                    for (lower_bound, percent), upper_bound in zip(self.scale_out_steps, upper_bounds)
+                ],
+            )
+        return aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
+            adjustment_type="ChangeInCapacity",
+            cooldown=60,
+            metric_aggregation_type="Maximum",
+            step_adjustments=[
+                aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+                    metric_interval_upper_bound="600",
+                    metric_interval_lower_bound="0",
+                    scaling_adjustment=1,
+                ),
+                aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+                    metric_interval_lower_bound="600",
+                    scaling_adjustment=1,
+                )
+            ],
+        )
+
+    def _scale_in_configuration(self):
+        if self.autoscale_mode == PROPORTIONAL_SCALING:
+            return aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
+                adjustment_type="PercentChangeInCapacity",
+                min_adjustment_magnitude=1,
+                cooldown=self.scale_in_cooldown,
+                metric_aggregation_type="Maximum",
+                step_adjustments=[
+                    aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+                        metric_interval_upper_bound="0",
+                        scaling_adjustment=-self.scale_in_percent,
+                    )
+                ],
+            )
+        return aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
+            adjustment_type="ChangeInCapacity",
+            cooldown=self.scale_in_cooldown,
+            metric_aggregation_type="Maximum",
+            step_adjustments=[
+                aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+                    metric_interval_upper_bound="0",
+                    scaling_adjustment=-1,
+                )
+            ],
+        )
+
+    def worker_backlog_scaling(self):
+        # Queue latency divided by the running workers: capacity grows and shrinks in proportion to the backlog.
+        service = self.fargate_service.service
+        self.worker_backlog_scaling_policy = aws.appautoscaling.Policy(
+            self._resource_name("worker_backlog_scaling_policy"),
+            name=f"{self.name_prefix}-worker-backlog-scaling-policy",
+            policy_type="TargetTrackingScaling",
+            resource_id=self.worker_autoscaling_target.resource_id,
+            scalable_dimension=self.worker_autoscaling_target.scalable_dimension,
+            service_namespace=self.worker_autoscaling_target.service_namespace,
+            target_tracking_scaling_policy_configuration=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationArgs(
+                target_value=self.backlog_per_task_target,
+                scale_out_cooldown=60,
+                scale_in_cooldown=self.scale_in_cooldown,
+                customized_metric_specification=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationArgs(
+                    metrics=[
+                        _metric_query("backlog", self.metric_name, self.alarm_namespace, self.dimensions, "Maximum"),
+                        _metric_query("workers", "RunningTaskCount", "ECS/ContainerInsights", {
+                            "ClusterName": service.cluster.apply(lambda arn: arn.split("/")[-1]),
+                            "ServiceName": service.name,
+                        }, "Average"),
+                        aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationMetricArgs(
+                            id="backlog_per_worker",
+                            label="Queue latency per running worker",
+                            expression="IF(workers >= 1, backlog / workers, backlog)",
+                            return_data=True,
+                        ),
+                    ],
+                ),
+            ),
+            opts=pulumi.ResourceOptions(
+                parent=self,
+            )
+        )
+
+
+def _metric_query(query_id, metric_name, namespace, dimensions, stat):
+    return aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationMetricArgs(
+        id=query_id,
+        return_data=False,
+        metric_stat=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationMetricMetricStatArgs(
+            metric=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationMetricMetricStatMetricArgs(
+                metric_name=metric_name,
+                namespace=namespace,
+                dimensions=[
+                    aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationMetricMetricStatMetricDimensionArgs(
+                        name=name,
+                        value=value,
+                    )
+                    for name, value in dimensions.items()
+                ],
+            ),
+            stat=stat,
+        ),
+    )
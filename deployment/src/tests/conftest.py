@@ -8,7 +8,8 @@ import pytest
 import boto3
 from moto import mock_aws
 
-from tests.mocks import ImmediateExecutor
+from strongmind_deployment import invoke_cache, secrets
+from tests.mocks import ImmediateExecutor, MockCallbacks, TransformingMockMonitor
 
 @pytest.fixture(scope="session", autouse=True)
 def faker_seed():
@@ -20,11 +21,15 @@ def pulumi_set_mocks(pulumi_mocks, app_name, stack):
     loop.set_default_executor(ImmediateExecutor())
     old_settings = pulumi.runtime.settings.SETTINGS
     try:
+        callbacks = MockCallbacks()
         pulumi.runtime.mocks.set_mocks(
             pulumi_mocks,
             project=app_name,
             stack=stack,
-            preview=False)
+            preview=False,
+            monitor=TransformingMockMonitor(pulumi_mocks, callbacks))
+        pulumi.runtime.settings.SETTINGS.feature_support["transforms"] = True
+        pulumi.runtime.settings.SETTINGS.callbacks = callbacks
         yield True
     finally:
         pulumi.runtime.settings.configure(old_settings)
@@ -46,3 +51,12 @@ def mock_boto():
     with mock_aws():
         ecs = boto3.client('ecs', region_name='us-west-2')
         yield ecs
+
+
+@pytest.fixture(autouse=True)
+def clear_secrets_cache():
+    secrets.clear_cache()
+    invoke_cache.clear_cache()
+    yield
+    secrets.clear_cache()
+    invoke_cache.clear_cache()
@@ -1,3 +1,4 @@
+import hashlib
 from concurrent.futures import ThreadPoolExecutor
 import concurrent.futures
 
@@ -32,7 +33,19 @@ def get_pulumi_mocks(faker, fake_password=None, secret_string="{}"):
                         self.execution_role_arn = "arn:aws:iam::123456789012:role/mock-execution-role"
 
                 service_name = args.inputs["name"]
-                ecs_service_mock = aws.ecs.Service(service_name)
+                # awsx passes the transforms of the FargateService on to the ECS service it creates
+                ecs_service_mock = aws.ecs.Service(
+                    service_name,
+                    cluster=args.inputs.get("cluster"),
+                    launch_type="FARGATE",
+                    deployment_controller=args.inputs.get("deploymentController"),
+                    network_configuration=aws.ecs.ServiceNetworkConfigurationArgs(
+                        subnets=["subnet-12345", "subnet-67890"],
+                        security_groups=["sg-12345"],
+                    ),
+                    opts=pulumi.ResourceOptions(transforms=getattr(
+                        pulumi.runtime.settings.SETTINGS.monitor, "registering_transforms", None) or None),
+                )
 
                 outputs = {
                     **args.inputs,
@@ -43,6 +56,7 @@ def get_pulumi_mocks(faker, fake_password=None, secret_string="{}"):
                     "enable_execute_command": args.inputs.get("enableExecuteCommand"),
                     "health_check_grace_period_seconds": args.inputs.get("healthCheckGracePeriodSeconds"),
                     "deployment_maximum_percent": args.inputs.get("deploymentMaximumPercent"),
+                    "deployment_controller": args.inputs.get("deploymentController"),
                     "service": ecs_service_mock
                 }
             if args.typ == "aws:rds/cluster:Cluster":
@@ -87,6 +101,14 @@ def get_pulumi_mocks(faker, fake_password=None, secret_string="{}"):
                         }
                     ],
                 }
+            if args.typ == "aws:elasticache/replicationGroup:ReplicationGroup":
+                group_id = args.inputs.get("replicationGroupId", args.name)
+                outputs = {
+                    **args.inputs,
+                    "primaryEndpointAddress": f"master.{group_id}.cache.amazonaws.com",
+                    "readerEndpointAddress": f"replica.{group_id}.cache.amazonaws.com",
+                    "configurationEndpointAddress": f"clustercfg.{group_id}.cache.amazonaws.com",
+                }
             if args.typ == "aws:elasticache/parameterGroup:ParameterGroup":
                 outputs = {
                     **args.inputs
@@ -138,6 +160,23 @@ def get_pulumi_mocks(faker, fake_password=None, secret_string="{}"):
                     **args.inputs,
                     "arn": f"arn:aws:elasticloadbalancing:us-west-2:123456789012:loadbalancer/app/{faker.word()}",
                     "name": f"loadbalancer-{faker.word()}",
+                    "dnsName": f"{args.name}.us-west-2.elb.amazonaws.com",
+                }
+            if args.typ == "aws:s3/bucketV2:BucketV2":
+                outputs = {
+                    **args.inputs,
+                    "arn": f"arn:aws:s3:::{args.inputs.get('bucket', args.name)}",
+                    "bucket_regional_domain_name": f"{args.inputs.get('bucket', args.name)}.s3.us-west-2.amazonaws.com",
+                }
+            if args.typ == "aws:cloudfront/distribution:Distribution":
+                outputs = {
+                    **args.inputs,
+                    "arn": f"arn:aws:cloudfront::123456789012:distribution/{args.name}",
+                }
+            if args.typ == "aws:ecs/cluster:Cluster":
+                outputs = {
+                    **args.inputs,
+                    "arn": f"arn:aws:ecs:us-west-2:123456789012:cluster/{args.inputs.get('name', args.name)}",
                 }
             if args.typ == "aws:ecs/service:Service":
                 arn = f"arn:aws:ecs:us-west-2:123456789012:service/{args.name}/{args.name}"
@@ -192,11 +231,26 @@ def get_pulumi_mocks(faker, fake_password=None, secret_string="{}"):
                 else:
                     raise Exception(f"Unknown response headers policy ID: {args.args.get('id')}")
 
+            if args.token == "aws:lambda/getLayerVersion:getLayerVersion":
+                # Layers named for an architecture declare it; any other layer declares none.
+                layer_name = args.args["layerName"]
+                architectures = [architecture for architecture in ("x86_64", "arm64") if architecture in layer_name]
+                return {
+                    "arn": f"{layer_name}:{args.args['version']}",
+                    "layerArn": layer_name,
+                    "version": args.args["version"],
+                    "compatibleArchitectures": architectures,
+                }
+
+            if args.token == "aws:ecr/getImage:getImage":
+                digest = hashlib.sha256(f"{args.args['repositoryName']}:{args.args['imageTag']}".encode()).hexdigest()
+                return {"imageDigest": f"sha256:{digest}", "imageTags": [args.args["imageTag"]]}
+
             if args.token == "aws:ec2/getSubnets:getSubnets":
                 return {"ids": ["subnet-12345", "subnet-67890"]}
             
             if args.token == "aws:ec2/getVpc:getVpc":
-                return {"id": "vpc-12345"}
+                return {"id": "vpc-12345", "cidrBlock": "172.31.0.0/16"}
             
             if args.token == "aws:ec2/getSecurityGroup:getSecurityGroup":
                 return {"id": "sg-12345"}
@@ -260,3 +314,58 @@ class ImmediateExecutor(ThreadPoolExecutor):
     @staticmethod
     def _identity(x):
         return x
+
+
+class MockCallbacks:
+    """The mock monitor has no callback server, so resource transforms are recorded here and run by
+    TransformingMockMonitor.
+    """
+
+    def __init__(self):
+        self.transforms = []
+
+    def register_transform(self, transform):
+        from pulumi.runtime.proto import callback_pb2
+
+        self.transforms.append(transform)
+        return callback_pb2.Callback(token=str(len(self.transforms)), target="mock")
+
+
+class TransformingMockMonitor(pulumi.runtime.mocks.MockMonitor):
+    """Runs the transforms registered with a resource on its properties before the mocks see them, as the engine
+    does, and keeps the resulting options in `resource_options` by resource name.
+    """
+
+    def __init__(self, mocks, callbacks):
+        super().__init__(mocks)
+        self.callbacks = callbacks
+        self.registering_transforms = []
+        self.resource_options = {}
+
+    def RegisterResource(self, request):
+        transforms = [self.callbacks.transforms[int(callback.token) - 1] for callback in request.transforms]
+        if transforms:
+            self._transform(request, transforms)
+        self.registering_transforms = transforms
+        try:
+            return super().RegisterResource(request)
+        finally:
+            self.registering_transforms = []
+
+    def _transform(self, request, transforms):
+        from pulumi.runtime import rpc
+        from pulumi.runtime.sync_await import _sync_await
+
+        props = rpc.deserialize_properties(request.object)
+        opts = pulumi.ResourceOptions(ignore_changes=list(request.ignoreChanges) or None,
+                                      delete_before_replace=request.deleteBeforeReplace or None)
+        for transform in transforms:
+            result = transform(pulumi.ResourceTransformArgs(
+                custom=request.custom, type_=request.type, name=request.name, props=props, opts=opts))
+            if result is not None:
+                props, opts = result.props, result.opts
+        request.object.CopyFrom(_sync_await(rpc.serialize_properties(props, {})))
+        del request.ignoreChanges[:]
+        request.ignoreChanges.extend(opts.ignore_changes or [])
+        request.deleteBeforeReplace = bool(opts.delete_before_replace)
+        self.resource_options[request.name] = opts
@@ -5,6 +5,7 @@ import pytest
 
 from strongmind_deployment.alb import AlbPlacement
 from tests.mocks import get_pulumi_mocks
+from tests.shared import assert_output_equals
 
 
 def describe_a_application_load_balancer_component():
@@ -89,4 +90,92 @@ def describe_a_application_load_balancer_component():
             return Alb(name, alb_args)
 
         def it_has_a_custom_namespace(sut, namespace):
-            assert sut.namespace == namespace
\ No newline at end of file
+            assert sut.namespace == namespace
+
+    @pulumi.runtime.test
+    def it_has_the_default_idle_timeout(sut):
+        return assert_output_equals(sut.alb.idle_timeout, 60)
+
+    def it_has_default_target_group_settings(sut):
+        assert sut.target_group_settings() == {
+            "load_balancing_algorithm_type": "round_robin",
+            "slow_start": 0,
+            "deregistration_delay": 300,
+        }
+
+    def describe_with_connection_tuning():
+        @pytest.fixture
+        def alb_args(vpc_id, certificate_arn):
+            from strongmind_deployment.alb import AlbArgs
+            return AlbArgs(
+                vpc_id=vpc_id,
+                subnets=['subnet-123456', 'subnet-654321'],
+                certificate_arn=certificate_arn,
+                tags={},
+                idle_timeout=120,
+                load_balancing_algorithm="least_outstanding_requests",
+                deregistration_delay=30,
+            )
+
+        @pulumi.runtime.test
+        def it_sets_the_idle_timeout(sut):
+            return assert_output_equals(sut.alb.idle_timeout, 120)
+
+        def it_shares_the_target_group_settings(sut):
+            assert sut.target_group_settings() == {
+                "load_balancing_algorithm_type": "least_outstanding_requests",
+                "slow_start": 0,
+                "deregistration_delay": 30,
+            }
+
+    def it_has_no_test_listener(sut):
+        assert sut.test_listener is None
+
+    def describe_with_a_test_listener():
+        @pytest.fixture
+        def target_group():
+            import pulumi_aws as aws
+            return aws.lb.TargetGroup("green", port=3000, protocol="HTTP", target_type="ip")
+
+        @pytest.fixture
+        def test_listener(sut, target_group):
+            return sut.create_test_listener(8443, target_group, ingress_cidrs=["10.0.0.0/8"])
+
+        @pulumi.runtime.test
+        def it_listens_for_https_on_the_test_port(test_listener):
+            def check(args):
+                assert args == [8443, "HTTPS"]
+
+            return pulumi.Output.all(test_listener.port, test_listener.protocol).apply(check)
+
+        @pulumi.runtime.test
+        def it_forwards_to_the_target_group(test_listener, target_group):
+            def check(args):
+                actions, target_group_arn = args
+                assert actions[0]["target_group_arn"] == target_group_arn
+
+            return pulumi.Output.all(test_listener.default_actions, target_group.arn).apply(check)
+
+        @pulumi.runtime.test
+        def it_opens_the_test_port_to_the_given_cidrs(sut, test_listener):
+            def check(args):
+                assert args == [8443, ["10.0.0.0/8"]]
+
+            return pulumi.Output.all(sut.test_ingress.from_port, sut.test_ingress.cidr_blocks).apply(check)
+
+    def describe_alb_args_validation():
+        def it_rejects_an_unknown_algorithm(vpc_id, certificate_arn):
+            from strongmind_deployment.alb import AlbArgs
+            with pytest.raises(ValueError, match="Unsupported load_balancing_algorithm"):
+                AlbArgs(vpc_id=vpc_id, certificate_arn=certificate_arn, load_balancing_algorithm="random")
+
+        def it_rejects_a_slow_start_out_of_range(vpc_id, certificate_arn):
+            from strongmind_deployment.alb import AlbArgs
+            with pytest.raises(ValueError, match="slow_start must be 0 or between 30 and 900"):
+                AlbArgs(vpc_id=vpc_id, certificate_arn=certificate_arn, slow_start=10)
+
+        def it_rejects_slow_start_with_least_outstanding_requests(vpc_id, certificate_arn):
+            from strongmind_deployment.alb import AlbArgs
+            with pytest.raises(ValueError, match="slow_start cannot be used"):
+                AlbArgs(vpc_id=vpc_id, certificate_arn=certificate_arn, slow_start=60,
+                        load_balancing_algorithm="least_outstanding_requests")
@@ -226,6 +226,45 @@ def describe_a_batch_component():
         def it_is_an_aws_batch_job_queue(sut):
             assert isinstance(sut.queue, aws.batch.JobQueue)
 
+        @pulumi.runtime.test
+        def it_uses_on_demand_fargate_only(sut):
+            assert sut.spot_env is None
+            return assert_outputs_equal(sut.queue.compute_environments, pulumi.Output.all(sut.create_env.arn))
+
+    def describe_with_fargate_spot():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs['use_fargate_spot'] = True
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_has_a_spot_compute_environment(sut):
+            return assert_output_equals(sut.spot_env.compute_environment_name, f"{sut.project_stack}-batch-spot")
+
+        @pulumi.runtime.test
+        def it_runs_on_fargate_spot(sut):
+            def check_compute_resources(compute_resources):
+                assert compute_resources['max_vcpus'] == sut.max_vcpus
+                assert compute_resources['type'] == "FARGATE_SPOT"
+
+            return sut.spot_env.compute_resources.apply(check_compute_resources)
+
+        @pulumi.runtime.test
+        def it_prefers_spot_and_falls_back_to_on_demand(sut):
+            return assert_outputs_equal(sut.queue.compute_environments,
+                                        pulumi.Output.all(sut.spot_env.arn, sut.create_env.arn))
+
+        def describe_on_arm64():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['cpu_architecture'] = "arm64"
+                return component_kwargs
+
+            def it_raises_an_error(pulumi_set_mocks, component_kwargs):
+                from strongmind_deployment.batch import BatchComponent
+                with pytest.raises(ValueError, match="use_fargate_spot runs tasks on FARGATE_SPOT"):
+                    BatchComponent("batch", **component_kwargs)
+
     def describe_log_group():
         @pulumi.runtime.test
         def it_has_a_log_group(sut):
@@ -255,6 +294,29 @@ def describe_a_batch_component():
         def it_is_an_aws_batch_job_definition(sut):
             assert isinstance(sut.definition, aws.batch.JobDefinition)
 
+        @pulumi.runtime.test
+        def it_runs_on_the_default_platform(sut):
+            def check_runtime_platform(properties):
+                assert "runtimePlatform" not in json.loads(properties)
+
+            return sut.definition.container_properties.apply(check_runtime_platform)
+
+        def describe_with_a_cpu_architecture():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['cpu_architecture'] = "arm64"
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_sets_the_runtime_platform(sut):
+                def check_runtime_platform(properties):
+                    assert json.loads(properties)["runtimePlatform"] == {
+                        "cpuArchitecture": "ARM64",
+                        "operatingSystemFamily": "LINUX",
+                    }
+
+                return sut.definition.container_properties.apply(check_runtime_platform)
+
         @pulumi.runtime.test
         def it_has_correct_name(sut):
             expected_name = f"{sut.project_stack}-definition"
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from benchmarks.__main__ import compare
+from benchmarks.harness import measure
+from benchmarks.scenarios import SCENARIOS
+
+
+def describe_the_construction_benchmarks():
+    @pytest.fixture
+    def measurement():
+        build, _sizes = SCENARIOS["batch.default"]
+        return measure("batch.default", 1, lambda: build(1), repeat=1)
+
+    def it_counts_registered_resources(measurement):
+        assert measurement.resources > 0
+
+    def it_counts_invokes(measurement):
+        assert measurement.invokes > 0
+
+    def it_counts_outputs_and_applies(measurement):
+        assert measurement.outputs >= measurement.applies > 0
+
+    def it_tracks_peak_memory(measurement):
+        assert measurement.peak_memory > 0
+
+    def it_restores_the_environment():
+        build, _sizes = SCENARIOS["rails.reader_instances"]
+        environ = dict(os.environ)
+        measure("rails.reader_instances", 0, lambda: build(0), repeat=1)
+        assert dict(os.environ) == environ
+
+    def it_counts_the_same_for_any_repeat(measurement):
+        build, _sizes = SCENARIOS["batch.default"]
+        again = measure("batch.default", 1, lambda: build(1), repeat=2)
+        assert (again.resources, again.outputs, again.applies, again.invokes) == \
+               (measurement.resources, measurement.outputs, measurement.applies, measurement.invokes)
+
+    def describe_comparing_with_the_baseline():
+        @pytest.fixture
+        def baseline():
+            return {"scenario": {"1": {"wall_time": 1.0, "peak_memory": 100, "resources": 10, "outputs": 50,
+                                       "applies": 5, "invokes": 2}}}
+
+        def it_accepts_unchanged_results(baseline):
+            assert compare(baseline, baseline, 2.0) == []
+
+        def it_flags_a_different_resource_count(baseline):
+            results = {"scenario": {"1": {**baseline["scenario"]["1"], "resources": 11}}}
+            assert compare(results, baseline, 2.0) == ["scenario[1]: resources 10 -> 11"]
+
+        def it_flags_wall_time_beyond_the_tolerance(baseline):
+            results = {"scenario": {"1": {**baseline["scenario"]["1"], "wall_time": 2.5}}}
+            assert len(compare(results, baseline, 2.0)) == 1
+
+        def it_flags_missing_baselines(baseline):
+            assert compare({"other": {"1": {}}}, baseline, 2.0) == ["other[1]: no baseline, run with --update"]
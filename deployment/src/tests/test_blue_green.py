@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from strongmind_deployment.blue_green import BlueGreenDeploymentProvider, appspec
+
+
+class FakeCodeDeployClient:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def create_deployment(self, **kwargs):
+        self.calls.append(("create_deployment", kwargs))
+        return {"deploymentId": "d-123"}
+
+    def get_deployment(self, deploymentId):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return {"deploymentInfo": {"status": status, "errorInformation": {"message": "alarm"}}}
+
+    def continue_deployment(self, **kwargs):
+        self.calls.append(("continue_deployment", kwargs))
+
+    def stop_deployment(self, **kwargs):
+        self.calls.append(("stop_deployment", kwargs))
+
+    def called(self, name):
+        return [kwargs for call, kwargs in self.calls if call == name]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def describe_appspec():
+    def it_points_the_service_at_the_new_task_definition():
+        resource = json.loads(appspec("arn:task-definition:2", "web", "3000"))["Resources"][0]["TargetService"]
+
+        assert resource["Properties"] == {
+            "TaskDefinition": "arn:task-definition:2",
+            "LoadBalancerInfo": {"ContainerName": "web", "ContainerPort": 3000},
+        }
+
+
+def describe_a_blue_green_deployment_provider():
+    @pytest.fixture
+    def statuses():
+        return ["InProgress", "Ready", "InProgress", "Succeeded"]
+
+    @pytest.fixture
+    def codedeploy_client(statuses):
+        return FakeCodeDeployClient(statuses)
+
+    @pytest.fixture
+    def requested_urls():
+        return []
+
+    @pytest.fixture
+    def inputs(codedeploy_client, requested_urls):
+        def http_get(url):
+            requested_urls.append(url)
+            return 200
+
+        return {
+            "application_name": "app",
+            "deployment_group_name": "app-group",
+            "task_definition_arn": "arn:task-definition:2",
+            "container_name": "web",
+            "container_port": 3000,
+            "test_url": "https://lb.example.com:8443",
+            "warmup_paths": ["/up", "/home"],
+            "warmup_seconds": 3,
+            "timeout": 60,
+            "poll_interval": 5,
+            "codedeploy_client": codedeploy_client,
+            "http_get": http_get,
+        }
+
+    @pytest.fixture
+    def clock():
+        return FakeClock()
+
+    @pytest.fixture
+    def sut():
+        return BlueGreenDeploymentProvider()
+
+    def it_does_not_deploy_a_new_service(sut, inputs, codedeploy_client):
+        sut.create(inputs)
+
+        assert codedeploy_client.calls == []
+
+    def it_only_changes_when_the_task_definition_changes(sut, inputs):
+        assert not sut.diff("0", inputs, {**inputs}).changes
+        assert sut.diff("0", inputs, {**inputs, "task_definition_arn": "arn:task-definition:3"}).changes
+
+    def it_deploys_the_new_task_definition(sut, inputs, codedeploy_client, clock):
+        result = sut.deploy(inputs, sleep=clock.sleep, clock=clock)
+
+        revision = codedeploy_client.called("create_deployment")[0]["revision"]
+        assert "arn:task-definition:2" in revision["appSpecContent"]["content"]
+        assert result == {"deployment_id": "d-123", "status": "Succeeded"}
+
+    def it_calls_codedeploy_with_the_stack_provider_config(sut, inputs, codedeploy_client, clock, monkeypatch):
+        sessions = []
+
+        class FakeSession:
+            def __init__(self, profile_name=None):
+                self.profile_name = profile_name
+
+            def client(self, service_name, region_name=None):
+                sessions.append((self.profile_name, service_name, region_name))
+                return codedeploy_client
+
+        monkeypatch.setattr("strongmind_deployment.blue_green.boto3.Session", FakeSession)
+        sut.deploy({**inputs, "codedeploy_client": None, "region": "us-west-2", "profile": "stage"},
+                   sleep=clock.sleep, clock=clock)
+
+        assert sessions == [("stage", "codedeploy", "us-west-2")]
+
+    def it_warms_up_the_test_listener_before_shifting_traffic(sut, inputs, codedeploy_client, requested_urls, clock):
+        sut.deploy(inputs, sleep=clock.sleep, clock=clock)
+
+        assert requested_urls[:2] == ["https://lb.example.com:8443/up", "https://lb.example.com:8443/home"]
+        assert len(requested_urls) == 8
+        assert codedeploy_client.called("continue_deployment") == [
+            {"deploymentId": "d-123", "deploymentWaitType": "READY_WAIT"}]
+
+    def it_counts_the_warm_up_responses(sut, inputs, clock):
+        assert sut.warm_up({**inputs, "warmup_seconds": 0}, sleep=clock.sleep, clock=clock) == {200: 2}
+
+    def it_skips_the_warm_up_without_paths(sut, inputs, requested_urls, clock):
+        assert sut.warm_up({**inputs, "warmup_paths": []}, sleep=clock.sleep, clock=clock) == {}
+        assert requested_urls == []
+
+    def describe_when_the_deployment_is_rolled_back():
+        @pytest.fixture
+        def statuses():
+            return ["InProgress", "Stopped"]
+
+        def it_raises(sut, inputs, clock):
+            with pytest.raises(Exception, match="d-123 stopped: alarm"):
+                sut.deploy(inputs, sleep=clock.sleep, clock=clock)
+
+    def describe_when_the_deployment_does_not_finish():
+        @pytest.fixture
+        def statuses():
+            return ["InProgress"]
+
+        def it_stops_and_rolls_back(sut, inputs, codedeploy_client, clock):
+            with pytest.raises(Exception, match="did not finish within 60 seconds"):
+                sut.deploy(inputs, sleep=clock.sleep, clock=clock)
+
+            assert codedeploy_client.called("stop_deployment") == [
+                {"deploymentId": "d-123", "autoRollbackEnabled": True}]
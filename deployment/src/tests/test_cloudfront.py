@@ -0,0 +1,236 @@
+import json
+
+import boto3
+import pulumi
+import pulumi_aws as aws
+import pytest
+
+from tests.mocks import get_pulumi_mocks
+from tests.shared import assert_output_equals, assert_outputs_equal
+
+
+def describe_invalidation_paths():
+    def it_keeps_a_few_changed_paths_as_they_are():
+        from strongmind_deployment.cloudfront import invalidation_paths
+
+        assert invalidation_paths(["index.html", "/static/app.js"]) == ["/index.html", "/static/app.js"]
+
+    def it_groups_the_busiest_deepest_directory_into_a_wildcard():
+        from strongmind_deployment.cloudfront import invalidation_paths
+
+        changed = ["index.html", "static/css/site.css"] + [f"static/js/{i}.js" for i in range(4)]
+
+        assert invalidation_paths(changed, max_paths=3) == ["/index.html", "/static/css/site.css", "/static/js/*"]
+
+    def it_widens_wildcards_until_the_paths_fit():
+        from strongmind_deployment.cloudfront import invalidation_paths
+
+        changed = [f"static/{directory}/{i}.js" for directory in ("a", "b", "c") for i in range(3)]
+
+        assert invalidation_paths(changed, max_paths=2) == ["/static/*"]
+
+    def it_drops_paths_covered_by_a_wildcard():
+        from strongmind_deployment.cloudfront import invalidation_paths
+
+        assert invalidation_paths(["/static/*", "/static/app.js", "/index.html"]) == ["/index.html", "/static/*"]
+
+    def it_returns_nothing_when_nothing_changed():
+        from strongmind_deployment.cloudfront import invalidation_paths
+
+        assert invalidation_paths([]) == []
+
+
+def describe_create_invalidation():
+    @pytest.fixture
+    def cloudfront_client():
+        return boto3.client('cloudfront', region_name='us-east-1')
+
+    @pytest.fixture
+    def distribution_id(cloudfront_client):
+        return cloudfront_client.create_distribution(DistributionConfig={
+            "CallerReference": "test",
+            "Comment": "",
+            "Enabled": True,
+            "Origins": {"Quantity": 1, "Items": [{
+                "Id": "origin",
+                "DomainName": "bucket.s3.amazonaws.com",
+                "S3OriginConfig": {"OriginAccessIdentity": ""},
+            }]},
+            "DefaultCacheBehavior": {"TargetOriginId": "origin", "ViewerProtocolPolicy": "allow-all"},
+        })["Distribution"]["Id"]
+
+    def it_invalidates_the_grouped_paths(cloudfront_client, distribution_id):
+        from strongmind_deployment.cloudfront import create_invalidation
+
+        invalidation_id = create_invalidation(distribution_id, [f"static/{i}.js" for i in range(3)], max_paths=2,
+                                              cloudfront_client=cloudfront_client)
+
+        invalidation = cloudfront_client.get_invalidation(DistributionId=distribution_id, Id=invalidation_id)
+        assert invalidation["Invalidation"]["InvalidationBatch"]["Paths"]["Items"] == ["/static/*"]
+
+    def it_does_not_invalidate_when_nothing_changed(cloudfront_client, distribution_id):
+        from strongmind_deployment.cloudfront import create_invalidation
+
+        assert create_invalidation(distribution_id, [], cloudfront_client=cloudfront_client) is None
+
+
+def describe_a_distribution_component():
+    @pytest.fixture
+    def app_name(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def stack(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def pulumi_mocks(faker):
+        return get_pulumi_mocks(faker)
+
+    @pytest.fixture
+    def fqdn():
+        return "cdn.strongmind.com"
+
+    @pytest.fixture
+    def domain_validation_options(faker):
+        class FakeValidationOption:
+            def __init__(self):
+                self.resource_record_name = faker.word()
+                self.resource_record_value = faker.word()
+                self.resource_record_type = faker.word()
+
+        return [FakeValidationOption()]
+
+    @pytest.fixture
+    def component_arguments(fqdn, domain_validation_options):
+        return {"fqdn": fqdn, "domain_validation_options": domain_validation_options}
+
+    @pytest.fixture
+    def sut(pulumi_set_mocks, component_arguments):
+        from strongmind_deployment.cloudfront import DistributionComponent
+
+        return DistributionComponent("cdn", **component_arguments)
+
+    @pulumi.runtime.test
+    def it_serves_http3(sut):
+        return assert_output_equals(sut.distribution.http_version, "http2and3")
+
+    @pulumi.runtime.test
+    def it_only_allows_read_methods(sut):
+        return assert_output_equals(sut.distribution.default_cache_behavior.allowed_methods,
+                                    ["GET", "HEAD", "OPTIONS"])
+
+    @pulumi.runtime.test
+    def it_caches_the_site_root_and_other_paths_briefly_by_default(sut):
+        policy = sut.cache_policies["0-60-300"]
+        return assert_outputs_equal(sut.distribution.default_cache_behavior.cache_policy_id, policy.id)
+
+    @pulumi.runtime.test
+    def it_caches_compressed_objects(sut):
+        parameters = sut.cache_policies["0-60-300"].parameters_in_cache_key_and_forwarded_to_origin
+
+        def check(args):
+            assert args == [True, True]
+
+        return pulumi.Output.all(parameters.enable_accept_encoding_brotli,
+                                 parameters.enable_accept_encoding_gzip).apply(check)
+
+    @pulumi.runtime.test
+    def it_caches_the_root_object_briefly(sut):
+        def check(args):
+            behaviors, policy_id = args
+            assert [behavior["path_pattern"] for behavior in behaviors] == ["/index.html"]
+            assert behaviors[0]["cache_policy_id"] == policy_id
+
+        return pulumi.Output.all(sut.distribution.ordered_cache_behaviors,
+                                 sut.cache_policies["0-60-300"].id).apply(check)
+
+    def describe_origin_access_control():
+        def it_has_an_origin_access_control(sut):
+            assert isinstance(sut.origin_access_control, aws.cloudfront.OriginAccessControl)
+
+        @pulumi.runtime.test
+        def it_signs_requests_to_the_origin(sut):
+            def check(args):
+                origin_access_control_id, origins = args
+                assert origins[0]["origin_access_control_id"] == origin_access_control_id
+
+            return pulumi.Output.all(sut.origin_access_control.id, sut.distribution.origins).apply(check)
+
+        @pulumi.runtime.test
+        def it_only_lets_the_distribution_read_the_bucket(sut):
+            def check(args):
+                policy, distribution_arn = args
+                statement = json.loads(policy)["Statement"][0]
+                assert statement["Principal"] == {"Service": "cloudfront.amazonaws.com"}
+                assert statement["Action"] == "s3:GetObject"
+                assert statement["Condition"]["StringEquals"]["AWS:SourceArn"] == distribution_arn
+
+            return pulumi.Output.all(sut.bucket_policy.policy, sut.distribution.arn).apply(check)
+
+        @pulumi.runtime.test
+        def it_updates_the_public_bucket_policy_of_existing_stacks_in_place(sut):
+            # S3 keeps one policy per bucket: deleting the old public policy after writing this one would remove it
+            def check(aliases):
+                assert [alias.split("::")[-1] for alias in aliases] == ["public_bucket_policy"]
+
+            return pulumi.Output.all(*sut.bucket_policy._aliases).apply(check)
+
+        def describe_with_a_public_bucket():
+            @pytest.fixture
+            def component_arguments(fqdn, domain_validation_options):
+                return {"fqdn": fqdn, "domain_validation_options": domain_validation_options, "public_bucket": True}
+
+            def it_has_no_origin_access_control(sut):
+                assert sut.origin_access_control is None
+
+            @pulumi.runtime.test
+            def it_lets_anyone_read_the_bucket_through_the_same_policy(sut):
+                def check(args):
+                    policy, aliases = args
+                    assert policy
+                    assert [alias.split("::")[-1] for alias in aliases] == ["public_bucket_policy"]
+
+                return pulumi.Output.all(sut.bucket_policy.policy,
+                                         pulumi.Output.all(*sut.bucket_policy._aliases)).apply(check)
+
+    def describe_with_cache_behaviors():
+        @pytest.fixture
+        def component_arguments(fqdn, domain_validation_options):
+            return {
+                "fqdn": fqdn,
+                "domain_validation_options": domain_validation_options,
+                "cache_behaviors": {"/static/*": "immutable", "/index.html": "short", "/api/*": (0, 5, 10)},
+                "default_cache_profile": "none",
+            }
+
+        @pulumi.runtime.test
+        def it_adds_a_behavior_per_path(sut):
+            def check(behaviors):
+                assert [behavior["path_pattern"] for behavior in behaviors] == ["/index.html", "/static/*", "/api/*"]
+
+            return sut.distribution.ordered_cache_behaviors.apply(check)
+
+        @pulumi.runtime.test
+        def it_caches_immutable_paths_for_a_year(sut):
+            policy = sut.cache_policies["31536000-31536000-31536000"]
+            return assert_output_equals(policy.min_ttl, 31536000)
+
+        @pulumi.runtime.test
+        def it_accepts_custom_ttls(sut):
+            return assert_output_equals(sut.cache_policies["0-5-10"].max_ttl, 10)
+
+        @pulumi.runtime.test
+        def it_uses_the_default_profile_for_other_paths(sut):
+            policy = sut.cache_policies["0-0-0"]
+            return assert_outputs_equal(sut.distribution.default_cache_behavior.cache_policy_id, policy.id)
+
+        @pulumi.runtime.test
+        def it_does_not_key_uncached_objects_on_their_encoding(sut):
+            parameters = sut.cache_policies["0-0-0"].parameters_in_cache_key_and_forwarded_to_origin
+
+            def check(args):
+                assert args == [False, False]
+
+            return pulumi.Output.all(parameters.enable_accept_encoding_brotli,
+                                     parameters.enable_accept_encoding_gzip).apply(check)
@@ -3,6 +3,7 @@ import os
 
 import boto3
 import pulumi.runtime
+import pulumi_aws
 import pulumi_awsx as awsx
 import pytest
 from moto import mock_aws
@@ -44,6 +45,15 @@ def describe_container():
 
             return pulumi.Output.all(sut.ecs_cluster.name).apply(check_cluster_name)
 
+        @pulumi.runtime.test
+        def it_registers_the_fargate_capacity_providers(sut):
+            return assert_output_equals(sut.ecs_cluster_capacity_providers.capacity_providers,
+                                        ["FARGATE", "FARGATE_SPOT"])
+
+        @pulumi.runtime.test
+        def it_runs_on_demand_by_default(sut):
+            assert sut.capacity_provider_strategies is None
+
         @pulumi.runtime.test
         def it_has_environment_variables(sut, app_name, env_vars):
             assert sut.env_vars == env_vars
@@ -298,6 +308,49 @@ def describe_container():
                 def it_sets_the_target_group_health_check_timeout(sut):
                     return assert_output_equals(sut.target_group.health_check.timeout, 5)
 
+                @pulumi.runtime.test
+                def it_routes_round_robin(sut):
+                    return assert_output_equals(sut.target_group.load_balancing_algorithm_type, "round_robin")
+
+                @pulumi.runtime.test
+                def it_has_no_slow_start(sut):
+                    return assert_output_equals(sut.target_group.slow_start, 0)
+
+                @pulumi.runtime.test
+                def it_drains_targets_for_the_default_delay(sut):
+                    return assert_output_equals(sut.target_group.deregistration_delay, 300)
+
+                def describe_with_connection_tuning():
+                    @pytest.fixture
+                    def component_kwargs(component_kwargs):
+                        component_kwargs["load_balancing_algorithm"] = "least_outstanding_requests"
+                        component_kwargs["deregistration_delay"] = 30
+                        component_kwargs["idle_timeout"] = 120
+                        return component_kwargs
+
+                    @pulumi.runtime.test
+                    def it_routes_to_the_least_outstanding_requests(sut):
+                        return assert_output_equals(sut.target_group.load_balancing_algorithm_type,
+                                                    "least_outstanding_requests")
+
+                    @pulumi.runtime.test
+                    def it_sets_the_deregistration_delay(sut):
+                        return assert_output_equals(sut.target_group.deregistration_delay, 30)
+
+                    @pulumi.runtime.test
+                    def it_sets_the_load_balancer_idle_timeout(sut):
+                        return assert_output_equals(sut.load_balancer.idle_timeout, 120)
+
+                def describe_with_slow_start():
+                    @pytest.fixture
+                    def component_kwargs(component_kwargs):
+                        component_kwargs["slow_start"] = 120
+                        return component_kwargs
+
+                    @pulumi.runtime.test
+                    def it_ramps_up_new_tasks(sut):
+                        return assert_output_equals(sut.target_group.slow_start, 120)
+
             def describe_the_load_balancer_listener_for_https():
                 @pytest.fixture
                 def listener(sut):
@@ -922,6 +975,153 @@ def describe_container():
         @pulumi.runtime.test
         def it_sets_cname_record_zone_id(sut):
             return assert_output_equals(sut.cname_records[0].zone_id, "b4b7fec0d0aacbd55c5a259d1e64fff5")
+
+        def describe_with_an_assets_bucket():
+            @pytest.fixture
+            def assets_bucket(pulumi_set_mocks):
+                return pulumi_aws.s3.BucketV2("assets", bucket="assets-bucket")
+
+            @pytest.fixture
+            def component_kwargs(component_kwargs, assets_bucket):
+                component_kwargs['assets_bucket'] = assets_bucket
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_serves_assets_from_the_bucket_first(sut):
+                def check_behaviors(behaviors):
+                    assert behaviors[0]["path_pattern"] == "/assets/*"
+                    assert behaviors[0]["target_origin_id"] == "assets"
+                    assert behaviors[0]["compress"] is True
+                    assert behaviors[0]["cache_policy_id"] == "658327ea-f89d-4fab-a63d-7e88639e58f6"
+
+                return sut.cloudfront_distribution.ordered_cache_behaviors.apply(check_behaviors)
+
+            @pulumi.runtime.test
+            def it_caches_only_the_other_static_paths_from_the_containers(sut):
+                def check_behaviors(behaviors):
+                    assert [behavior["path_pattern"] for behavior in behaviors] == \
+                           ["/assets/*", "/504.html", "/packs/*"]
+
+                return sut.cloudfront_distribution.ordered_cache_behaviors.apply(check_behaviors)
+
+            @pulumi.runtime.test
+            def it_adds_the_bucket_as_an_origin_with_access_control(sut):
+                def check_origins(args):
+                    origins, oac_id = args
+                    origin = next(origin for origin in origins if origin["origin_id"] == "assets")
+                    assert origin["domain_name"] == "assets-bucket.s3.us-west-2.amazonaws.com"
+                    assert origin["origin_access_control_id"] == oac_id
+
+                return pulumi.Output.all(sut.cloudfront_distribution.origins,
+                                         sut.assets_origin_access_control.id).apply(check_origins)
+
+            @pulumi.runtime.test
+            def it_lets_only_the_distribution_read_the_assets(sut):
+                def check_policy(args):
+                    policy, distribution_arn = args
+                    statement = json.loads(policy)["Statement"][0]
+                    assert statement["Principal"] == {"Service": "cloudfront.amazonaws.com"}
+                    assert statement["Resource"] == "arn:aws:s3:::assets-bucket/assets/*"
+                    assert statement["Condition"]["StringEquals"]["AWS:SourceArn"] == distribution_arn
+
+                return pulumi.Output.all(sut.assets_bucket_policy.policy,
+                                         sut.cloudfront_distribution.arn).apply(check_policy)
+
+        @pulumi.runtime.test
+        def it_does_not_serve_assets_from_a_bucket_by_default(sut):
+            assert sut.assets_bucket_policy is None
+
+        @pulumi.runtime.test
+        def it_caches_static_assets_from_the_containers(sut):
+            def check_behaviors(args):
+                behaviors, alb_dns_name, cache_policy_id = args
+                static_behaviors = [behavior for behavior in behaviors if behavior["path_pattern"] != "/504.html"]
+                assert [behavior["path_pattern"] for behavior in static_behaviors] == ["/assets/*", "/packs/*"]
+                for behavior in static_behaviors:
+                    assert behavior["target_origin_id"] == alb_dns_name
+                    assert behavior["cache_policy_id"] == cache_policy_id
+                    assert behavior["allowed_methods"] == ["GET", "HEAD"]
+                    assert behavior["compress"] is True
+
+            return pulumi.Output.all(sut.cloudfront_distribution.ordered_cache_behaviors,
+                                     sut.load_balancer.dns_name,
+                                     sut.static_assets_cache_policy.id).apply(check_behaviors)
+
+        @pulumi.runtime.test
+        def it_forwards_viewer_headers_to_the_load_balancer_for_static_assets(sut):
+            def check_behaviors(behaviors):
+                static_behaviors = [behavior for behavior in behaviors if behavior["path_pattern"] != "/504.html"]
+                for behavior in static_behaviors:
+                    assert behavior["origin_request_policy_id"] == "216adef6-5c7f-47e4-b989-5492eafa07d3"
+
+            return sut.cloudfront_distribution.ordered_cache_behaviors.apply(check_behaviors)
+
+        @pulumi.runtime.test
+        def it_caches_static_assets_for_a_year_whatever_the_headers(sut):
+            return assert_outputs_equal(
+                pulumi.Output.all(sut.static_assets_cache_policy.min_ttl,
+                                  sut.static_assets_cache_policy.default_ttl,
+                                  sut.static_assets_cache_policy.max_ttl),
+                [31536000, 31536000, 31536000])
+
+        @pulumi.runtime.test
+        def it_compresses_static_assets_with_brotli_and_gzip(sut):
+            def check_encodings(parameters):
+                assert parameters["enable_accept_encoding_brotli"] is True
+                assert parameters["enable_accept_encoding_gzip"] is True
+                assert parameters["query_strings_config"]["query_string_behavior"] == "none"
+
+            return sut.static_assets_cache_policy.parameters_in_cache_key_and_forwarded_to_origin.apply(check_encodings)
+
+        @pulumi.runtime.test
+        def it_has_no_origin_shield_by_default(sut):
+            def check_origins(origins):
+                assert all(origin.get("origin_shield") is None for origin in origins)
+
+            return sut.cloudfront_distribution.origins.apply(check_origins)
+
+        def describe_with_custom_static_asset_paths():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['static_asset_paths'] = ["/vite/*"]
+                component_kwargs['static_asset_ttl'] = 86400
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_caches_the_paths_for_the_ttl(sut):
+                def check_behaviors(args):
+                    behaviors, default_ttl = args
+                    assert [behavior["path_pattern"] for behavior in behaviors] == ["/504.html", "/vite/*"]
+                    assert default_ttl == 86400
+
+                return pulumi.Output.all(sut.cloudfront_distribution.ordered_cache_behaviors,
+                                         sut.static_assets_cache_policy.default_ttl).apply(check_behaviors)
+
+        def describe_without_static_asset_paths():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['static_asset_paths'] = []
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_has_no_static_asset_cache_policy(sut):
+                assert sut.static_assets_cache_policy is None
+
+        def describe_with_an_origin_shield():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['origin_shield_region'] = "us-west-2"
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_shields_the_load_balancer(sut):
+                def check_origins(args):
+                    origins, alb_dns_name = args
+                    origin = next(origin for origin in origins if origin["origin_id"] == alb_dns_name)
+                    assert origin["origin_shield"] == {"enabled": True, "origin_shield_region": "us-west-2"}
+
+                return pulumi.Output.all(sut.cloudfront_distribution.origins,
+                                         sut.load_balancer.dns_name).apply(check_origins)
         
     def describe_with_repository_domain_name_certificate():
         @pulumi.runtime.test
@@ -1255,3 +1455,357 @@ def describe_container():
                 assert container.get("stopTimeout") is None
 
             return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_stop_timeout)
+
+    def describe_with_fargate_spot():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["need_load_balancer"] = False
+            component_kwargs["fargate_spot_weight"] = 3
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_keeps_a_base_on_demand_and_weights_spot(sut):
+            assert sut.capacity_provider_strategies == [
+                {"capacityProvider": "FARGATE", "base": 1, "weight": 1},
+                {"capacityProvider": "FARGATE_SPOT", "weight": 3},
+            ]
+
+        @pulumi.runtime.test
+        def it_moves_the_ecs_service_onto_the_strategy(sut):
+            def check_strategies(strategies):
+                assert [dict(strategy) for strategy in strategies] == [
+                    {"capacity_provider": "FARGATE", "base": 1, "weight": 1},
+                    {"capacity_provider": "FARGATE_SPOT", "weight": 3},
+                ]
+
+            return sut.fargate_service.service.capacity_provider_strategies.apply(check_strategies)
+
+        @pulumi.runtime.test
+        def it_drops_the_launch_type_of_the_ecs_service(sut):
+            return assert_output_equals(sut.fargate_service.service.launch_type, None)
+
+        @pulumi.runtime.test
+        def it_deletes_the_ecs_service_before_replacing_it(sut):
+            def check_options(_):
+                options = pulumi.runtime.settings.SETTINGS.monitor.resource_options[sut.namespace]
+                assert options.delete_before_replace is True
+
+            return sut.fargate_service.service.urn.apply(check_options)
+
+        def describe_with_a_custom_base():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["fargate_base"] = 2
+                component_kwargs["fargate_weight"] = 0
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_uses_the_base_and_weight(sut):
+                assert sut.capacity_provider_strategies[0] == {"capacityProvider": "FARGATE", "base": 2, "weight": 0}
+
+        def describe_on_arm64():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["cpu_architecture"] = "ARM64"
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs):
+                import strongmind_deployment.container
+                with pytest.raises(ValueError, match="fargate_spot_weight runs tasks on FARGATE_SPOT"):
+                    strongmind_deployment.container.ContainerComponent("container", **component_kwargs)
+
+    def describe_with_cpu_architecture():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["need_load_balancer"] = False
+            component_kwargs["cpu_architecture"] = "arm64"
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_runs_the_tasks_on_the_architecture(sut):
+            def check_runtime_platform(args):
+                task_definition_dict = args[0]
+                assert task_definition_dict["runtimePlatform"] == {
+                    "cpuArchitecture": "ARM64",
+                    "operatingSystemFamily": "LINUX",
+                }
+
+            return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_runtime_platform)
+
+    def describe_without_cpu_architecture():
+        @pulumi.runtime.test
+        def it_leaves_the_runtime_platform_unset(sut):
+            def check_runtime_platform(args):
+                task_definition_dict = args[0]
+                assert task_definition_dict.get("runtimePlatform") is None
+
+            return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_runtime_platform)
+
+    def describe_with_fast_health_checks():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["health_check_interval"] = 10
+            component_kwargs["healthy_threshold"] = 3
+            component_kwargs["unhealthy_threshold"] = 4
+            component_kwargs["health_check_grace_period"] = 90
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_checks_at_the_interval(sut):
+            return assert_output_equals(sut.target_group.health_check.interval, 10)
+
+        @pulumi.runtime.test
+        def it_sets_the_healthy_threshold(sut):
+            return assert_output_equals(sut.target_group.health_check.healthy_threshold, 3)
+
+        @pulumi.runtime.test
+        def it_sets_the_unhealthy_threshold(sut):
+            return assert_output_equals(sut.target_group.health_check.unhealthy_threshold, 4)
+
+        @pulumi.runtime.test
+        def it_sets_the_grace_period(sut):
+            return assert_output_equals(sut.fargate_service.health_check_grace_period_seconds, 90)
+
+        @pulumi.runtime.test
+        def it_keeps_the_default_timeout(sut):
+            return assert_output_equals(sut.target_group.health_check.timeout, 5)
+
+        def describe_at_the_minimum_interval():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["health_check_interval"] = 5
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_times_out_before_the_next_check(sut):
+                return assert_output_equals(sut.target_group.health_check.timeout, 4)
+
+        def describe_with_a_timeout_as_long_as_the_interval():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["health_check_timeout"] = 10
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs):
+                import strongmind_deployment.container
+                with pytest.raises(ValueError, match=r"health_check_timeout \(10\) must be less than "
+                                                     r"health_check_interval \(10\)"):
+                    strongmind_deployment.container.ContainerComponent("container", **component_kwargs)
+
+    def describe_with_a_container_health_check():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["container_health_check"] = True
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_curls_the_health_check_path(sut, container_port):
+            def check_health_check(args):
+                container = args[0]["container"]
+                assert container["healthCheck"] == {
+                    "command": ["CMD-SHELL", f"curl -f http://localhost:{container_port}/up || exit 1"],
+                    "interval": 10,
+                    "timeout": 5,
+                    "retries": 3,
+                    "startPeriod": 30,
+                }
+
+            return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_health_check)
+
+        @pulumi.runtime.test
+        def it_shortens_the_grace_period_to_the_container_health_check(sut):
+            return assert_output_equals(sut.fargate_service.health_check_grace_period_seconds, 60)
+
+        def describe_with_custom_settings():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["container_health_check"] = {
+                    "command": ["CMD", "/bin/ready"],
+                    "start_period": 60,
+                    "retries": 2,
+                }
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_uses_the_settings(sut):
+                def check_health_check(args):
+                    health_check = args[0]["container"]["healthCheck"]
+                    assert health_check["command"] == ["CMD", "/bin/ready"]
+                    assert health_check["startPeriod"] == 60
+                    assert health_check["interval"] == 10
+
+                return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_health_check)
+
+            @pulumi.runtime.test
+            def it_bases_the_grace_period_on_the_settings(sut):
+                return assert_output_equals(sut.fargate_service.health_check_grace_period_seconds, 80)
+
+    def describe_with_container_depends_on():
+        @pytest.fixture
+        def sidecar_health_check():
+            return awsx.ecs.TaskDefinitionHealthCheckArgs(command=["CMD-SHELL", "agent health"])
+
+        @pytest.fixture
+        def component_kwargs(component_kwargs, sidecar_health_check):
+            component_kwargs["sidecar_containers"] = [awsx.ecs.TaskDefinitionContainerDefinitionArgs(
+                name="datadog-agent",
+                image="gcr.io/datadoghq/agent:7",
+                essential=False,
+                health_check=sidecar_health_check,
+            )]
+            component_kwargs["container_depends_on"] = {"datadog-agent": "HEALTHY"}
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_starts_the_main_container_after_the_sidecar(sut, app_name, stack):
+            def check_depends_on(args):
+                container = args[0]["containers"][f"{app_name}-{stack}"]
+                assert container["dependsOn"] == [{"containerName": "datadog-agent", "condition": "HEALTHY"}]
+
+            return pulumi.Output.all(sut.fargate_service.task_definition_args).apply(check_depends_on)
+
+        def describe_waiting_for_a_sidecar_without_a_health_check():
+            @pytest.fixture
+            def sidecar_health_check():
+                return None
+
+            def it_raises_an_error(component_kwargs):
+                import strongmind_deployment.container
+                with pytest.raises(ValueError, match="datadog-agent to be HEALTHY, but it has no health_check"):
+                    strongmind_deployment.container.ContainerComponent("container", **component_kwargs)
+
+        def describe_with_an_unknown_container():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["container_depends_on"] = {"migrations": "COMPLETE"}
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs):
+                import strongmind_deployment.container
+                with pytest.raises(ValueError, match="migrations, which is not a sidecar container"):
+                    strongmind_deployment.container.ContainerComponent("container", **component_kwargs)
+
+    def describe_with_blue_green_deployments():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["deployment_strategy"] = "blue_green"
+            component_kwargs["blue_green_warmup_seconds"] = 120
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_hands_the_service_to_codedeploy(sut):
+            return assert_output_equals(sut.fargate_service.deployment_controller, {"type": "CODE_DEPLOY"})
+
+        @pulumi.runtime.test
+        def it_creates_a_green_target_group_like_the_blue_one(sut):
+            def check(args):
+                blue_health_check, green_health_check, green_port = args
+                assert green_health_check == blue_health_check
+                assert green_port == sut.container_port
+
+            return pulumi.Output.all(sut.target_group.health_check, sut.green_target_group.health_check,
+                                     sut.green_target_group.port).apply(check)
+
+        @pulumi.runtime.test
+        def it_adds_a_test_listener_in_front_of_the_target_group(sut):
+            def check(args):
+                port, default_actions, target_group_arn = args
+                assert port == 8443
+                assert default_actions[0]["target_group_arn"] == target_group_arn
+
+            return pulumi.Output.all(sut.test_listener.port, sut.test_listener.default_actions,
+                                     sut.target_group.arn).apply(check)
+
+        @pulumi.runtime.test
+        def it_only_lets_the_vpc_reach_the_test_listener(sut):
+            return assert_output_equals(sut.alb.test_ingress.cidr_blocks, ["172.31.0.0/16"])
+
+        @pulumi.runtime.test
+        def it_deploys_with_the_stack_provider_config(sut):
+            def check(args):
+                region, profile = args
+                assert region == pulumi_aws.config.region
+                assert profile == pulumi_aws.config.profile
+
+            return pulumi.Output.all(sut.blue_green_deployment.region,
+                                     sut.blue_green_deployment.profile).apply(check)
+
+        def describe_with_test_cidrs():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["blue_green_test_cidrs"] = ["203.0.113.0/24"]
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_lets_the_cidrs_reach_the_test_listener(sut):
+                return assert_output_equals(sut.alb.test_ingress.cidr_blocks, ["203.0.113.0/24"])
+
+        @pulumi.runtime.test
+        def it_deploys_blue_green_with_traffic_control(sut):
+            return assert_output_equals(sut.deployment_group.deployment_style.deployment_type, "BLUE_GREEN")
+
+        @pulumi.runtime.test
+        def it_rolls_back_on_failures_and_alarms(sut):
+            return assert_output_equals(sut.deployment_group.auto_rollback_configuration.events,
+                                        ["DEPLOYMENT_FAILURE", "DEPLOYMENT_STOP_ON_ALARM"])
+
+        @pulumi.runtime.test
+        def it_watches_the_5xx_and_latency_alarms(sut, app_name, stack):
+            return assert_output_equals(sut.deployment_group.alarm_configuration.alarms,
+                                        [f"{app_name}-{stack}-deployment-5xx", f"{app_name}-{stack}-deployment-latency"])
+
+        @pulumi.runtime.test
+        def it_routes_test_traffic_through_the_test_listener(sut):
+            def check(args):
+                pair_info, test_listener_arn, listener_arn = args
+                assert pair_info["test_traffic_route"]["listener_arns"] == [test_listener_arn]
+                assert pair_info["prod_traffic_route"]["listener_arns"] == [listener_arn]
+
+            return pulumi.Output.all(sut.deployment_group.load_balancer_info.target_group_pair_info,
+                                     sut.test_listener.arn, sut.load_balancer_listener.arn).apply(check)
+
+        @pulumi.runtime.test
+        def it_holds_new_tasks_for_the_warm_up(sut):
+            return assert_output_equals(
+                sut.deployment_group.blue_green_deployment_config.deployment_ready_option.action_on_timeout,
+                "STOP_DEPLOYMENT")
+
+        @pulumi.runtime.test
+        def it_warms_up_the_health_check_path(sut):
+            return assert_output_equals(sut.blue_green_deployment.warmup_paths, ["/up"])
+
+        @pulumi.runtime.test
+        def it_leaves_the_task_definition_to_codedeploy(sut):
+            def check_options(_):
+                options = pulumi.runtime.settings.SETTINGS.monitor.resource_options[sut.namespace]
+                assert options.ignore_changes == ["taskDefinition", "loadBalancers"]
+                assert options.delete_before_replace is True
+
+            return sut.fargate_service.service.urn.apply(check_options)
+
+        @pulumi.runtime.test
+        def it_puts_the_ecs_service_under_codedeploy(sut):
+            return assert_output_equals(sut.fargate_service.service.deployment_controller.type, "CODE_DEPLOY")
+
+        def describe_without_a_warm_up():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["blue_green_warmup_seconds"] = 0
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_shifts_traffic_as_soon_as_tasks_are_healthy(sut):
+                return assert_output_equals(
+                    sut.deployment_group.blue_green_deployment_config.deployment_ready_option.action_on_timeout,
+                    "CONTINUE_DEPLOYMENT")
+
+        def describe_without_a_load_balancer():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["need_load_balancer"] = False
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs):
+                import strongmind_deployment.container
+                with pytest.raises(ValueError, match="requires a load balancer"):
+                    strongmind_deployment.container.ContainerComponent("container", **component_kwargs)
@@ -33,6 +33,14 @@ def describe_autoscaling():
                 component_kwargs["max_number_of_instances"] = 10
                 return component_kwargs
 
+            @pulumi.runtime.test
+            def it_uses_the_max_number_of_instances(sut):
+                return assert_output_equals(sut.autoscaling_target.max_capacity, 10)
+
+            @pulumi.runtime.test
+            def it_alarms_at_the_max_number_of_instances(sut):
+                return assert_output_equals(sut.running_tasks_alarm.threshold, 10)
+
         @pulumi.runtime.test
         def it_has_a_default_min_capacity(sut):
             return assert_output_equals(sut.autoscaling_target.min_capacity, 1)
@@ -408,6 +416,113 @@ def describe_autoscaling():
                 def it_scales_up_by_three_instances(step):
                     return assert_output_equals(step.scaling_adjustment, 3)
 
+    def describe_target_tracking():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs["autoscale"] = True
+            component_kwargs["autoscale_mode"] = "target_tracking"
+            component_kwargs["autoscale_request_count_per_target"] = 500
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_has_no_step_scaling_policies(sut):
+            assert not sut.autoscaling_out_policy
+            assert not sut.autoscaling_out_alarm
+
+        @pulumi.runtime.test
+        def it_keeps_the_running_tasks_alarm(sut):
+            assert sut.running_tasks_alarm
+
+        def describe_request_count_policy():
+            @pytest.fixture
+            def configuration(sut):
+                return sut.request_count_scaling_policy.target_tracking_scaling_policy_configuration
+
+            @pulumi.runtime.test
+            def it_is_named_request_count_scaling_policy(sut, app_name, stack):
+                return assert_output_equals(sut.request_count_scaling_policy.name,
+                                            f"{app_name}-{stack}-request-count-scaling-policy")
+
+            @pulumi.runtime.test
+            def it_has_a_target_tracking_policy_type(sut):
+                return assert_output_equals(sut.request_count_scaling_policy.policy_type, "TargetTrackingScaling")
+
+            @pulumi.runtime.test
+            def it_scales_the_autoscaling_target(sut):
+                return assert_outputs_equal(sut.request_count_scaling_policy.resource_id,
+                                            sut.autoscaling_target.resource_id)
+
+            @pulumi.runtime.test
+            def it_tracks_the_requests_per_target(configuration):
+                return assert_output_equals(configuration.target_value, 500)
+
+            @pulumi.runtime.test
+            def it_uses_the_alb_request_count_per_target_metric(configuration):
+                return assert_output_equals(configuration.predefined_metric_specification.predefined_metric_type,
+                                            "ALBRequestCountPerTarget")
+
+            @pulumi.runtime.test
+            def it_labels_the_metric_with_the_load_balancer_and_target_group(sut, configuration):
+                expected = pulumi.Output.all(sut.load_balancer.arn, sut.target_group.arn).apply(
+                    lambda arns: f"{arns[0].split('/', 1)[1]}/{arns[1].split(':')[-1]}")
+                return assert_outputs_equal(expected, configuration.predefined_metric_specification.resource_label)
+
+            @pulumi.runtime.test
+            def it_has_default_cooldowns(configuration):
+                return assert_outputs_equal(
+                    pulumi.Output.all(configuration.scale_out_cooldown, configuration.scale_in_cooldown), [60, 300])
+
+        def describe_cpu_policy():
+            @pytest.fixture
+            def configuration(sut):
+                return sut.cpu_scaling_policy.target_tracking_scaling_policy_configuration
+
+            @pulumi.runtime.test
+            def it_is_named_cpu_scaling_policy(sut, app_name, stack):
+                return assert_output_equals(sut.cpu_scaling_policy.name, f"{app_name}-{stack}-cpu-scaling-policy")
+
+            @pulumi.runtime.test
+            def it_tracks_sixty_percent_by_default(configuration):
+                return assert_output_equals(configuration.target_value, 60)
+
+            @pulumi.runtime.test
+            def it_uses_the_service_average_cpu_metric(configuration):
+                return assert_output_equals(configuration.predefined_metric_specification.predefined_metric_type,
+                                            "ECSServiceAverageCPUUtilization")
+
+        def describe_with_custom_cooldowns_and_no_cpu_target():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["autoscale_cpu_utilization"] = None
+                component_kwargs["autoscale_scale_out_cooldown"] = 30
+                component_kwargs["autoscale_scale_in_cooldown"] = 900
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_only_tracks_requests(sut):
+                assert sut.request_count_scaling_policy
+                assert not sut.cpu_scaling_policy
+
+            @pulumi.runtime.test
+            def it_uses_the_cooldowns(sut):
+                configuration = sut.request_count_scaling_policy.target_tracking_scaling_policy_configuration
+                return assert_outputs_equal(
+                    pulumi.Output.all(configuration.scale_out_cooldown, configuration.scale_in_cooldown), [30, 900])
+
+        def describe_with_scheduled_scaling():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                os.environ['ENVIRONMENT_NAME'] = 'prod'
+                component_kwargs["scheduled_scaling"] = True
+                component_kwargs["pre_scale_time"] = "07:00"
+                component_kwargs["post_scale_time"] = "17:00"
+                component_kwargs["peak_min_capacity"] = 6
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_keeps_the_peak_floor(sut):
+                return assert_output_equals(sut.peak_scale_up.scalable_target_action.min_capacity, 6)
+
     def describe_scheduled_scaling():
         def describe_when_enabled():
             @pytest.fixture
@@ -656,3 +771,18 @@ def describe_container_validation():
                 }
                 with pytest.raises(ValueError, match=re.escape("pre_scale_time, post_scale_time, and peak_min_capacity must be provided when scheduled_scaling is enabled")):
                     ContainerComponent("test", None, **kwargs)
+
+    def describe_autoscale_mode_validation():
+        def it_rejects_an_unknown_mode():
+            with pytest.raises(ValueError, match="autoscale_mode must be 'step' or 'target_tracking'"):
+                ContainerComponent("test", None, autoscale=True, autoscale_mode="predictive")
+
+        def it_requires_a_target_to_track():
+            with pytest.raises(ValueError, match="autoscale_request_count_per_target or autoscale_cpu_utilization"):
+                ContainerComponent("test", None, autoscale=True, autoscale_mode="target_tracking",
+                                   autoscale_cpu_utilization=None)
+
+        def it_requires_a_load_balancer_to_track_requests():
+            with pytest.raises(ValueError, match="autoscale_request_count_per_target requires a load balancer"):
+                ContainerComponent("test", None, autoscale=True, autoscale_mode="target_tracking",
+                                   autoscale_request_count_per_target=500, need_load_balancer=False)
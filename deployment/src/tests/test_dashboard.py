@@ -1,3 +1,4 @@
+import json
 import os
 
 import pulumi.runtime
@@ -6,6 +7,7 @@ import pulumi_aws as aws
 
 from strongmind_deployment.container import ContainerComponent
 from tests.mocks import get_pulumi_mocks
+from tests.shared import assert_output_equals, assert_outputs_equal
 
 
 def describe_a_dashboard_component():
@@ -119,4 +121,120 @@ def describe_a_dashboard_component():
 
         @pulumi.runtime.test
         def it_has_a_custom_namespace(sut, namespace):
-            assert sut.namespace == namespace
\ No newline at end of file
+            assert sut.namespace == namespace
+    def describe_the_dashboard_body():
+        @pytest.fixture
+        def widget_inputs():
+            return {}
+
+        @pytest.fixture
+        def widget_providers():
+            from strongmind_deployment.dashboard import DEFAULT_WIDGET_PROVIDERS
+            return DEFAULT_WIDGET_PROVIDERS
+
+        @pytest.fixture
+        def sut(name, web_container, ecs_cluster, rds_serverless_cluster_instance, widget_inputs, widget_providers,
+                pulumi_set_mocks):
+            from strongmind_deployment.dashboard import DashboardComponent
+            return DashboardComponent(name,
+                                      web_container=web_container,
+                                      ecs_cluster=ecs_cluster,
+                                      rds_serverless_cluster_instance=rds_serverless_cluster_instance,
+                                      autoscale=True,
+                                      log_metric_filters=[{"metric_transformation": {"namespace": "app",
+                                                                                     "name": "errors"}}],
+                                      widget_inputs=widget_inputs,
+                                      widget_providers=widget_providers)
+
+        @pytest.fixture
+        def widgets(sut):
+            return sut.dashboard_body.apply(lambda body: json.loads(body)["widgets"])
+
+        @pulumi.runtime.test
+        def it_uses_the_body_for_the_dashboard(sut):
+            return assert_outputs_equal(sut.dashboard_body, sut.dashboard.dashboard_body)
+
+        @pulumi.runtime.test
+        def it_lays_the_widgets_out_without_overlapping(widgets):
+            def check(widgets):
+                cells = [(x, y)
+                         for widget in widgets
+                         for x in range(widget["x"], widget["x"] + widget["width"])
+                         for y in range(widget["y"], widget["y"] + widget["height"])]
+                assert len(cells) == len(set(cells))
+                assert len(widgets) == 12
+
+            return widgets.apply(check)
+
+        @pulumi.runtime.test
+        def it_puts_resolved_dimensions_in_the_metrics(sut, widgets):
+            def check(args):
+                widgets, cluster_name, service_name, identifier = args
+                metrics = [widget["properties"]["metrics"][0] for widget in widgets]
+                assert ["AWS/ECS", "CPUUtilization", "ClusterName", cluster_name, "ServiceName", service_name] \
+                       in metrics
+                assert ["AWS/RDS", "ACUUtilization", "DBInstanceIdentifier", identifier] in metrics
+                assert not any(isinstance(value, pulumi.Output) for metric in metrics for value in metric)
+
+            return pulumi.Output.all(widgets, sut.ecs_cluster.name, sut.web_container.fargate_service.name,
+                                     sut.rds_serverless_cluster_instance.identifier).apply(check)
+
+        def describe_with_a_custom_widget_provider():
+            @pytest.fixture
+            def widget_inputs():
+                return {"queue_name": pulumi.Output.from_input("sidekiq")}
+
+            @pytest.fixture
+            def widget_providers():
+                from strongmind_deployment.dashboard import metric_widget
+
+                def queue_widgets(context):
+                    return [metric_widget("Queue depth", [["Sidekiq", "Enqueued", "Queue", context["queue_name"]]],
+                                          context, stat="Maximum", width=24)]
+
+                return [queue_widgets]
+
+            @pulumi.runtime.test
+            def it_renders_the_provided_widgets(widgets):
+                return assert_output_equals(widgets, [{
+                    "type": "metric",
+                    "x": 0,
+                    "y": 0,
+                    "width": 24,
+                    "height": 6,
+                    "properties": {
+                        "metrics": [["Sidekiq", "Enqueued", "Queue", "sidekiq"]],
+                        "period": 300,
+                        "stat": "Maximum",
+                        "region": "us-west-2",
+                        "title": "Queue depth",
+                    }
+                }])
+
+
+def describe_rds_proxy_widgets():
+    def it_graphs_connections_borrow_latency_and_pinning_for_the_proxy():
+        from strongmind_deployment.dashboard import rds_proxy_widgets
+        widgets = rds_proxy_widgets({"db_proxy_name": "app-prod-rds-proxy", "region": "us-west-2"})
+
+        metrics = [metric for widget in widgets for metric in widget["properties"]["metrics"]]
+        assert [metric[1] for metric in metrics] == ["ClientConnections", "DatabaseConnections",
+                                                     "DatabaseConnectionsBorrowLatency",
+                                                     "DatabaseConnectionsCurrentlySessionPinned"]
+        assert all(metric[2:] == ["ProxyName", "app-prod-rds-proxy"] for metric in metrics)
+
+
+def describe_laying_out_widgets():
+    def it_fills_rows_left_to_right():
+        from strongmind_deployment.dashboard import layout_widgets
+        placed = layout_widgets([{"width": 12, "height": 6}] * 3)
+        assert [(widget["x"], widget["y"]) for widget in placed] == [(0, 0), (12, 0), (0, 6)]
+
+    def it_starts_the_next_row_below_the_tallest_widget():
+        from strongmind_deployment.dashboard import layout_widgets
+        placed = layout_widgets([{"width": 8, "height": 3}, {"width": 8, "height": 9}, {"width": 16, "height": 6}])
+        assert [(widget["x"], widget["y"]) for widget in placed] == [(0, 0), (8, 0), (0, 9)]
+
+    def it_clamps_widgets_wider_than_the_grid():
+        from strongmind_deployment.dashboard import layout_widgets
+        assert layout_widgets([{"width": 30, "height": 6}]) == [{"x": 0, "y": 0, "width": 24, "height": 6}]
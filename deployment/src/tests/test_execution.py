@@ -1,23 +1,35 @@
+from datetime import datetime, timezone
+
 import pulumi
 import pytest
 import boto3
+from botocore.exceptions import ClientError
 from botocore.stub import Stubber
 
-from strongmind_deployment.execution import ExecutionResourceProvider, ExecutionResourceInputs
+from strongmind_deployment.execution import ExecutionResourceProvider, ExecutionResourceInputs, \
+    TaskCompletionWaiter, LogTailer, phase_durations, execution_fingerprint, fingerprint_files, \
+    order_task_graph
+from pulumi.runtime.rpc import UNKNOWN
 
 
 def describe_an_execution_resource_provider():
     # region fixtures
     @pytest.fixture
-    def inputs(stubbed_ecs_client):
+    def inputs(stubbed_ecs_client, logs_client, tmp_path):
         return ExecutionResourceInputs(
             cluster="test_ecs_cluster",
             family="family",
             subnets=["subnets"],
             security_groups=["security_groups"],
-            ecs_client=stubbed_ecs_client
+            ecs_client=stubbed_ecs_client,
+            logs_client=logs_client,
+            log_directory=str(tmp_path),
         )
 
+    @pytest.fixture
+    def logs_client():
+        return FakeLogsClient([[{"message": "Migrating"}, {"message": "Migrations complete"}]])
+
     @pytest.fixture
     def sut(stubbed_ecs_client):
         from strongmind_deployment.execution import ExecutionResourceProvider
@@ -57,6 +69,9 @@ def describe_an_execution_resource_provider():
         stubber.add_response('describe_tasks', {"tasks":
             [{
                 "lastStatus": "STOPPED",
+                "createdAt": datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+                "startedAt": datetime(2024, 1, 1, 12, 0, 30, tzinfo=timezone.utc),
+                "stoppedAt": datetime(2024, 1, 1, 12, 2, 30, tzinfo=timezone.utc),
                 "containers": [{
                     "exitCode": container_exit_code,
                 }]
@@ -75,6 +90,34 @@ def describe_an_execution_resource_provider():
         # so that we always run the execution
         assert sut.diff("id", {}, {}).changes
 
+    def describe_when_skipping_unchanged_executions():
+        @pytest.fixture
+        def news():
+            return {"skip_unchanged": True, "image": "app@sha256:abc", "command": ["rails", "db:migrate"],
+                    "migration_fingerprint": "20240101000000"}
+
+        @pytest.fixture
+        def olds(news):
+            return {"output": True, "fingerprint": execution_fingerprint(news)}
+
+        def it_does_not_change_when_the_fingerprint_matches(sut, olds, news):
+            assert not sut.diff("id", olds, news).changes
+
+        def it_changes_when_the_image_changes(sut, olds, news):
+            assert sut.diff("id", olds, {**news, "image": "app@sha256:def"}).changes
+
+        def it_changes_when_the_migration_fingerprint_changes(sut, olds, news):
+            assert sut.diff("id", olds, {**news, "migration_fingerprint": "20240202000000"}).changes
+
+        def it_changes_when_the_last_run_has_no_fingerprint(sut, news):
+            assert sut.diff("id", {"output": True}, news).changes
+
+        def it_changes_while_the_image_is_unknown(sut, olds, news):
+            assert sut.diff("id", olds, {**news, "image": UNKNOWN}).changes
+
+        def it_changes_when_forced(sut, olds, news):
+            assert sut.diff("id", olds, {**news, "force_run": True}).changes
+
     def describe_when_creating():
         @pytest.fixture
         def result(sut: ExecutionResourceProvider, stubbed_ecs_client, inputs):
@@ -86,6 +129,27 @@ def describe_an_execution_resource_provider():
         def it_returns_a_pulumi_create_result(result):
             assert isinstance(result, pulumi.dynamic.CreateResult)
 
+        def it_outputs_the_task_arn(result):
+            assert result.outs["task_arn"] == "arn"
+
+        def it_outputs_the_phase_timestamps(result):
+            assert result.outs["phases"]["PROVISIONING"] == "2024-01-01T12:00:00+00:00"
+            assert result.outs["phases"]["RUNNING"] == "2024-01-01T12:00:30+00:00"
+            assert result.outs["phases"]["STOPPED"] == "2024-01-01T12:02:30+00:00"
+
+        def it_outputs_the_phase_durations(result):
+            assert result.outs["durations"] == {"startup": 30.0, "running": 120.0, "total": 150.0}
+
+        def it_writes_the_task_log_to_a_file(result, tmp_path):
+            assert result.outs["log_file"] == str(tmp_path / "family-arn.log")
+            assert (tmp_path / "family-arn.log").read_text() == "Migrating\nMigrations complete\n"
+
+        def it_outputs_the_fingerprint(result, inputs):
+            assert result.outs["fingerprint"] == execution_fingerprint(vars(inputs))
+
+        def it_streams_the_task_log(capsys, result):
+            assert "Migrations complete" in capsys.readouterr().out
+
         def describe_when_the_task_fails():
             @pytest.fixture
             def container_exit_code():
@@ -115,3 +179,320 @@ def describe_an_execution_resource_provider():
             def it_raises_an_exception(sut):
                 with pytest.raises(Exception):
                     sut.update("id", {}, {})
+
+
+class FakeLogsClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get_log_events(self, **request):
+        self.requests.append(request)
+        position = int(request.get('nextToken', 'f/0').split('/')[1])
+        if position >= len(self.pages):
+            return {"events": [], "nextForwardToken": request.get('nextToken', 'f/0')}
+        return {"events": self.pages[position], "nextForwardToken": f"f/{position + 1}"}
+
+
+class FakeGraphEcsClient:
+    def __init__(self, polls_until_stopped, exit_codes):
+        self.polls_until_stopped = polls_until_stopped
+        self.exit_codes = exit_codes
+        self.events = []
+        self.polls = {}
+
+    def run_task(self, **request):
+        name = request['overrides']['containerOverrides'][0]['command'][-1]
+        self.events.append(f"start {name}")
+        self.polls[name] = 0
+        return {"tasks": [{"taskArn": f"arn:aws:ecs:us-west-2:123:task/cluster/{name}"}]}
+
+    def describe_tasks(self, cluster, tasks):
+        described = []
+        for task_arn in tasks:
+            name = task_arn.split('/')[-1]
+            self.polls[name] += 1
+            stopped = self.polls[name] >= self.polls_until_stopped[name]
+            if stopped and f"stop {name}" not in self.events:
+                self.events.append(f"stop {name}")
+            described.append({"taskArn": task_arn, "lastStatus": "STOPPED" if stopped else "RUNNING",
+                              "containers": [{"name": "family", "exitCode": self.exit_codes.get(name, 0)}]})
+        return {"tasks": described}
+
+
+class FakeEcsClient:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.describe_calls = []
+        self.stopped_tasks = []
+
+    def describe_tasks(self, cluster, tasks):
+        self.describe_calls.append(list(tasks))
+        described = []
+        for task in tasks:
+            status = self.statuses[task].pop(0) if len(self.statuses[task]) > 1 else self.statuses[task][0]
+            if isinstance(status, Exception):
+                raise status
+            described.append({"taskArn": task, "lastStatus": status})
+        return {"tasks": described}
+
+    def stop_task(self, cluster, task, reason):
+        self.stopped_tasks.append(task)
+
+
+def describe_a_task_completion_waiter():
+    @pytest.fixture
+    def now():
+        return [0.0]
+
+    @pytest.fixture
+    def sleeps(now):
+        return []
+
+    @pytest.fixture
+    def sleep(now, sleeps):
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        return fake_sleep
+
+    @pytest.fixture
+    def statuses():
+        return {
+            "task-1": ["PROVISIONING", "PENDING", "RUNNING", "RUNNING", "STOPPED"],
+            "task-2": ["RUNNING", "STOPPED"],
+        }
+
+    @pytest.fixture
+    def ecs_client(statuses):
+        return FakeEcsClient(statuses)
+
+    @pytest.fixture
+    def timeout():
+        return 3600
+
+    @pytest.fixture
+    def waiter(ecs_client, sleep, now, timeout):
+        return TaskCompletionWaiter(ecs_client, "cluster", timeout=timeout, initial_poll_interval=1,
+                                    max_poll_interval=4, sleep=sleep, clock=lambda: now[0])
+
+    def it_returns_every_stopped_task(waiter):
+        tasks = waiter.wait(["task-1", "task-2"])
+        assert set(tasks) == {"task-1", "task-2"}
+        assert all(task["lastStatus"] == "STOPPED" for task in tasks.values())
+
+    def it_describes_outstanding_tasks_together(waiter, ecs_client):
+        waiter.wait(["task-1", "task-2"])
+        assert ecs_client.describe_calls[0] == ["task-1", "task-2"]
+        assert ecs_client.describe_calls[-1] == ["task-1"]
+
+    def it_backs_off_with_jitter_up_to_the_maximum(waiter, sleeps):
+        waiter.wait(["task-1"])
+        assert 0.5 <= sleeps[0] <= 1
+        assert all(sleep <= 4 for sleep in sleeps)
+
+    def it_records_the_phases_each_task_went_through(waiter):
+        waiter.wait(["task-1"])
+        assert list(waiter.phases["task-1"]) == ["PROVISIONING", "PENDING", "RUNNING", "STOPPED"]
+
+    def describe_when_throttled():
+        @pytest.fixture
+        def statuses():
+            throttled = ClientError({"Error": {"Code": "ThrottlingException"}}, "DescribeTasks")
+            return {"task-1": [throttled, "STOPPED"]}
+
+        def it_retries(waiter, ecs_client):
+            assert waiter.wait(["task-1"])["task-1"]["lastStatus"] == "STOPPED"
+            assert len(ecs_client.describe_calls) == 2
+
+    def describe_when_a_task_never_stops():
+        @pytest.fixture
+        def statuses():
+            return {"task-1": ["RUNNING"]}
+
+        @pytest.fixture
+        def timeout():
+            return 30
+
+        def it_stops_the_task_and_fails_at_the_deadline(waiter, ecs_client, now):
+            with pytest.raises(Exception, match="did not stop within 30 seconds"):
+                waiter.wait(["task-1"])
+            assert ecs_client.stopped_tasks == ["task-1"]
+            assert now[0] == 30
+
+
+def describe_phase_durations():
+    def it_only_includes_durations_for_phases_that_were_seen():
+        assert phase_durations({"RUNNING": "2024-01-01T12:00:00+00:00",
+                                "STOPPED": "2024-01-01T12:01:00+00:00"}) == {"running": 60.0, "total": 60.0}
+
+
+def describe_a_log_tailer():
+    @pytest.fixture
+    def pages():
+        return [[{"message": f"line {page}-{line}"} for line in range(3)] for page in range(4)]
+
+    @pytest.fixture
+    def logs_client(pages):
+        return FakeLogsClient(pages)
+
+    @pytest.fixture
+    def echoed():
+        return []
+
+    @pytest.fixture
+    def log_file(tmp_path):
+        return str(tmp_path / "logs" / "task.log")
+
+    @pytest.fixture
+    def tailer(logs_client, log_file, echoed):
+        return LogTailer(logs_client, "group", "stream", log_file=log_file, buffer_lines=5, echo=echoed.append)
+
+    def it_reads_every_page(tailer, echoed):
+        assert tailer.poll() == 12
+        assert echoed[0] == "line 0-0"
+        assert echoed[-1] == "line 3-2"
+
+    def it_only_reads_new_events_on_the_next_poll(tailer, pages, logs_client):
+        tailer.poll()
+        pages.append([{"message": "late line"}])
+
+        assert tailer.poll() == 1
+        assert logs_client.requests[-1]["nextToken"] == "f/5"
+
+    def it_keeps_a_bounded_buffer(tailer):
+        tailer.poll()
+        assert list(tailer.lines) == ["line 2-1", "line 2-2", "line 3-0", "line 3-1", "line 3-2"]
+
+    def it_writes_the_full_log_to_the_file(tailer, log_file):
+        tailer.poll()
+        tailer.close()
+        with open(log_file) as file:
+            assert len(file.read().splitlines()) == 12
+
+    def describe_before_the_stream_exists():
+        @pytest.fixture
+        def logs_client():
+            client = FakeLogsClient([])
+
+            def missing_stream(**request):
+                raise ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "GetLogEvents")
+
+            client.get_log_events = missing_stream
+            return client
+
+        def it_reads_nothing(tailer):
+            assert tailer.poll() == 0
+
+
+def describe_fingerprint_files():
+    @pytest.fixture
+    def migrations(tmp_path):
+        (tmp_path / "001_create_users.rb").write_text("create_table :users")
+        (tmp_path / "002_add_email.rb").write_text("add_column :users, :email")
+        return tmp_path
+
+    def it_is_stable(migrations):
+        assert fingerprint_files(f"{migrations}/*.rb") == fingerprint_files(f"{migrations}/*.rb")
+
+    def it_changes_when_a_migration_is_added(migrations):
+        before = fingerprint_files(f"{migrations}/*.rb")
+        (migrations / "003_add_name.rb").write_text("add_column :users, :name")
+        assert fingerprint_files(f"{migrations}/*.rb") != before
+
+    def it_changes_when_a_migration_is_edited(migrations):
+        before = fingerprint_files(f"{migrations}/*.rb")
+        (migrations / "002_add_email.rb").write_text("add_column :users, :email, null: false")
+        assert fingerprint_files(f"{migrations}/*.rb") != before
+
+
+def describe_running_a_task_graph():
+    @pytest.fixture
+    def tasks():
+        return [
+            {"name": "migrate", "command": ["rails", "migrate"]},
+            {"name": "seed", "command": ["rails", "seed"], "depends_on": ["migrate"]},
+            {"name": "assets", "command": ["rails", "assets"]},
+        ]
+
+    @pytest.fixture
+    def exit_codes():
+        return {}
+
+    @pytest.fixture
+    def ecs_client(exit_codes):
+        return FakeGraphEcsClient({"migrate": 3, "seed": 1, "assets": 2}, exit_codes)
+
+    @pytest.fixture
+    def inputs(ecs_client, tasks, tmp_path):
+        return ExecutionResourceInputs(
+            cluster="cluster",
+            family="family",
+            subnets=["subnets"],
+            security_groups=["security_groups"],
+            ecs_client=ecs_client,
+            logs_client=FakeLogsClient([]),
+            log_directory=str(tmp_path),
+            initial_poll_interval=0.001,
+            max_poll_interval=0.001,
+            tasks=tasks,
+        )
+
+    @pytest.fixture
+    def result(inputs):
+        return ExecutionResourceProvider().create({**vars(inputs)})
+
+    def it_starts_independent_tasks_together(result, ecs_client):
+        assert ecs_client.events[:2] == ["start migrate", "start assets"]
+
+    def it_starts_dependants_when_their_dependencies_finish(result, ecs_client):
+        assert ecs_client.events.index("start seed") == ecs_client.events.index("stop migrate") + 1
+
+    def it_outputs_each_task_result(result):
+        assert set(result.outs["task_results"]) == {"migrate", "seed", "assets"}
+        assert result.outs["task_results"]["seed"]["task_arn"].endswith("/seed")
+        assert result.outs["task_results"]["seed"]["exit_code"] == 0
+
+    def it_names_each_log_file_after_its_task(result, tmp_path):
+        assert result.outs["task_results"]["assets"]["log_file"] == str(tmp_path / "family-assets-assets.log")
+
+    def describe_when_a_task_fails():
+        @pytest.fixture
+        def exit_codes():
+            return {"migrate": 1}
+
+        def it_raises_an_exception_naming_the_task(inputs):
+            with pytest.raises(Exception, match="migrate task migrate exited with code 1"):
+                ExecutionResourceProvider().create({**vars(inputs)})
+
+        def it_does_not_start_dependants(inputs, ecs_client):
+            with pytest.raises(Exception):
+                ExecutionResourceProvider().create({**vars(inputs)})
+            assert "start seed" not in ecs_client.events
+
+        def it_waits_for_running_tasks(inputs, ecs_client):
+            with pytest.raises(Exception):
+                ExecutionResourceProvider().create({**vars(inputs)})
+            assert "stop assets" in ecs_client.events
+
+
+def describe_ordering_a_task_graph():
+    def it_orders_tasks_after_their_dependencies():
+        assert order_task_graph([
+            {"name": "seed", "depends_on": ["migrate"]},
+            {"name": "migrate"},
+            {"name": "reindex", "depends_on": ["seed", "migrate"]},
+        ]) == ["migrate", "seed", "reindex"]
+
+    def it_rejects_unknown_dependencies():
+        with pytest.raises(ValueError, match="unknown tasks: migrate"):
+            order_task_graph([{"name": "seed", "depends_on": ["migrate"]}])
+
+    def it_rejects_cycles():
+        with pytest.raises(ValueError, match="cycle"):
+            order_task_graph([{"name": "a", "depends_on": ["b"]}, {"name": "b", "depends_on": ["a"]}])
+
+    def it_rejects_duplicate_names():
+        with pytest.raises(ValueError, match="duplicates: a"):
+            order_task_graph([{"name": "a"}, {"name": "a"}])
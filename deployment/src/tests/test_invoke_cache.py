@@ -0,0 +1,128 @@
+import json
+import os
+
+import pulumi
+import pulumi_aws as aws
+import pytest
+
+from strongmind_deployment import invoke_cache
+from tests.mocks import get_pulumi_mocks
+
+
+def describe_an_invoke_cache():
+    @pytest.fixture
+    def app_name(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def stack(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def invoked_tokens():
+        return []
+
+    @pytest.fixture
+    def pulumi_mocks(faker, invoked_tokens):
+        mocks = get_pulumi_mocks(faker)
+        call = mocks.call
+
+        def counting_call(args):
+            invoked_tokens.append(args.token)
+            return call(args)
+
+        mocks.call = counting_call
+        return mocks
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(monkeypatch):
+        monkeypatch.delenv(invoke_cache.CACHE_DIR_ENV_VAR, raising=False)
+        monkeypatch.delenv(invoke_cache.CACHE_TTL_ENV_VAR, raising=False)
+        invoke_cache.clear_cache()
+        yield
+        invoke_cache.clear_cache()
+
+    def it_invokes_a_data_source_once_per_arguments(pulumi_set_mocks, invoked_tokens):
+        first = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+        second = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+        assert first is second
+        assert invoked_tokens == ["aws:ec2/getVpc:getVpc"]
+
+    def it_invokes_again_for_different_arguments(pulumi_set_mocks, invoked_tokens):
+        invoke_cache.invoke(aws.cloudfront.get_cache_policy, name="Managed-CachingOptimized")
+        invoke_cache.invoke(aws.cloudfront.get_cache_policy, name="UseOriginCacheControlHeaders-QueryStrings")
+        assert len(invoked_tokens) == 2
+
+    def it_keys_on_input_type_arguments(pulumi_set_mocks, invoked_tokens):
+        for _ in range(3):
+            invoke_cache.invoke(aws.ec2.get_subnets, filters=[
+                aws.ec2.GetSubnetsFilterArgs(name="vpc-id", values=["vpc-12345"])
+            ])
+        assert invoked_tokens == ["aws:ec2/getSubnets:getSubnets"]
+
+    def it_does_not_memoize_calls_with_outputs(pulumi_set_mocks, invoked_tokens):
+        invoke_cache.invoke(aws.ec2.get_security_group, name="default", vpc_id=pulumi.Output.from_input("vpc-1"))
+        invoke_cache.invoke(aws.ec2.get_security_group, name="default", vpc_id=pulumi.Output.from_input("vpc-1"))
+        assert len(invoked_tokens) == 2
+
+    def describe_with_a_disk_cache():
+        @pytest.fixture
+        def cache_dir(tmp_path, monkeypatch):
+            monkeypatch.setenv(invoke_cache.CACHE_DIR_ENV_VAR, str(tmp_path))
+            return tmp_path
+
+        def it_writes_results_under_the_account_and_region(pulumi_set_mocks, cache_dir):
+            invoke_cache.invoke(aws.get_region)
+            account_id = invoke_cache.invoke(aws.get_caller_identity).account_id
+            assert os.listdir(cache_dir) == [f"{account_id}-us-east-1"]
+
+        def it_reuses_results_from_a_previous_program(pulumi_set_mocks, cache_dir, invoked_tokens):
+            invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+            invoke_cache.clear_cache()
+            invoked_tokens.clear()
+
+            result = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+
+            assert result.id == "vpc-12345"
+            assert invoked_tokens == ["aws:index/getCallerIdentity:getCallerIdentity"]
+
+        def it_writes_json(pulumi_set_mocks, cache_dir):
+            invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+            account_dir = cache_dir / os.listdir(cache_dir)[0]
+            [cache_file] = [f for f in account_dir.iterdir() if f.name.startswith("aws.ec2.get_vpc-")]
+
+            assert cache_file.suffix == ".json"
+            assert json.loads(cache_file.read_text())["fields"]["id"] == "vpc-12345"
+
+        def it_rebuilds_the_result_type(pulumi_set_mocks, cache_dir):
+            first = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+            invoke_cache.clear_cache()
+
+            assert type(invoke_cache.invoke(aws.ec2.get_vpc, default=True)) is type(first)
+
+        def it_only_loads_pulumi_aws_types(pulumi_set_mocks, cache_dir, invoked_tokens):
+            invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+            account_dir = cache_dir / os.listdir(cache_dir)[0]
+            [cache_file] = [f for f in account_dir.iterdir() if f.name.startswith("aws.ec2.get_vpc-")]
+            cache_file.write_text(json.dumps({"__type__": "os:system", "fields": {"command": "true"}}))
+            invoke_cache.clear_cache()
+            invoked_tokens.clear()
+
+            result = invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+
+            assert result.id == "vpc-12345"
+            assert "aws:ec2/getVpc:getVpc" in invoked_tokens
+
+        def it_ignores_expired_results(pulumi_set_mocks, cache_dir, invoked_tokens, monkeypatch):
+            monkeypatch.setenv(invoke_cache.CACHE_TTL_ENV_VAR, "-1")
+            invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+            invoke_cache.clear_cache()
+            invoked_tokens.clear()
+
+            invoke_cache.invoke(aws.ec2.get_vpc, default=True)
+
+            assert "aws:ec2/getVpc:getVpc" in invoked_tokens
+
+        def it_does_not_persist_secret_values(pulumi_set_mocks, cache_dir):
+            invoke_cache.invoke(aws.secretsmanager.get_secret_version, secret_id="my-secret")
+            assert os.listdir(cache_dir) == []
@@ -71,6 +71,23 @@ def describe_lambda_args():
     def it_has_layers(sut, layers):
         assert sut.layers == layers
 
+    @pulumi.runtime.test
+    def it_uses_the_default_architecture(sut):
+        assert sut.architectures is None
+
+    def describe_with_a_cpu_architecture():
+        @pytest.fixture
+        def sut(handler, layers):
+            return LambdaArgs(handler=handler, layers=layers, cpu_architecture="arm64")
+
+        def it_uses_the_lambda_spelling(sut):
+            assert sut.cpu_architecture == "ARM64"
+            assert sut.architectures == ["arm64"]
+
+        def it_rejects_unknown_architectures(handler):
+            with pytest.raises(ValueError, match="Unsupported cpu_architecture: sparc"):
+                LambdaArgs(handler=handler, cpu_architecture="sparc")
+
 
 def describe_lambda_environment():
     @pytest.fixture
@@ -294,3 +311,43 @@ def describe_a_lambda_component():
         @pulumi.runtime.test
         def it_has_tags(sut):
             return assert_output_equals(sut.lambda_function.tags, sut.tags)
+
+        @pulumi.runtime.test
+        def it_uses_the_default_architecture(sut):
+            return assert_output_equals(sut.lambda_function.architectures, None)
+
+    def describe_with_a_cpu_architecture():
+        @pytest.fixture
+        def layers():
+            return ["arn:aws:lambda:us-west-2:123456789012:layer:shared-arm64:3",
+                    "arn:aws:lambda:us-west-2:123456789012:layer:shared:1"]
+
+        @pytest.fixture
+        def lambda_args(faker, layers):
+            return LambdaArgs(handler=faker.word(), layers=layers, cpu_architecture="ARM64")
+
+        @pulumi.runtime.test
+        def it_runs_the_function_on_the_architecture(sut):
+            return assert_output_equals(sut.lambda_function.architectures, ["arm64"])
+
+        @pulumi.runtime.test
+        def it_builds_the_layer_for_the_architecture(sut):
+            return assert_output_equals(sut.lambda_layer.compatible_architectures, ["arm64"])
+
+        def describe_with_an_incompatible_layer():
+            @pytest.fixture
+            def layers():
+                return ["arn:aws:lambda:us-west-2:123456789012:layer:shared-x86_64:2"]
+
+            def it_raises_an_error(name, lambda_args, lambda_env_variables, pulumi_set_mocks):
+                with pytest.raises(ValueError, match="supports x86_64, not arm64"):
+                    LambdaComponent(name, lambda_args, lambda_env_variables)
+
+        def describe_with_an_unversioned_layer():
+            @pytest.fixture
+            def layers():
+                return ["arn:aws:lambda:us-west-2:123456789012:layer:shared"]
+
+            def it_raises_an_error(name, lambda_args, lambda_env_variables, pulumi_set_mocks):
+                with pytest.raises(ValueError, match="must be a layer version ARN"):
+                    LambdaComponent(name, lambda_args, lambda_env_variables)
@@ -0,0 +1,132 @@
+import importlib
+import json
+import subprocess
+
+import boto3
+import pulumi
+import pulumi_aws as aws
+import pytest
+
+import strongmind_deployment
+from strongmind_deployment import profiler
+from strongmind_deployment.secrets import SecretsComponent
+from tests.mocks import get_pulumi_mocks
+
+
+class ProbeComponent(pulumi.ComponentResource):
+    def __init__(self, name, opts=None):
+        super().__init__('strongmind:test:probe', name, None, opts)
+        aws.get_region()
+        boto3.client('ecs', region_name='us-west-2').list_clusters()
+        subprocess.check_output(['true'])
+        self.secrets = SecretsComponent("nested", opts=pulumi.ResourceOptions(parent=self))
+        self.bucket = aws.s3.Bucket(f"{name}-bucket", opts=pulumi.ResourceOptions(parent=self))
+        self.bucket.id.apply(lambda _: aws.s3.BucketPolicy(
+            f"{name}-policy", bucket="bucket", policy="{}", opts=pulumi.ResourceOptions(parent=self.bucket)))
+        self.register_outputs({})
+
+
+def describe_a_construction_profiler():
+    @pytest.fixture
+    def app_name(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def stack(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def pulumi_mocks(faker):
+        return get_pulumi_mocks(faker)
+
+    @pytest.fixture(autouse=True)
+    def enabled(tmp_path, monkeypatch):
+        monkeypatch.delenv(profiler.PROFILE_ENV_VAR, raising=False)
+        profiler.enable(str(tmp_path / "profile"))
+        profiler.wrap(ProbeComponent)
+        yield
+        profiler.disable()
+
+    @pytest.fixture
+    def probe_frame(pulumi_set_mocks):
+        @pulumi.runtime.test
+        def build():
+            return ProbeComponent("probe").bucket.id
+
+        build()
+        return profiler.report()["program"]["children"][-1]
+
+    def it_wraps_the_strongmind_components():
+        assert getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
+
+    def it_records_the_component(probe_frame):
+        assert probe_frame["type"] == "ProbeComponent"
+        assert probe_frame["name"] == "probe"
+        assert probe_frame["wall_time"] >= probe_frame["self_time"] > 0
+
+    def it_counts_child_resources(probe_frame):
+        assert probe_frame["resources"] == 1
+
+    def it_attributes_resources_created_after_construction(probe_frame):
+        assert probe_frame["deferred_resources"] == 1
+
+    def it_counts_invokes(probe_frame):
+        assert probe_frame["invokes"] == {"aws:index/getRegion:getRegion": 1}
+
+    def it_counts_boto3_calls(probe_frame):
+        assert probe_frame["boto3_clients"] == {"ecs": 1}
+        assert probe_frame["boto3_calls"] == {"ecs:ListClusters": 1}
+
+    def it_records_subprocesses(probe_frame):
+        assert probe_frame["subprocesses"] == ["true"]
+
+    def it_nests_components(probe_frame):
+        nested = probe_frame["children"][0]
+        assert nested["type"] == "SecretsComponent"
+        assert nested["resources"] == 2
+
+    def it_totals_by_type(probe_frame):
+        assert profiler.report()["by_type"]["SecretsComponent"]["count"] == 1
+
+    def it_writes_json_and_folded_stacks(probe_frame, tmp_path):
+        path = profiler.write_report()
+
+        with open(f"{path}.json") as file:
+            assert json.load(file)["program"]["children"][-1]["name"] == "probe"
+        with open(f"{path}.folded") as file:
+            assert "program;ProbeComponent(probe);SecretsComponent(nested) " in file.read()
+
+    def it_restores_everything_when_disabled():
+        profiler.disable()
+        assert not getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
+        assert not getattr(ProbeComponent.__init__, "_strongmind_profiled", False)
+
+    def describe_enabling_from_the_environment():
+        @pytest.fixture(autouse=True)
+        def disabled():
+            profiler.disable()
+
+        def it_stays_off_by_default():
+            profiler.enable_if_requested()
+            assert not getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
+
+        def it_uses_the_env_var_as_the_report_path(monkeypatch, tmp_path):
+            monkeypatch.setenv(profiler.PROFILE_ENV_VAR, str(tmp_path / "from-env"))
+            profiler.enable_if_requested()
+            assert profiler.write_report() == str(tmp_path / "from-env")
+            assert (tmp_path / "from-env.folded").exists()
+
+        def it_reads_the_namespaced_pulumi_config(monkeypatch):
+            monkeypatch.setenv("PULUMI_CONFIG_STRONGMIND_PROFILE", "true")
+            profiler.enable_if_requested()
+            assert getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
+
+        def it_ignores_the_unnamespaced_pulumi_config(monkeypatch):
+            monkeypatch.setenv(f"PULUMI_CONFIG_{pulumi.get_project().upper()}_PROFILE", "true")
+            profiler.enable_if_requested()
+            assert not getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
+
+        def it_is_not_enabled_by_importing_the_package(monkeypatch):
+            monkeypatch.setenv(profiler.PROFILE_ENV_VAR, "1")
+            importlib.reload(strongmind_deployment)
+            assert not getattr(SecretsComponent.__init__, "_strongmind_profiled", False)
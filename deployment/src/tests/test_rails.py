@@ -638,6 +638,188 @@ def describe_a_pulumi_rails_component():
                 # Verify the correct number of reader instances
                 assert len(sut.reader_instances) == reader_count
 
+        def it_does_not_autoscale_readers_by_default(sut):
+            assert sut.reader_autoscaling_target is None
+
+        def describe_with_reader_autoscaling():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['reader_autoscaling'] = True
+                component_kwargs['reader_max_count'] = 4
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_scales_the_replica_count_of_the_cluster(sut, app_name, stack):
+                def check(args):
+                    resource_id, dimension, namespace = args
+                    assert resource_id == f"cluster:{app_name}-{stack}"
+                    assert dimension == "rds:cluster:ReadReplicaCount"
+                    assert namespace == "rds"
+
+                target = sut.reader_autoscaling_target
+                return pulumi.Output.all(target.resource_id, target.scalable_dimension,
+                                         target.service_namespace).apply(check)
+
+            @pulumi.runtime.test
+            def it_keeps_between_one_and_the_maximum_readers(sut):
+                def check(args):
+                    assert args == [1, 4]
+
+                target = sut.reader_autoscaling_target
+                return pulumi.Output.all(target.min_capacity, target.max_capacity).apply(check)
+
+            @pulumi.runtime.test
+            def it_tracks_reader_cpu_by_default(sut):
+                def check(configuration):
+                    assert configuration["predefined_metric_specification"]["predefined_metric_type"] == \
+                        "RDSReaderAverageCPUUtilization"
+                    assert configuration["target_value"] == 60
+
+                return sut.reader_scaling_policy.target_tracking_scaling_policy_configuration.apply(check)
+
+            def describe_tracking_connections_with_fixed_readers():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['reader_instance_count'] = 2
+                    component_kwargs['reader_autoscaling_metric'] = 'connections'
+                    component_kwargs['reader_autoscaling_target'] = 300
+                    return component_kwargs
+
+                @pulumi.runtime.test
+                def it_tracks_reader_connections(sut):
+                    def check(configuration):
+                        assert configuration["predefined_metric_specification"]["predefined_metric_type"] == \
+                            "RDSReaderAverageDatabaseConnections"
+                        assert configuration["target_value"] == 300
+
+                    return sut.reader_scaling_policy.target_tracking_scaling_policy_configuration.apply(check)
+
+                @pulumi.runtime.test
+                def it_keeps_at_least_the_fixed_readers(sut):
+                    return assert_output_equals(sut.reader_autoscaling_target.min_capacity, 2)
+
+            def describe_with_an_unknown_metric():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['reader_autoscaling_metric'] = 'memory'
+                    return component_kwargs
+
+                def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                    import strongmind_deployment.rails
+                    with pytest.raises(ValueError, match="reader_autoscaling_metric must be one of cpu, connections"):
+                        strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
+            def describe_with_too_many_readers():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['reader_max_count'] = 16
+                    return component_kwargs
+
+                def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                    import strongmind_deployment.rails
+                    with pytest.raises(ValueError, match="reader_max_count must be between reader_min_count and 15"):
+                        strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
+    def describe_db_parameter_groups():
+        def it_keeps_the_default_parameter_groups(sut):
+            assert sut.cluster_parameter_group is None
+            assert sut.db_parameter_group is None
+
+        def describe_with_the_oltp_preset():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['db_parameter_preset'] = 'oltp'
+                component_kwargs['db_cluster_parameters'] = {"work_mem": 65536}
+                component_kwargs['db_instance_parameters'] = {"log_min_duration_statement": 2000}
+                component_kwargs['reader_instance_count'] = 1
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_uses_the_family_of_the_engine_version(sut):
+                return assert_output_equals(sut.cluster_parameter_group.family, "aurora-postgresql15")
+
+            @pulumi.runtime.test
+            def it_attaches_the_cluster_parameter_group(sut):
+                return assert_outputs_equal(sut.rds_serverless_cluster.db_cluster_parameter_group_name,
+                                            sut.cluster_parameter_group.name)
+
+            @pulumi.runtime.test
+            def it_attaches_the_db_parameter_group_to_every_instance(sut):
+                def check(args):
+                    group_name, *instance_group_names = args
+                    assert instance_group_names == [group_name, group_name]
+
+                return pulumi.Output.all(sut.db_parameter_group.name,
+                                         sut.rds_serverless_cluster_instance.db_parameter_group_name,
+                                         sut.reader_instances[0].db_parameter_group_name).apply(check)
+
+            @pulumi.runtime.test
+            def it_merges_the_overrides_over_the_preset(sut):
+                def check(parameters):
+                    values = {parameter["name"]: parameter["value"] for parameter in parameters}
+                    assert values["work_mem"] == "65536"
+                    assert values["random_page_cost"] == "1.1"
+                    assert values["shared_preload_libraries"] == "pg_stat_statements,auto_explain"
+
+                return sut.cluster_parameter_group.parameters.apply(check)
+
+            @pulumi.runtime.test
+            def it_applies_static_parameters_at_the_next_reboot(sut):
+                def check(parameters):
+                    apply_methods = {parameter["name"]: parameter["apply_method"] for parameter in parameters}
+                    assert apply_methods["shared_preload_libraries"] == "pending-reboot"
+                    assert apply_methods["work_mem"] == "immediate"
+
+                return sut.cluster_parameter_group.parameters.apply(check)
+
+            @pulumi.runtime.test
+            def it_sets_the_instance_parameters(sut):
+                def check(parameters):
+                    assert [(parameter["name"], parameter["value"]) for parameter in parameters] == \
+                           [("log_min_duration_statement", "2000")]
+
+                return sut.db_parameter_group.parameters.apply(check)
+
+        def describe_with_parameters_outside_the_presets():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['db_cluster_parameters'] = {
+                    "rds.logical_replication": 1,
+                    "max_locks_per_transaction": {"value": 256},
+                    "log_statement": {"value": "ddl", "apply_method": "immediate"},
+                }
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_applies_unknown_parameters_at_the_next_reboot(sut):
+                def check(parameters):
+                    apply_methods = {parameter["name"]: parameter["apply_method"] for parameter in parameters}
+                    assert apply_methods["rds.logical_replication"] == "pending-reboot"
+                    assert apply_methods["max_locks_per_transaction"] == "pending-reboot"
+
+                return sut.cluster_parameter_group.parameters.apply(check)
+
+            @pulumi.runtime.test
+            def it_takes_the_apply_method_given_with_the_value(sut):
+                def check(parameters):
+                    settings = {parameter["name"]: (parameter["value"], parameter["apply_method"])
+                                for parameter in parameters}
+                    assert settings["log_statement"] == ("ddl", "immediate")
+                    assert settings["max_locks_per_transaction"] == ("256", "pending-reboot")
+
+                return sut.cluster_parameter_group.parameters.apply(check)
+
+        def describe_with_an_unknown_preset():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['db_parameter_preset'] = 'analytics'
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                import strongmind_deployment.rails
+                with pytest.raises(ValueError, match="db_parameter_preset must be one of oltp, reporting"):
+                    strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
     def describe_when_given_a_kms_key_to_restore_from():
         @pytest.fixture
         def kms_key(faker):
@@ -779,6 +961,20 @@ def describe_a_pulumi_rails_component():
         def it_uses_standard_migration_command_for_execution(sut, execution_container_cmd):
             assert sut.migration_container.command == execution_container_cmd
 
+        def describe_with_blue_green_deployments():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['deployment_strategy'] = 'blue_green'
+                return component_kwargs
+
+            def it_deploys_the_web_container_blue_green(sut):
+                assert sut.web_container.deployment_strategy == "blue_green"
+                assert sut.web_container.blue_green_deployment is not None
+
+            def it_runs_the_migration_task_without_a_load_balancer(sut):
+                assert sut.migration_container.deployment_strategy == "rolling"
+                assert sut.migration_container.blue_green_deployment is None
+
         def describe_with_custom_execution_cmd():
             @pytest.fixture
             def execution_container_cmd():
@@ -793,6 +989,119 @@ def describe_a_pulumi_rails_component():
             def it_uses_custom_command_for_execution(sut, execution_container_cmd):
                 assert sut.migration_container.command == execution_container_cmd
 
+        @pulumi.runtime.test
+        def it_waits_an_hour_for_the_execution_by_default(sut):
+            return assert_output_equals(sut.execution.timeout, 3600)
+
+        def describe_with_an_execution_timeout():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['execution_timeout'] = 600
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_passes_the_timeout_to_the_execution(sut):
+                return assert_output_equals(sut.execution.timeout, 600)
+
+        @pulumi.runtime.test
+        def it_runs_the_execution_every_time_by_default(sut):
+            return assert_output_equals(sut.execution.skip_unchanged, False)
+
+        def describe_when_skipping_unchanged_executions():
+            @pytest.fixture
+            def container_image():
+                image = "123456789012.dkr.ecr.us-west-2.amazonaws.com/app:latest"
+                os.environ["CONTAINER_IMAGE"] = image
+                return image
+
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['skip_unchanged_execution'] = True
+                component_kwargs['migration_fingerprint'] = "20240101000000"
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_skips_unchanged_executions(sut):
+                return assert_output_equals(sut.execution.skip_unchanged, True)
+
+            @pulumi.runtime.test
+            def it_fingerprints_the_migrations(sut):
+                return assert_output_equals(sut.execution.migration_fingerprint, "20240101000000")
+
+            @pulumi.runtime.test
+            def it_fingerprints_the_execution_command(sut, execution_container_cmd):
+                return assert_output_equals(sut.execution.command, execution_container_cmd)
+
+            @pulumi.runtime.test
+            def it_fingerprints_the_image_digest_rather_than_its_tag(sut):
+                def check(image):
+                    assert image.startswith("123456789012.dkr.ecr.us-west-2.amazonaws.com/app@sha256:")
+
+                return sut.execution.image.apply(check)
+
+            def it_does_not_hash_the_repository_when_given_a_fingerprint(pulumi_set_mocks, component_kwargs,
+                                                                         monkeypatch):
+                import strongmind_deployment.rails
+
+                def fail():
+                    raise AssertionError("the default fingerprint was computed")
+
+                monkeypatch.setattr(strongmind_deployment.rails, "default_migration_fingerprint", fail)
+                strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
+            def describe_with_an_image_by_digest():
+                @pytest.fixture
+                def container_image():
+                    image = "ghcr.io/strongmind/app@sha256:abc123"
+                    os.environ["CONTAINER_IMAGE"] = image
+                    return image
+
+                @pulumi.runtime.test
+                def it_fingerprints_the_image_as_given(sut, container_image):
+                    return assert_output_equals(sut.execution.image, container_image)
+
+            def describe_with_a_tagged_image_outside_ecr():
+                @pytest.fixture
+                def container_image():
+                    image = "ghcr.io/strongmind/app:latest"
+                    os.environ["CONTAINER_IMAGE"] = image
+                    return image
+
+                def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                    import strongmind_deployment.rails
+                    with pytest.raises(ValueError, match="needs an ECR image or an image referenced by digest"):
+                        strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
+        def describe_with_execution_tasks():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['execution_tasks'] = {
+                    "migrate": {"command": ["sh", "-c", "bundle exec rails db:migrate"]},
+                    "seed": {"command": ["sh", "-c", "bundle exec rails db:seed"], "depends_on": ["migrate"]},
+                }
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_runs_the_tasks_in_the_execution(sut):
+                return assert_output_equals(sut.execution.tasks, [
+                    {"name": "migrate", "command": ["sh", "-c", "bundle exec rails db:migrate"], "depends_on": []},
+                    {"name": "seed", "command": ["sh", "-c", "bundle exec rails db:seed"], "depends_on": ["migrate"]},
+                ])
+
+            def describe_with_a_dependency_cycle():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['execution_tasks'] = {
+                        "migrate": {"command": ["migrate"], "depends_on": ["seed"]},
+                        "seed": {"command": ["seed"], "depends_on": ["migrate"]},
+                    }
+                    return component_kwargs
+
+                def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                    import strongmind_deployment.rails
+                    with pytest.raises(ValueError, match="cycle"):
+                        strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
     @pulumi.runtime.test
     def it_allows_container_to_talk_to_rds(sut, ecs_security_groups):
         assert sut.firewall_rule
@@ -940,6 +1249,27 @@ def describe_a_pulumi_rails_component():
         def it_sends_the_url_to_the_ecs_environment(sut):
             return assert_outputs_equal(sut.env_vars["REDIS_SERVER"], sut.cache_redis.url)
 
+        @pulumi.runtime.test
+        def it_sends_the_reader_url_to_the_ecs_environment(sut):
+            return assert_outputs_equal(sut.env_vars["CACHE_REDIS_READER_URL"], sut.cache_redis.reader_url)
+
+    def describe_with_cache_redis_settings():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs['cache_redis'] = {"replicas": 2}
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_creates_a_cache_redis_replication_group(sut, app_name, stack):
+            assert isinstance(sut.cache_redis, CacheComponent)
+            return assert_output_equals(sut.cache_redis.replication_group.replication_group_id,
+                                        f"{app_name}-{stack}-cache-redis")
+
+        @pulumi.runtime.test
+        def it_sends_the_reader_endpoint_to_the_ecs_environment(sut, app_name, stack):
+            return assert_output_equals(sut.env_vars["CACHE_REDIS_READER_URL"],
+                                        f"redis://replica.{app_name}-{stack}-cache-redis.cache.amazonaws.com:6379")
+
     def describe_with_custom_cache_redis():
         @pytest.fixture
         def component_kwargs(component_kwargs):
@@ -1007,6 +1337,66 @@ def describe_a_pulumi_rails_component():
         def it_sends_the_bucket_name_to_the_ecs_environment(sut):
             return assert_outputs_equal(sut.env_vars["S3_BUCKET_NAME"], sut.storage.bucket.bucket)
 
+    def describe_with_assets_precompiled_once():
+        @pytest.fixture
+        def component_kwargs(component_kwargs):
+            component_kwargs['precompile_assets_once'] = True
+            component_kwargs['need_worker'] = True
+            return component_kwargs
+
+        @pulumi.runtime.test
+        def it_creates_a_storage_bucket(sut):
+            assert isinstance(sut.storage, StorageComponent)
+
+        @pulumi.runtime.test
+        def it_uploads_the_assets_in_the_execution(sut):
+            assert sut.migration_container.command == [
+                "sh", "-c",
+                "bundle exec rails db:prepare db:migrate db:seed assets:precompile && "
+                "aws s3 sync public/assets s3://$S3_BUCKET_NAME/assets "
+                "--cache-control 'public, max-age=31536000, immutable' && echo 'Migrations complete'"]
+
+        @pulumi.runtime.test
+        def it_starts_the_web_server_without_compiling_assets(sut):
+            assert sut.web_container.command == [
+                "sh", "-c",
+                "aws s3 sync s3://$S3_BUCKET_NAME/assets public/assets --exclude '*' --include '*manifest*.json' && "
+                "rails server -b 0.0.0.0"]
+
+        @pulumi.runtime.test
+        def it_serves_the_assets_from_the_bucket(sut):
+            assert sut.web_container.kwargs['assets_bucket'] is sut.storage.bucket
+
+        @pulumi.runtime.test
+        def it_does_not_give_the_worker_the_assets_bucket(sut):
+            assert 'assets_bucket' not in sut.worker_container.kwargs
+
+        def describe_with_execution_tasks():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['execution_tasks'] = {"migrate": {"command": ["rails", "db:migrate"]}}
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_adds_an_independent_assets_task(sut):
+                def check_tasks(tasks):
+                    assets = next(task for task in tasks if task["name"] == "assets")
+                    assert assets["depends_on"] == []
+                    assert "assets:precompile" in assets["command"][-1]
+
+                return sut.execution.tasks.apply(check_tasks)
+
+        def describe_without_cloudfront():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['use_cloudfront'] = False
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                import strongmind_deployment.rails
+                with pytest.raises(ValueError, match="requires use_cloudfront"):
+                    strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
     def describe_with_autoscale_off():
         @pytest.fixture
         def component_kwargs(component_kwargs):
@@ -1087,6 +1477,55 @@ def describe_a_pulumi_rails_component():
         def it_adds_proxy_endpoint_to_env_vars(sut):
             assert 'RDS_PROXY_ENDPOINT' in sut.web_container.env_vars
 
+        @pulumi.runtime.test
+        def it_keeps_the_default_connection_pool(sut):
+            def check(config):
+                assert config["max_connections_percent"] == 100
+                assert config["max_idle_connections_percent"] == 5
+                assert config["connection_borrow_timeout"] == 120
+
+            return sut.proxy_default_target_group.connection_pool_config.apply(check)
+
+        @pulumi.runtime.test
+        def it_does_not_pin_sessions_on_set_statements(sut):
+            def check(config):
+                assert config["session_pinning_filters"] == ["EXCLUDE_VARIABLE_SETS"]
+
+            return sut.proxy_default_target_group.connection_pool_config.apply(check)
+
+        def describe_with_connection_pool_settings():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['rds_proxy_max_connections_percent'] = 80
+                component_kwargs['rds_proxy_max_idle_connections_percent'] = 40
+                component_kwargs['rds_proxy_connection_borrow_timeout'] = 10
+                component_kwargs['rds_proxy_init_query'] = "SET TIME ZONE 'UTC'"
+                component_kwargs['rds_proxy_session_pinning_filters'] = []
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_configures_the_connection_pool(sut):
+                def check(config):
+                    assert config["max_connections_percent"] == 80
+                    assert config["max_idle_connections_percent"] == 40
+                    assert config["connection_borrow_timeout"] == 10
+                    assert config["init_query"] == "SET TIME ZONE 'UTC'"
+                    assert not config.get("session_pinning_filters")
+
+                return sut.proxy_default_target_group.connection_pool_config.apply(check)
+
+        def describe_with_more_idle_than_total_connections():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['rds_proxy_max_connections_percent'] = 50
+                component_kwargs['rds_proxy_max_idle_connections_percent'] = 60
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs, pulumi_set_mocks):
+                import strongmind_deployment.rails
+                with pytest.raises(ValueError, match="rds_proxy_max_idle_connections_percent must be between 0"):
+                    strongmind_deployment.rails.RailsComponent("rails", **component_kwargs)
+
         @pulumi.runtime.test
         def it_does_not_create_readonly_endpoint_without_readers(sut):
             assert sut.proxy_readonly_endpoint is None
@@ -1122,6 +1561,17 @@ def describe_a_pulumi_rails_component():
                 assert 'RDS_PROXY_ENDPOINT' in sut.web_container.env_vars
                 assert 'RDS_PROXY_READONLY_ENDPOINT' in sut.web_container.env_vars
 
+        def describe_with_reader_autoscaling():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['reader_autoscaling'] = True
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_creates_readonly_endpoint_for_the_autoscaled_readers(sut):
+                assert sut.proxy_readonly_endpoint is not None
+                assert 'RDS_PROXY_READONLY_ENDPOINT' in sut.web_container.env_vars
+
     def describe_rds_tags():
         def describe_with_custom_rds_tags():
             @pytest.fixture
@@ -85,7 +85,169 @@ def describe_a_pulumi_rails_app():
                 return assert_output_equals(sut.worker_container.log_metric_filters[0].metric_transformation.value,
                                             "$BLAH")
 
+        @pulumi.runtime.test
+        def it_runs_workers_on_demand_by_default(sut):
+            assert sut.worker_container.capacity_provider_strategies is None
+
+        def describe_with_cpu_architecture():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['cpu_architecture'] = "ARM64"
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_runs_web_worker_and_migration_tasks_on_the_architecture(sut):
+                assert sut.web_container.cpu_architecture == "ARM64"
+                assert sut.worker_container.cpu_architecture == "ARM64"
+                assert sut.migration_container.cpu_architecture == "ARM64"
+
+        def describe_with_worker_fargate_spot():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['worker_fargate_spot_weight'] = 3
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_runs_workers_on_fargate_spot(sut):
+                assert sut.worker_container.capacity_provider_strategies == [
+                    {"capacityProvider": "FARGATE", "base": 1, "weight": 1},
+                    {"capacityProvider": "FARGATE_SPOT", "weight": 3},
+                ]
+
+            @pulumi.runtime.test
+            def it_puts_the_worker_ecs_service_on_the_strategy(sut):
+                def check_strategies(strategies):
+                    assert [strategy["capacity_provider"] for strategy in strategies] == ["FARGATE", "FARGATE_SPOT"]
+
+                return sut.worker_container.fargate_service.service.capacity_provider_strategies.apply(
+                    check_strategies)
+
+            @pulumi.runtime.test
+            def it_keeps_the_web_container_on_demand(sut):
+                assert sut.web_container.capacity_provider_strategies is None
+
+            @pulumi.runtime.test
+            def it_keeps_the_web_ecs_service_on_the_fargate_launch_type(sut):
+                return assert_output_equals(sut.web_container.fargate_service.service.launch_type, "FARGATE")
+
+            @pulumi.runtime.test
+            def it_waits_for_the_cluster_capacity_providers(sut):
+                assert sut.worker_container.ecs_cluster_capacity_providers is sut.ecs_cluster_capacity_providers
+
+            def describe_on_arm64():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['cpu_architecture'] = "ARM64"
+                    return component_kwargs
+
+                def it_raises_an_error(pulumi_set_mocks, component_kwargs):
+                    from strongmind_deployment.rails import RailsComponent
+                    with pytest.raises(ValueError, match="worker_fargate_spot_weight runs tasks on FARGATE_SPOT"):
+                        RailsComponent("rails", **component_kwargs)
+
+        def describe_with_container_health_checks():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['container_health_check'] = True
+                component_kwargs['worker_container_health_check'] = {"command": ["CMD-SHELL", "sidekiqmon"]}
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_curls_the_web_container(sut):
+                assert sut.web_container.container_health_check["command"][0] == "CMD-SHELL"
+                assert "curl" in sut.web_container.container_health_check["command"][1]
+
+            @pulumi.runtime.test
+            def it_uses_the_worker_health_check_for_workers(sut):
+                assert sut.worker_container.container_health_check["command"] == ["CMD-SHELL", "sidekiqmon"]
+
+            @pulumi.runtime.test
+            def it_gives_the_web_container_time_to_compile_assets(sut):
+                assert sut.web_container.container_health_check["start_period"] == 300
+                assert sut.web_container.health_check_grace_period == 330
+
+            @pulumi.runtime.test
+            def it_leaves_the_web_health_check_off_the_migration_task(sut):
+                assert sut.migration_container.container_health_check is None
+                assert sut.migration_container.health_check_grace_period == 600
+
+            def describe_with_a_start_period():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['container_health_check'] = {"start_period": 60}
+                    return component_kwargs
+
+                @pulumi.runtime.test
+                def it_keeps_the_start_period(sut):
+                    assert sut.web_container.container_health_check["start_period"] == 60
+
+            def describe_without_a_worker_health_check_command():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['worker_container_health_check'] = True
+                    return component_kwargs
+
+                def it_raises_an_error(pulumi_set_mocks, component_kwargs):
+                    from strongmind_deployment.rails import RailsComponent
+                    with pytest.raises(ValueError, match="worker_container_health_check needs a command"):
+                        RailsComponent("rails", **component_kwargs)
+
         def describe_fargate_service_properties():
             @pulumi.runtime.test
             def it_sets_the_deployment_maximum_percent(sut):
                 return assert_output_equals(sut.worker_container.fargate_service.deployment_maximum_percent, 200)
+
+        def describe_with_worker_pools():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs['worker_pools'] = {
+                    "critical": {"queues": ["critical", "default"], "worker_max_number_of_instances": 10},
+                    "bulk": {"queues": ["backfill"], "cpu": 1024, "memory": 2048,
+                             "max_queue_latency_threshold": 600},
+                }
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_creates_a_worker_container_per_pool(sut):
+                assert list(sut.worker_containers) == ["critical", "bulk"]
+                assert not sut.worker_container
+
+            @pulumi.runtime.test
+            def it_runs_each_pools_queues(sut):
+                assert sut.worker_containers["critical"].command == \
+                       ["sh", "-c", "bundle exec sidekiq -q critical -q default"]
+                assert sut.worker_containers["bulk"].command == ["sh", "-c", "bundle exec sidekiq -q backfill"]
+
+            @pulumi.runtime.test
+            def it_runs_each_pool_as_its_own_service(sut):
+                assert sut.worker_containers["critical"].namespace != sut.worker_containers["bulk"].namespace
+
+            @pulumi.runtime.test
+            def it_uses_the_pool_sizes(sut):
+                assert sut.worker_containers["bulk"].cpu == 1024
+                assert sut.worker_containers["bulk"].memory == 2048
+
+            @pulumi.runtime.test
+            def it_scales_each_pool_on_its_own_queue_latency(sut):
+                critical = sut.worker_containers["critical"].worker_autoscaling
+                bulk = sut.worker_containers["bulk"].worker_autoscaling
+                assert critical.dimensions == {"QueueName": "critical"}
+                assert bulk.dimensions == {"QueueName": "bulk"}
+                assert bulk.scaling_threshold == 600
+                return assert_output_equals(critical.worker_autoscaling_target.max_capacity, 10)
+
+            @pulumi.runtime.test
+            def it_names_the_alarms_after_the_pool(sut, app_name, stack):
+                alarm = sut.worker_containers["bulk"].worker_autoscaling.worker_autoscaling_out_alarm
+                return assert_output_equals(alarm.name, f"{app_name}-{stack}-bulk-worker-auto-scaling-out-alarm")
+
+            def describe_without_queues():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs['worker_pools'] = {"critical": {}}
+                    return component_kwargs
+
+                def it_raises_an_error(pulumi_set_mocks, component_kwargs):
+                    from strongmind_deployment.rails import RailsComponent
+                    with pytest.raises(ValueError, match="worker pool critical must list the queues"):
+                        RailsComponent("rails", **component_kwargs)
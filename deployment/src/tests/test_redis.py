@@ -122,6 +122,103 @@ def describe_a_pulumi_redis_component():
             def it_has_num_cache_nodes(sut, component_arguments):
                 return assert_output_equals(sut.cluster.num_cache_nodes, 2)
 
+    def describe_a_replication_group():
+        @pytest.fixture
+        def component_arguments():
+            return {"replicas": 2}
+
+        @pulumi.runtime.test
+        def it_does_not_create_a_single_node_cluster(sut):
+            assert sut.cluster is None
+
+        @pulumi.runtime.test
+        def it_has_a_replication_group_id(sut, name, app_name, stack):
+            return assert_output_equals(sut.replication_group.replication_group_id, f"{app_name}-{stack}-{name}")
+
+        @pulumi.runtime.test
+        def it_has_a_primary_and_the_replicas(sut):
+            return assert_output_equals(sut.replication_group.num_cache_clusters, 3)
+
+        @pulumi.runtime.test
+        def it_fails_over_across_availability_zones(sut):
+            return assert_outputs_equal(
+                Output.all(sut.replication_group.automatic_failover_enabled, sut.replication_group.multi_az_enabled),
+                [True, True])
+
+        @pulumi.runtime.test
+        def it_uses_the_default_parameter_group(sut):
+            return assert_output_equals(sut.replication_group.parameter_group_name, "default.redis7")
+
+        @pulumi.runtime.test
+        def it_has_a_primary_url(sut):
+            return assert_outputs_equal(sut.url, Output.concat('redis://',
+                                                               sut.replication_group.primary_endpoint_address,
+                                                               ':6379'))
+
+        @pulumi.runtime.test
+        def it_has_a_reader_url(sut):
+            return assert_outputs_equal(sut.reader_url, Output.concat('redis://',
+                                                                      sut.replication_group.reader_endpoint_address,
+                                                                      ':6379'))
+
+        def describe_without_failover():
+            @pytest.fixture
+            def component_arguments():
+                return {"replicas": 1, "automatic_failover": False}
+
+            @pulumi.runtime.test
+            def it_stays_in_one_availability_zone(sut):
+                return assert_output_equals(sut.replication_group.multi_az_enabled, False)
+
+        def describe_in_cluster_mode():
+            @pytest.fixture
+            def component_arguments():
+                return {"num_shards": 3}
+
+            @pulumi.runtime.test
+            def it_shards_with_a_replica_each(sut):
+                return assert_outputs_equal(
+                    Output.all(sut.replication_group.num_node_groups, sut.replication_group.replicas_per_node_group),
+                    [3, 1])
+
+            @pulumi.runtime.test
+            def it_uses_a_cluster_mode_parameter_group(sut):
+                return assert_output_equals(sut.replication_group.parameter_group_name, "default.redis7.cluster.on")
+
+            def describe_without_replicas():
+                @pytest.fixture
+                def component_arguments():
+                    return {"num_shards": 2, "replicas": 0}
+
+                @pulumi.runtime.test
+                def it_still_fails_over(sut):
+                    return assert_outputs_equal(
+                        Output.all(sut.replication_group.automatic_failover_enabled,
+                                   sut.replication_group.multi_az_enabled),
+                        [True, False])
+
+            def describe_without_failover():
+                @pytest.fixture
+                def component_arguments():
+                    return {"num_shards": 2, "automatic_failover": False}
+
+                def it_raises_an_error(pulumi_set_mocks, component_arguments, name):
+                    import strongmind_deployment.redis
+                    with pytest.raises(ValueError, match="requires automatic_failover"):
+                        strongmind_deployment.redis.RedisComponent(name, **component_arguments)
+
+            @pulumi.runtime.test
+            def it_connects_through_the_configuration_endpoint(sut):
+                return assert_outputs_equal(
+                    Output.all(sut.url, sut.reader_url),
+                    Output.all(Output.concat('redis://', sut.replication_group.configuration_endpoint_address, ':6379'),
+                               Output.concat('redis://', sut.replication_group.configuration_endpoint_address, ':6379')))
+
+    def describe_a_single_node_reader_url():
+        @pulumi.runtime.test
+        def it_is_the_primary_url(sut):
+            return assert_outputs_equal(sut.reader_url, sut.url)
+
     def describe_a_redis_queue_cluster():
         @pytest.fixture
         def sut(component_arguments, stack):
@@ -215,3 +312,19 @@ def describe_a_pulumi_redis_component():
         def it_sets_the_cache_eviction_policy_to_allkeys_lru(sut):
            assert_output_equals(sut.parameter_group.parameters[0].name, "maxmemory-policy")
            assert_output_equals(sut.parameter_group.parameters[0].value, "allkeys-lru")
+
+        def describe_in_cluster_mode():
+            @pytest.fixture
+            def component_arguments():
+                return {"num_shards": 2}
+
+            @pulumi.runtime.test
+            def it_enables_cluster_mode_in_its_parameter_group(sut):
+                def check_parameter(parameter):
+                    assert (parameter.name, parameter.value) == ("cluster-enabled", "yes")
+
+                return sut.parameter_group.parameters[1].apply(check_parameter)
+
+            @pulumi.runtime.test
+            def it_uses_a_parameter_group_of_its_own(sut, app_name, stack):
+                return assert_output_equals(sut.parameter_group.name, f"{app_name}-{stack}-cache-redis7-cluster")
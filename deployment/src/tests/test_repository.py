@@ -0,0 +1,73 @@
+import subprocess
+
+import pytest
+
+from strongmind_deployment import repository
+
+
+def describe_repository_metadata():
+    @pytest.fixture(autouse=True)
+    def clean_cache(monkeypatch):
+        monkeypatch.delenv(repository.GIT_ROOT_ENV_VAR, raising=False)
+        monkeypatch.delenv(repository.REPOSITORY_NAME_ENV_VAR, raising=False)
+        monkeypatch.delenv(repository.OWNING_TEAM_ENV_VAR, raising=False)
+        repository.clear_cache()
+        yield
+        repository.clear_cache()
+
+    @pytest.fixture
+    def git_calls(monkeypatch):
+        calls = []
+        check_output = subprocess.check_output
+
+        def counting_check_output(*args, **kwargs):
+            calls.append(args)
+            return check_output(*args, **kwargs)
+
+        monkeypatch.setattr(repository.subprocess, "check_output", counting_check_output)
+        return calls
+
+    @pytest.fixture
+    def git_root(tmp_path):
+        (tmp_path / "CODEOWNERS").write_text("/.github/* @StrongMind/binary-ops\n/src/* @StrongMind/the-team\n")
+        return str(tmp_path)
+
+    def it_resolves_the_git_root_once_per_process(git_calls):
+        first = repository.get_git_root()
+        second = repository.get_git_root()
+        assert first == second
+        assert len(git_calls) == 1
+
+    def it_uses_the_last_team_in_codeowners(monkeypatch, git_root):
+        monkeypatch.setenv(repository.GIT_ROOT_ENV_VAR, git_root)
+        assert repository.get_owning_team() == "the-team"
+
+    def it_does_not_call_git_when_the_root_is_overridden(monkeypatch, git_root, git_calls):
+        monkeypatch.setenv(repository.GIT_ROOT_ENV_VAR, git_root)
+        repository.get_owning_team()
+        repository.get_repository_name()
+        assert git_calls == []
+
+    def it_reads_codeowners_once(monkeypatch, git_root, tmp_path):
+        monkeypatch.setenv(repository.GIT_ROOT_ENV_VAR, git_root)
+        repository.get_owning_team()
+        (tmp_path / "CODEOWNERS").write_text("* @StrongMind/another-team\n")
+        assert repository.get_owning_team() == "the-team"
+
+    def it_names_the_repository_after_the_git_root(monkeypatch, git_root):
+        monkeypatch.setenv(repository.GIT_ROOT_ENV_VAR, git_root)
+        assert repository.get_repository_name() == git_root.split("/")[-1]
+
+    def describe_with_env_overrides():
+        @pytest.fixture(autouse=True)
+        def overrides(monkeypatch):
+            monkeypatch.setenv(repository.REPOSITORY_NAME_ENV_VAR, "overridden-repo")
+            monkeypatch.setenv(repository.OWNING_TEAM_ENV_VAR, "overridden-team")
+
+        def it_uses_the_overridden_repository_name(git_calls):
+            assert repository.get_repository_name() == "overridden-repo"
+            assert git_calls == []
+
+        def it_uses_the_overridden_owning_team(git_calls):
+            assert repository.get_owning_team() == "overridden-team"
+            assert git_calls == []
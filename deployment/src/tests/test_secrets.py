@@ -127,3 +127,180 @@ def describe_a_pulumi_secretsmanager_component():
                 assert len(secrets) > 0
                 assert all([a["name"] == b["name"] for a, b in zip(secrets, secret_string)])
                 return assert_output_equals(sut._secrets_string, secret_string)
+
+
+def describe_resolving_secrets():
+    @pytest.fixture
+    def app_name(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def stack(faker):
+        return faker.word()
+
+    @pytest.fixture
+    def invoked_tokens():
+        return []
+
+    @pytest.fixture
+    def pulumi_mocks(faker, invoked_tokens):
+        mocks = get_pulumi_mocks(faker, secret_string='{"API_KEY": "secret", "OTHER_KEY": "other"}')
+        call = mocks.call
+
+        def counting_call(args):
+            invoked_tokens.append(args.token)
+            return call(args)
+
+        mocks.call = counting_call
+        return mocks
+
+    @pytest.fixture
+    def sut(pulumi_set_mocks):
+        import strongmind_deployment.secrets
+        return strongmind_deployment.secrets.SecretsComponent("app-secrets")
+
+    @pulumi.runtime.test
+    def it_formats_each_key_as_a_container_secret(sut):
+        def check_secrets(secrets):
+            assert secrets == [
+                {"name": "API_KEY", "valueFrom": "arn:aws:secretsmanager:us-west-2:123456789013:secret/my-secrets:API_KEY::"},
+                {"name": "OTHER_KEY",
+                 "valueFrom": "arn:aws:secretsmanager:us-west-2:123456789013:secret/my-secrets:OTHER_KEY::"},
+            ]
+
+        return Output.from_input(sut.get_secrets()).apply(check_secrets)
+
+    @pulumi.runtime.test
+    def it_reads_the_secret_once_for_every_container(sut, invoked_tokens):
+        def check_invokes(_):
+            assert invoked_tokens.count("aws:secretsmanager/getSecretVersion:getSecretVersion") == 1
+
+        return Output.all(sut.get_secrets(), sut.get_secrets(), sut.get_secrets()).apply(check_invokes)
+
+    @pytest.fixture
+    def other(pulumi_set_mocks):
+        import strongmind_deployment.secrets
+        return strongmind_deployment.secrets.SecretsComponent("proxy-secrets", namespace="proxy")
+
+    def describe_batch_reading_through_the_stack_provider():
+        @pytest.fixture
+        def sessions():
+            return []
+
+        @pytest.fixture
+        def session(monkeypatch, sessions):
+            import strongmind_deployment.secrets
+
+            class FakeSession:
+                def __init__(self, profile_name=None):
+                    self.profile_name = profile_name
+
+                def client(self, service_name, region_name=None):
+                    sessions.append((self.profile_name, service_name, region_name))
+
+                    class FakeSecretsManagerClient:
+                        def batch_get_secret_value(self, SecretIdList):
+                            return {"SecretValues": [
+                                {"ARN": arn, "VersionId": "v1", "SecretString": '{"BATCHED": "yes"}'}
+                                for arn in SecretIdList
+                            ]}
+
+                    return FakeSecretsManagerClient()
+
+            monkeypatch.setattr(strongmind_deployment.secrets.boto3, "Session", FakeSession)
+            monkeypatch.setattr(strongmind_deployment.secrets, "_clients", {})
+
+        @pulumi.runtime.test
+        def it_does_not_call_secrets_manager_by_default(session, sut, sessions, invoked_tokens):
+            def check_secrets(secrets):
+                assert [secret["name"] for secret in secrets] == ["API_KEY", "OTHER_KEY"]
+                assert sessions == []
+                assert "aws:secretsmanager/getSecretVersion:getSecretVersion" in invoked_tokens
+
+            return Output.from_input(sut.get_secrets()).apply(check_secrets)
+
+        @pulumi.runtime.test
+        def it_batch_reads_with_the_stack_provider_config(session, sut, other, sessions, invoked_tokens):
+            from strongmind_deployment.secrets import resolve_secrets
+
+            def check_secrets(resolved):
+                assert [secrets[0]["name"] for secrets in resolved] == ["BATCHED", "BATCHED"]
+                assert sessions == [(pulumi_aws.config.profile, "secretsmanager", pulumi_aws.config.region)]
+                assert "aws:secretsmanager/getSecretVersion:getSecretVersion" not in invoked_tokens
+
+            return Output.from_input(resolve_secrets(sut, other, batch_read=True)).apply(check_secrets)
+
+        def it_reuses_the_client_of_a_profile_and_region(session, sessions):
+            from strongmind_deployment.secrets import _secretsmanager_client
+            assert _secretsmanager_client(None, "us-west-2") is _secretsmanager_client(None, "us-west-2")
+            assert sessions == [(None, "secretsmanager", "us-west-2")]
+
+    def describe_several_components():
+        @pytest.fixture
+        def batch_requests():
+            return []
+
+        @pytest.fixture
+        def secretsmanager_client(batch_requests):
+            class FakeSecretsManagerClient:
+                def batch_get_secret_value(self, SecretIdList):
+                    batch_requests.append(SecretIdList)
+                    return {"SecretValues": [
+                        {"ARN": arn, "VersionId": "v1", "SecretString": '{"BATCHED": "yes"}'} for arn in SecretIdList
+                    ]}
+
+            return FakeSecretsManagerClient()
+
+        @pulumi.runtime.test
+        def it_reads_them_in_one_batch(sut, other, secretsmanager_client, batch_requests, invoked_tokens):
+            from strongmind_deployment.secrets import resolve_secrets
+
+            def check_secrets(resolved):
+                assert len(batch_requests) == 1
+                assert len(batch_requests[0]) == 2
+                assert "aws:secretsmanager/getSecretVersion:getSecretVersion" not in invoked_tokens
+                assert [secrets[0]["name"] for secrets in resolved] == ["BATCHED", "BATCHED"]
+
+            return Output.from_input(
+                resolve_secrets(sut, other, batch_read=True, secretsmanager_client=secretsmanager_client)
+            ).apply(check_secrets)
+
+        @pulumi.runtime.test
+        def it_reads_them_through_the_invoke_by_default(sut, other, secretsmanager_client, batch_requests,
+                                                        invoked_tokens):
+            from strongmind_deployment.secrets import resolve_secrets
+
+            def check_secrets(resolved):
+                assert batch_requests == []
+                assert invoked_tokens.count("aws:secretsmanager/getSecretVersion:getSecretVersion") == 2
+                assert [secrets[0]["name"] for secrets in resolved] == ["API_KEY", "API_KEY"]
+
+            return Output.from_input(
+                resolve_secrets(sut, other, secretsmanager_client=secretsmanager_client)).apply(check_secrets)
+
+        @pulumi.runtime.test
+        def it_does_not_batch_a_single_secret(sut, secretsmanager_client, batch_requests):
+            from strongmind_deployment.secrets import resolve_secrets
+
+            def check_secrets(_):
+                assert batch_requests == []
+
+            return Output.from_input(
+                resolve_secrets(sut, sut, batch_read=True, secretsmanager_client=secretsmanager_client)
+            ).apply(check_secrets)
+
+        @pulumi.runtime.test
+        def it_reads_them_one_at_a_time_when_the_batch_fails(sut, other, invoked_tokens):
+            from strongmind_deployment.secrets import resolve_secrets
+
+            class FailingClient:
+                def batch_get_secret_value(self, SecretIdList):
+                    raise Exception("AccessDenied")
+
+            def check_secrets(resolved):
+                assert invoked_tokens.count("aws:secretsmanager/getSecretVersion:getSecretVersion") == 2
+                assert [secrets[0]["name"] for secrets in resolved] == ["API_KEY", "API_KEY"]
+
+            return Output.from_input(
+                resolve_secrets(sut, other, batch_read=True, secretsmanager_client=FailingClient())
+            ).apply(check_secrets)
@@ -1,5 +1,8 @@
 import pytest
-from strongmind_deployment.util import qualify_component_name
+import pulumi
+
+from strongmind_deployment.util import qualify_component_name, use_capacity_provider_strategies, \
+    use_code_deploy_controller, validate_cpu_architecture, validate_fargate_spot_architecture
 
 def describe_qualify_component_name():
     def test_qualify_component_name_truncate():
@@ -12,4 +15,79 @@ def describe_qualify_component_name():
 
     def test_qualify_component_name_without_namespace():
         result = qualify_component_name("component", {})
-        assert result == "component"
\ No newline at end of file
+        assert result == "component"
+
+
+def describe_use_capacity_provider_strategies():
+    @pytest.fixture
+    def strategies():
+        return [{"capacityProvider": "FARGATE_SPOT", "weight": 1}]
+
+    @pytest.fixture
+    def transform(strategies):
+        return use_capacity_provider_strategies(strategies)
+
+    def test_it_replaces_the_launch_type_of_ecs_services(transform, strategies):
+        opts = pulumi.ResourceOptions()
+        result = transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/service:Service", name="service",
+            props={"launchType": "FARGATE", "desiredCount": 1}, opts=opts))
+        assert result.props == {"desiredCount": 1, "capacityProviderStrategies": strategies}
+
+    def test_it_deletes_the_service_before_replacing_it(transform):
+        # The replacement keeps the service name, which ECS only allows once the old service is gone
+        result = transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/service:Service", name="service",
+            props={"launchType": "FARGATE"}, opts=pulumi.ResourceOptions(ignore_changes=["desiredCount"])))
+        assert result.opts.delete_before_replace is True
+        assert result.opts.ignore_changes == ["desiredCount"]
+
+    def test_it_leaves_other_resources_alone(transform):
+        assert transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/taskDefinition:TaskDefinition", name="task",
+            props={}, opts=pulumi.ResourceOptions())) is None
+
+
+def describe_use_code_deploy_controller():
+    @pytest.fixture
+    def transform():
+        return use_code_deploy_controller()
+
+    def test_it_leaves_the_task_definition_and_load_balancers_to_codedeploy(transform):
+        result = transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/service:Service", name="service",
+            props={"desiredCount": 1}, opts=pulumi.ResourceOptions()))
+        assert result.props == {"desiredCount": 1}
+        assert result.opts.ignore_changes == ["taskDefinition", "loadBalancers"]
+
+    def test_it_deletes_the_service_before_replacing_it(transform):
+        # Switching the deployment controller replaces the service, which keeps its name
+        result = transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/service:Service", name="service",
+            props={}, opts=pulumi.ResourceOptions()))
+        assert result.opts.delete_before_replace is True
+
+    def test_it_leaves_other_resources_alone(transform):
+        assert transform(pulumi.ResourceTransformArgs(
+            custom=True, type_="aws:ecs/taskDefinition:TaskDefinition", name="task",
+            props={}, opts=pulumi.ResourceOptions())) is None
+
+
+def describe_validate_cpu_architecture():
+    def test_it_accepts_either_case():
+        assert validate_cpu_architecture("arm64") == "ARM64"
+        assert validate_cpu_architecture("X86_64") == "X86_64"
+
+    def test_it_rejects_unknown_architectures():
+        with pytest.raises(ValueError, match="Unsupported cpu_architecture: i386"):
+            validate_cpu_architecture("i386")
+
+
+def describe_validate_fargate_spot_architecture():
+    def test_it_allows_x86_64_and_the_default_architecture():
+        validate_fargate_spot_architecture("X86_64", "fargate_spot_weight")
+        validate_fargate_spot_architecture(None, "fargate_spot_weight")
+
+    def test_it_rejects_arm64():
+        with pytest.raises(ValueError, match="fargate_spot_weight runs tasks on FARGATE_SPOT, which does not support"):
+            validate_fargate_spot_architecture("arm64", "fargate_spot_weight")
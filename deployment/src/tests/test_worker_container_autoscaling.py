@@ -418,6 +418,129 @@ def describe_worker_autoscaling():
             def it_uses_the_custom_namespace(sut, namespace):
                 assert sut.worker_autoscaling.namespace == namespace
 
+        def describe_with_a_scale_in_protection_window():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["worker_scale_in_cooldown"] = 600
+                component_kwargs["worker_scale_in_evaluation_periods"] = 15
+                return component_kwargs
+
+            @pulumi.runtime.test
+            def it_waits_for_the_cooldown_between_scale_ins(sut):
+                policy = sut.worker_autoscaling.worker_autoscaling_in_policy
+                return assert_output_equals(policy.step_scaling_policy_configuration.cooldown, 600)
+
+            @pulumi.runtime.test
+            def it_waits_for_the_evaluation_periods_before_scaling_in(sut):
+                alarm = sut.worker_autoscaling.worker_autoscaling_in_alarm
+                return assert_output_equals(alarm.evaluation_periods, 15)
+
+        def describe_proportional_scaling():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["worker_autoscale_mode"] = "proportional"
+                return component_kwargs
+
+            @pytest.fixture
+            def scale_out_configuration(sut):
+                return sut.worker_autoscaling.worker_autoscaling_out_policy.step_scaling_policy_configuration
+
+            @pulumi.runtime.test
+            def it_changes_capacity_by_a_percentage(scale_out_configuration):
+                return assert_output_equals(scale_out_configuration.adjustment_type, "PercentChangeInCapacity")
+
+            @pulumi.runtime.test
+            def it_adds_at_least_one_worker(scale_out_configuration):
+                return assert_output_equals(scale_out_configuration.min_adjustment_magnitude, 1)
+
+            @pulumi.runtime.test
+            def it_adds_more_workers_the_further_the_latency_is_over_the_threshold(scale_out_configuration):
+                steps = scale_out_configuration.step_adjustments.apply(
+                    lambda steps: [[step["metric_interval_lower_bound"], step.get("metric_interval_upper_bound"),
+                                    step["scaling_adjustment"]] for step in steps])
+                return assert_output_equals(steps, [["0", "300", 50], ["300", "900", 100], ["900", None, 200]])
+
+            @pulumi.runtime.test
+            def it_removes_a_quarter_of_the_workers(sut):
+                configuration = sut.worker_autoscaling.worker_autoscaling_in_policy.step_scaling_policy_configuration
+                return assert_output_equals(
+                    pulumi.Output.all(configuration.adjustment_type, configuration.step_adjustments[0].scaling_adjustment),
+                    ["PercentChangeInCapacity", -25])
+
+            def describe_with_custom_steps():
+                @pytest.fixture
+                def component_kwargs(component_kwargs):
+                    component_kwargs["worker_scale_out_steps"] = [(0, 100), (120, 300)]
+                    component_kwargs["worker_min_scale_out"] = 5
+                    return component_kwargs
+
+                @pulumi.runtime.test
+                def it_uses_the_steps(scale_out_configuration):
+                    step = scale_out_configuration.step_adjustments[1]
+                    return assert_output_equals(
+                        pulumi.Output.all(step.metric_interval_lower_bound, step.scaling_adjustment,
+                                          scale_out_configuration.min_adjustment_magnitude),
+                        ["120", 300, 5])
+
+        def describe_backlog_target_tracking():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["worker_autoscale_mode"] = "target_tracking"
+                component_kwargs["worker_backlog_per_task_target"] = 30
+                return component_kwargs
+
+            @pytest.fixture
+            def configuration(sut):
+                return sut.worker_autoscaling.worker_backlog_scaling_policy.target_tracking_scaling_policy_configuration
+
+            @pulumi.runtime.test
+            def it_has_no_step_scaling(sut):
+                assert not sut.worker_autoscaling.worker_autoscaling_out_policy
+                assert not sut.worker_autoscaling.worker_autoscaling_in_policy
+
+            @pulumi.runtime.test
+            def it_keeps_the_queue_latency_alarm(sut):
+                assert sut.worker_autoscaling.worker_queue_latency_alarm
+
+            @pulumi.runtime.test
+            def it_is_named_worker_backlog_scaling_policy(sut, app_name, stack):
+                return assert_output_equals(sut.worker_autoscaling.worker_backlog_scaling_policy.name,
+                                            f"{app_name}-{stack}-worker-backlog-scaling-policy")
+
+            @pulumi.runtime.test
+            def it_tracks_the_backlog_per_task_target(configuration):
+                return assert_output_equals(configuration.target_value, 30)
+
+            @pulumi.runtime.test
+            def it_protects_against_flapping_with_a_longer_scale_in_cooldown(configuration):
+                return assert_output_equals(configuration.scale_in_cooldown, 300)
+
+            @pulumi.runtime.test
+            def it_divides_the_queue_latency_by_the_running_workers(configuration):
+                metrics = configuration.customized_metric_specification.metrics
+                return assert_output_equals(
+                    pulumi.Output.all(metrics[0].metric_stat.metric.metric_name,
+                                      metrics[1].metric_stat.metric.metric_name,
+                                      metrics[2].expression,
+                                      metrics[2].return_data),
+                    ["MaxQueueLatency", "RunningTaskCount", "IF(workers >= 1, backlog / workers, backlog)", True])
+
+            @pulumi.runtime.test
+            def it_counts_the_workers_of_the_service(sut, configuration):
+                dimensions = configuration.customized_metric_specification.metrics[1].metric_stat.metric.dimensions
+                return assert_outputs_equal(sut.fargate_service.service.name, dimensions[1].value)
+
+        def describe_with_an_unknown_mode():
+            @pytest.fixture
+            def component_kwargs(component_kwargs):
+                component_kwargs["worker_autoscale_mode"] = "predictive"
+                return component_kwargs
+
+            def it_raises_an_error(component_kwargs):
+                from strongmind_deployment.container import ContainerComponent
+                with pytest.raises(ValueError, match="worker_autoscale_mode must be one of"):
+                    ContainerComponent("container", **component_kwargs)
+
     def describe_when_turned_off():
         @pytest.fixture
         def component_kwargs(component_kwargs):